@@ -41,16 +41,108 @@ class Settings(BaseSettings):
     # --- Database Configuration --- #
     chroma_db_path: str = Field(default="./.chromadb", env="CHROMA_DB_PATH")
     collection_name: str = Field(default="reviewsdb", env="COLLECTION_NAME")
+    chroma_server_host: Optional[str] = Field(default=None, env="CHROMA_SERVER_HOST")
+    chroma_server_port: int = Field(default=8001, env="CHROMA_SERVER_PORT")
+    
+    # --- Shared State Configuration --- #
+    state_backend: str = Field(default="memory", env="STATE_BACKEND")
+    state_db_path: str = Field(default="./.state/state.sqlite3", env="STATE_DB_PATH")
     
     # --- RAG Configuration --- #
     chunk_size: int = Field(default=2000, env="CHUNK_SIZE")
     chunk_overlap: int = Field(default=0, env="CHUNK_OVERLAP")
     similarity_results: int = Field(default=10, env="SIMILARITY_RESULTS")
     
+    # --- HNSW Index Configuration (applied when the collection is created or rebuilt) --- #
+    hnsw_space: str = Field(default="l2", env="HNSW_SPACE")
+    hnsw_m: int = Field(default=16, env="HNSW_M")
+    hnsw_ef_construction: int = Field(default=100, env="HNSW_EF_CONSTRUCTION")
+    hnsw_ef_search: int = Field(default=100, env="HNSW_EF_SEARCH")
+    max_search_ef: int = Field(default=500, env="MAX_SEARCH_EF")
+    
+    # --- Admission Control Configuration (per worker process) --- #
+    admission_enabled: bool = Field(default=True, env="ADMISSION_ENABLED")
+    admission_max_concurrency: int = Field(default=8, env="ADMISSION_MAX_CONCURRENCY")
+    admission_max_queue: int = Field(default=32, env="ADMISSION_MAX_QUEUE")
+    admission_queue_timeout: float = Field(default=10.0, env="ADMISSION_QUEUE_TIMEOUT")
+    admission_reserved_search: int = Field(default=2, env="ADMISSION_RESERVED_SEARCH")
+    rate_limit_enabled: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
+    rate_limit_per_minute: float = Field(default=60.0, env="RATE_LIMIT_PER_MINUTE")
+    rate_limit_burst: float = Field(default=20.0, env="RATE_LIMIT_BURST")
+    trust_forwarded_for: bool = Field(default=False, env="TRUST_FORWARDED_FOR")
+    rate_limit_api_keys: str = Field(default="", env="RATE_LIMIT_API_KEYS")
+    
+    # --- Response Configuration --- #
+    compression_minimum_size: int = Field(default=1000, env="COMPRESSION_MINIMUM_SIZE")
+    
+    # --- Profiling Configuration (per worker process) --- #
+    profiling_allow_header: bool = Field(default=False, env="PROFILING_ALLOW_HEADER")
+    profiling_sample_rate: float = Field(default=0.0, env="PROFILING_SAMPLE_RATE")
+    profiling_interval_ms: float = Field(default=5.0, env="PROFILING_INTERVAL_MS")
+    profiling_max_profiles: int = Field(default=20, env="PROFILING_MAX_PROFILES")
+    slow_requests_top_n: int = Field(default=10, env="SLOW_REQUESTS_TOP_N")
+    slow_requests_window: int = Field(default=1000, env="SLOW_REQUESTS_WINDOW")
+    
+    # --- Ingestion Jobs Configuration --- #
+    ingestion_workers: int = Field(default=1, env="INGESTION_WORKERS")
+    jobs_db_path: str = Field(default="./.state/jobs.sqlite3", env="JOBS_DB_PATH")
+    ingestion_stale_after: float = Field(default=300.0, env="INGESTION_STALE_AFTER")
+    
+    # --- Preprocessing Configuration --- #
+    preprocess_uploads: bool = Field(default=True, env="PREPROCESS_UPLOADS")
+    near_duplicate_threshold: float = Field(default=0.8, env="NEAR_DUPLICATE_THRESHOLD")
+    
+    # --- In-memory Vector Index Configuration --- #
+    vector_index_enabled: bool = Field(default=False, env="VECTOR_INDEX_ENABLED")
+    vector_index_quantization: str = Field(default="int8", env="VECTOR_INDEX_QUANTIZATION")
+    vector_index_rescore_factor: int = Field(default=4, env="VECTOR_INDEX_RESCORE_FACTOR")
+    vector_index_mmap_dir: Optional[str] = Field(default=None, env="VECTOR_INDEX_MMAP_DIR")
+    
+    # --- Read-only Replica Configuration --- #
+    replica_mode: bool = Field(default=False, env="REPLICA_MODE")
+    snapshot_publish_dir: str = Field(default="./.snapshots", env="SNAPSHOT_PUBLISH_DIR")
+    publish_snapshots: bool = Field(default=False, env="PUBLISH_SNAPSHOTS")
+    snapshot_keep: int = Field(default=3, env="SNAPSHOT_KEEP")
+    replica_poll_interval: float = Field(default=5.0, env="REPLICA_POLL_INTERVAL")
+    
+    # --- Precomputed Answers Configuration --- #
+    precomputed_answers_enabled: bool = Field(default=True, env="PRECOMPUTED_ANSWERS_ENABLED")
+    precomputed_answers_top_n: int = Field(default=20, env="PRECOMPUTED_ANSWERS_TOP_N")
+    precomputed_answers_min_count: int = Field(default=3, env="PRECOMPUTED_ANSWERS_MIN_COUNT")
+    precomputed_answers_cluster_threshold: float = Field(default=0.9, env="PRECOMPUTED_ANSWERS_CLUSTER_THRESHOLD")
+    precomputed_answers_concurrency: int = Field(default=4, env="PRECOMPUTED_ANSWERS_CONCURRENCY")
+    precomputed_answers_max_tracked: int = Field(default=10000, env="PRECOMPUTED_ANSWERS_MAX_TRACKED")
+    
+    # --- Chat History Compaction Configuration --- #
+    chat_history_compaction_enabled: bool = Field(default=True, env="CHAT_HISTORY_COMPACTION_ENABLED")
+    chat_history_token_budget: int = Field(default=2000, env="CHAT_HISTORY_TOKEN_BUDGET")
+    chat_history_keep_turns: int = Field(default=3, env="CHAT_HISTORY_KEEP_TURNS")
+    
+    # --- Summarization Configuration --- #
+    summary_clusters: int = Field(default=8, env="SUMMARY_CLUSTERS")
+    summary_concurrency: int = Field(default=4, env="SUMMARY_CONCURRENCY")
+    summary_cluster_max_chars: int = Field(default=12000, env="SUMMARY_CLUSTER_MAX_CHARS")
+    summary_cache_path: Optional[str] = Field(default=None, env="SUMMARY_CACHE_PATH")
+    
     # --- LLM Configuration --- #
     llm_model: str = Field(default="command-r-plus-04-2024", env="LLM_MODEL")
     embedding_model: str = Field(default="embed-english-v3.0", env="EMBEDDING_MODEL")
     
+    # --- LLM Transport & Resilience Configuration --- #
+    cohere_base_url: Optional[str] = Field(default=None, env="COHERE_BASE_URL")
+    cohere_max_connections: int = Field(default=20, env="COHERE_MAX_CONNECTIONS")
+    cohere_max_keepalive_connections: int = Field(default=10, env="COHERE_MAX_KEEPALIVE_CONNECTIONS")
+    cohere_connect_timeout: float = Field(default=5.0, env="COHERE_CONNECT_TIMEOUT")
+    cohere_embed_timeout: float = Field(default=10.0, env="COHERE_EMBED_TIMEOUT")
+    cohere_chat_timeout: float = Field(default=60.0, env="COHERE_CHAT_TIMEOUT")
+    cohere_max_attempts: int = Field(default=3, env="COHERE_MAX_ATTEMPTS")
+    cohere_retry_base_delay: float = Field(default=0.25, env="COHERE_RETRY_BASE_DELAY")
+    cohere_retry_max_delay: float = Field(default=4.0, env="COHERE_RETRY_MAX_DELAY")
+    cohere_hedge_delay: float = Field(default=0.5, env="COHERE_HEDGE_DELAY")
+    circuit_breaker_failure_threshold: int = Field(default=5, env="CIRCUIT_BREAKER_FAILURE_THRESHOLD")
+    circuit_breaker_reset_timeout: float = Field(default=30.0, env="CIRCUIT_BREAKER_RESET_TIMEOUT")
+    lexical_fallback_enabled: bool = Field(default=True, env="LEXICAL_FALLBACK_ENABLED")
+    
     # --- CORS Configuration (simplified) --- #
     cors_origins: str = Field(default="*", env="CORS_ORIGINS")
     
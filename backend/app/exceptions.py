@@ -33,6 +33,10 @@ class LLMException(RAGChatbotException):
     """Exception raised for LLM-related errors."""
     pass
 
+class UpstreamUnavailableException(LLMException):
+    """Exception raised when the LLM provider is unhealthy and calls fail fast."""
+    pass
+
 class TranslationException(RAGChatbotException):
     """Exception raised for translation-related errors."""
     pass
@@ -45,6 +49,10 @@ class NoResultsException(RAGChatbotException):
     """Exception raised when no results are found."""
     pass
 
+class ReadOnlyReplicaException(RAGChatbotException):
+    """Exception raised when a write reaches a read-only replica."""
+    pass
+
 # ===============================================
 # HTTP EXCEPTION CONVERTERS
 # ===============================================
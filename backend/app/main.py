@@ -10,13 +10,46 @@ Main file for the RAG Chatbot API.
 # IMPORTS
 # ===============================================
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from .routers import question_router, upload_router, search_router, get_chat_history
+from .routers import question_router, upload_router, search_router, get_chat_history, summary_router, jobs_router, metrics_router, documents_router
 from fastapi.middleware.cors import CORSMiddleware
+from .middleware.admission import AdmissionControlMiddleware
+from .middleware.compression import CompressionMiddleware
+from .middleware.profiling import ProfilingMiddleware
+from .services.chroma_database import initialize_vector_index
+from .services.ingestion_jobs import get_worker_pool
+from .services.replica import get_replica
 from .config import settings
 import os
 
+# ===============================================
+# LIFESPAN
+# ===============================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up optional in-process state before serving requests."""
+    # --- Read-only replicas serve published snapshots: no Chroma, no ingestion workers --- #
+    if settings.replica_mode:
+        replica = get_replica()
+        replica.start()
+        yield
+        replica.stop()
+        return
+    
+    # --- Load the quantized in-memory index for hot collections --- #
+    if settings.vector_index_enabled:
+        initialize_vector_index()
+    
+    # --- Background ingestion workers, resuming any interrupted jobs --- #
+    worker_pool = get_worker_pool()
+    worker_pool.start()
+    yield
+    worker_pool.stop()
+
 # ===============================================
 # APP
 # ===============================================
@@ -25,9 +58,14 @@ app = FastAPI(
     title=settings.app_name,
     description="API to answer questions about reviews using ChromaDB and an LLM.",
     version=settings.app_version,
-    debug=settings.debug
+    debug=settings.debug,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# --- Rate limit and bound LLM-backed requests (innermost, so rejections still get CORS headers) --- #
+app.add_middleware(AdmissionControlMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[settings.cors_origins] if settings.cors_origins != "*" else ["*"],
@@ -36,11 +74,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- brotli/gzip for large result sets, negotiated from Accept-Encoding --- #
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
+# --- Stage timings and on-demand profiles (outermost, so the whole request is measured) --- #
+app.add_middleware(ProfilingMiddleware)
+
 # --- Include the routers, including the upload and questions routers --- #
 app.include_router(upload_router.router, prefix="/app", tags=["upload"])
 app.include_router(question_router.router, prefix="/app", tags=["questions"])
 app.include_router(search_router.router, prefix="/app", tags=["search"])
 app.include_router(get_chat_history.router, prefix="/app", tags=["chat_history"])
+app.include_router(summary_router.router, prefix="/app", tags=["summary"])
+app.include_router(jobs_router.router, prefix="/app", tags=["jobs"])
+app.include_router(documents_router.router, prefix="/app", tags=["documents"])
+app.include_router(metrics_router.router, prefix="/app", tags=["metrics"])
 
 # Serve static files (React build) in production
 static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "static")
@@ -0,0 +1,180 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Admission control middleware for the RAG Chatbot API.
+Applies per-client rate limiting and the global concurrency limiter to the
+LLM-backed endpoints, answering 429 (client over its rate) or 503 (server
+saturated) with a Retry-After header instead of queueing unbounded work.
+The limited routers run their blocking Cohere and Chroma calls in FastAPI's
+threadpool, so admitted requests really run concurrently instead of taking
+turns on the event loop.
+Questions that open a conversation (not `follow_up`) and have a precomputed
+answer make no LLM calls and skip both; if the answer is gone by the time the question router
+runs, the router admits the request itself (see `admitted`).
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Set, Tuple
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..config import settings
+from ..models.models import QuestionRequest
+from ..services.precomputed_answers import get_precomputed_answers, normalize_question
+from ..services.profiling import stage
+from ..services.admission import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    RATE_LIMITED,
+    AdmissionRejected,
+    get_admission_controller,
+    get_rate_limiter,
+)
+
+# ===============================================
+# ROUTES
+# ===============================================
+
+# --- (method, path) -> (priority, rate limit cost in LLM calls) --- #
+LIMITED_ROUTES = {
+    ("POST", "/app/search/"): (PRIORITY_HIGH, 1),
+    ("POST", "/app/questions/"): (PRIORITY_LOW, 3),
+    ("POST", "/app/summary/"): (PRIORITY_LOW, 3),
+}
+
+QUESTIONS_ROUTE = ("POST", "/app/questions/")
+
+# --- Request state flag: the middleware let a question through unadmitted for a precomputed answer --- #
+ADMISSION_BYPASSED = "admission_bypassed"
+
+REJECTION_MESSAGES = {
+    RATE_LIMITED: ("Too many requests", "Request rate limit exceeded for this client"),
+    "queue_full": ("Server busy", "Too many requests are waiting for the LLM, try again later"),
+    "queue_timeout": ("Server busy", "Timed out waiting for a free LLM slot, try again later"),
+}
+
+# ===============================================
+# MIDDLEWARE
+# ===============================================
+
+def known_api_keys() -> Set[str]:
+    """The API keys configured in RATE_LIMIT_API_KEYS (comma-separated)."""
+    return {key.strip() for key in settings.rate_limit_api_keys.split(",") if key.strip()}
+
+def client_key(scope: Scope, headers: Headers) -> str:
+    """Rate limit key: a configured API key when sent, otherwise the client IP."""
+    # --- An unchecked header would let a client buy a fresh bucket per request by rotating it --- #
+    api_key = headers.get("x-api-key")
+    if api_key and api_key in known_api_keys():
+        return f"key:{api_key}"
+    if settings.trust_forwarded_for and headers.get("x-forwarded-for"):
+        # --- The last hop is the one our proxy appended; earlier ones are whatever the client sent --- #
+        return f"ip:{headers['x-forwarded-for'].split(',')[-1].strip()}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+def rejection_response(rejection: AdmissionRejected) -> ORJSONResponse:
+    error, detail = REJECTION_MESSAGES.get(rejection.reason, ("Server busy", rejection.reason))
+    return ORJSONResponse(
+        status_code=429 if rejection.reason == RATE_LIMITED else 503,
+        content={"detail": {"error": error, "detail": detail, "success": False}},
+        headers={"Retry-After": str(rejection.retry_after)},
+    )
+
+async def read_body(receive: Receive) -> Tuple[bytes, Receive]:
+    """Read the whole request body and return it with a `receive` that replays it downstream."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
+
+def has_precomputed_answer(body: bytes) -> bool:
+    """Whether the question router will answer this body from the precomputed answers (same rules)."""
+    try:
+        question_request = QuestionRequest.model_validate_json(body)
+    except ValidationError:
+        return False
+    if question_request.follow_up:
+        return False
+    return get_precomputed_answers().get(normalize_question(question_request.question)) is not None
+
+@asynccontextmanager
+async def admitted(scope: Scope, route: Tuple[int, int]) -> AsyncIterator[None]:
+    """
+    Charge the client's rate limit and hold an admission slot for the duration of the block.
+
+    Args:
+        scope: ASGI scope of the request (identifies the client)
+        route: (priority, rate limit cost) from LIMITED_ROUTES
+
+    Raises:
+        AdmissionRejected: On entry, if the client is over its rate or the server is saturated
+    """
+    priority, cost = route
+    controller = get_admission_controller()
+    if settings.rate_limit_enabled:
+        try:
+            get_rate_limiter().check(client_key(scope, Headers(scope=scope)), cost)
+        except AdmissionRejected:
+            controller.record_rejection(RATE_LIMITED)
+            raise
+    if not settings.admission_enabled:
+        yield
+        return
+    with stage("admission_wait"):
+        started = await controller.acquire(priority)
+    try:
+        yield
+    finally:
+        controller.release(priority, started)
+
+class AdmissionControlMiddleware:
+    """Rate limit and admit LLM-backed requests before they reach the routers."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = LIMITED_ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        if (scope["method"], scope["path"]) == QUESTIONS_ROUTE and settings.precomputed_answers_enabled:
+            body, receive = await read_body(receive)
+            # --- The lookup reads the state store, which may be SQLite: off the event loop --- #
+            if await run_in_threadpool(has_precomputed_answer, body):
+                # --- The answer can go stale before the router runs: it then admits the request itself --- #
+                scope.setdefault("state", {})[ADMISSION_BYPASSED] = True
+                await self.app(scope, receive, send)
+                return
+
+        # --- Rejections only happen on entry: the routers below never raise AdmissionRejected --- #
+        try:
+            async with admitted(scope, route):
+                await self.app(scope, receive, send)
+        except AdmissionRejected as rejection:
+            await rejection_response(rejection)(scope, receive, send)
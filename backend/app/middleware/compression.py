@@ -0,0 +1,123 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Response compression middleware for the RAG Chatbot API.
+Negotiates brotli or gzip from Accept-Encoding for responses above a size
+threshold (large result sets, full documents). Brotli is optional: without
+the `brotli` package only gzip is offered.
+
+Only complete bodies are compressed: streamed responses and responses that
+already carry a Content-Encoding are passed through untouched. Written
+against the plain ASGI send/receive interface, so no Starlette internals.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# ===============================================
+# MIDDLEWARE
+# ===============================================
+
+def parse_accept_encoding(header: str) -> dict:
+    """Map each accepted encoding to its q-value ("br;q=0.9, gzip" -> {"br": 0.9, "gzip": 1.0})."""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+class CompressionMiddleware:
+    """Compress responses with brotli (preferred) or gzip, depending on what the client accepts."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 4):
+        """
+        Args:
+            app: Wrapped ASGI application
+            minimum_size: Responses smaller than this many bytes are sent uncompressed
+            gzip_level: gzip compression level (lower is faster)
+            brotli_quality: brotli quality (lower is faster)
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoding(self, accept_encoding: str) -> str:
+        accepted = parse_accept_encoding(accept_encoding)
+        available = ["br", "gzip"] if brotli is not None else ["gzip"]
+        candidates = [(accepted.get(name, accepted.get("*", 0.0)), name) for name in available]
+        # --- Highest q-value wins; on ties the order of `available` (brotli first) decides --- #
+        quality, name = max(candidates, key=lambda candidate: candidate[0])
+        return name if quality > 0 else "identity"
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        # --- wbits=31: gzip container around the deflate stream --- #
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress(body) + compressor.flush()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.choose_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+        if encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message = {}
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # --- Held back until the first body chunk shows whether to compress --- #
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(scope=start_message)
+            if message.get("more_body", False) or "content-encoding" in headers or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            passthrough = True
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
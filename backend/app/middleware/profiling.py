@@ -0,0 +1,73 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Profiling middleware for the RAG Chatbot API.
+Records the duration and stage breakdown of every API request, and profiles
+the requests that ask for it with an `X-Profile: 1` header (when
+PROFILING_ALLOW_HEADER is set) or are picked by PROFILING_SAMPLE_RATE. The
+profile id is returned in the `X-Profile-Id` response header.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..config import settings
+from ..services.profiling import end_trace, get_request_profiler, start_trace
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+PROFILE_REQUEST_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+TRACED_PREFIX = "/app/"
+# --- Reading metrics and downloading profiles should not push real requests out of the window --- #
+UNTRACED_PREFIX = "/app/metrics/"
+
+# ===============================================
+# MIDDLEWARE
+# ===============================================
+
+def profile_requested(scope: Scope) -> bool:
+    if not settings.profiling_allow_header:
+        return False
+    return Headers(scope=scope).get(PROFILE_REQUEST_HEADER, "").lower() in ("1", "true", "yes")
+
+class ProfilingMiddleware:
+    """Trace API requests and sample the stack of the ones being profiled."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(TRACED_PREFIX) or path.startswith(UNTRACED_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        recorder = get_request_profiler()
+        name = f"{scope['method']} {path}"
+        profiler = recorder.start_profiler(name) if profile_requested(scope) or recorder.should_sample() else None
+        trace, token = start_trace(scope["method"], path, profiler)
+        status = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profiler:
+                    MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profiler.profile_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            end_trace(token)
+            trace.finish(status)
+            recorder.record(trace, profiler.stop() if profiler else None)
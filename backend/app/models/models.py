@@ -10,8 +10,9 @@ Defines request/response models with proper validation.
 # IMPORTS
 # ===============================================
 
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from chromadb.api.types import validate_where
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Literal, Optional
 
 # ===============================================
 # REQUEST MODELS
@@ -20,10 +21,36 @@ from typing import List, Optional
 class QuestionRequest(BaseModel):
     """Request model for asking questions."""
     question: str = Field(..., min_length=1, max_length=500, description="The question to ask")
+    fields: Literal["snippet", "full", "ids"] = Field(default="snippet", description="Result fields: content snippet, full documents or ids only")
+    follow_up: bool = Field(default=False, description="The question continues the caller's conversation (never answered from precomputed answers)")
 
 class SearchRequest(BaseModel):
     """Request model for searching reviews."""
     query: str = Field(..., min_length=1, max_length=500, description="Search query")
+    fields: Literal["snippet", "full", "ids"] = Field(default="snippet", description="Result fields: content snippet, full documents or ids only")
+    ef: Optional[int] = Field(None, ge=1, le=1000, description="Search breadth: higher values trade latency for recall (defaults to the index setting)")
+
+class SummaryRequest(BaseModel):
+    """Request model for summarizing the whole review collection."""
+    num_clusters: Optional[int] = Field(None, ge=1, le=50, description="Number of review clusters to summarize (defaults to the configured value)")
+    refresh: bool = Field(default=False, description="Recompute every cluster summary instead of reusing cached ones")
+
+class DeleteDocumentsRequest(BaseModel):
+    """Request model for deleting documents by id and/or metadata."""
+    ids: Optional[List[str]] = Field(None, min_length=1, description="Document ids to delete")
+    where: Optional[Dict[str, Any]] = Field(None, description='Chroma metadata filter, e.g. {"job_id": "..."} to undo an upload')
+
+    @field_validator("where")
+    @classmethod
+    def check_where(cls, where: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        # --- A malformed filter is a 422 here instead of a ValueError (and a 500) inside Chroma --- #
+        if where:
+            validate_where(where)
+        return where
+
+class ReplaceDocumentRequest(BaseModel):
+    """Request model for replacing a document's content."""
+    content: str = Field(..., min_length=1, description="New document content (re-embedded)")
 
 class UploadRequest(BaseModel):
     """Request model for uploading reviews."""
@@ -36,27 +63,85 @@ class UploadRequest(BaseModel):
 class SearchResult(BaseModel):
     """Individual search result model."""
     document_id: str = Field(..., description="Unique document identifier")
-    content_snippet: str = Field(..., description="Preview of the document content")
+    content_snippet: Optional[str] = Field(None, description="Preview of the document content (fields=snippet)")
+    content: Optional[str] = Field(None, description="Full document content (fields=full)")
     similarity_score: float = Field(..., description="Similarity score (lower is more similar)")
 
 class QuestionResponse(BaseModel):
     """Response model for question answers."""
     answer: str = Field(..., description="Generated answer to the question")
     results: List[SearchResult] = Field(default_factory=list, description="Related search results")
+    precomputed: bool = Field(default=False, description="Whether the answer was precomputed for a frequent question")
     success: bool = Field(default=True, description="Whether the operation was successful")
 
+class PrecomputedAnswer(BaseModel):
+    """A frequent question with a precomputed answer."""
+    question: str = Field(..., description="Most asked phrasing of the question")
+    count: int = Field(..., ge=0, description="Times the question (any phrasing in its cluster) was asked")
+    phrasings: int = Field(..., ge=1, description="Distinct phrasings answered with it")
+    version: Optional[int] = Field(None, description="Collection version the answer was computed at")
+    current: bool = Field(..., description="Whether the answer matches the current collection and is served")
+
+class PrecomputedAnswersResponse(BaseModel):
+    """Response model for the precomputed answers list."""
+    answers: List[PrecomputedAnswer] = Field(default_factory=list, description="Precomputed answers, most asked first")
+    tracked_questions: int = Field(..., ge=0, description="Distinct questions counted by this worker")
+    success: bool = Field(default=True, description="Whether the request was successful")
+
 class SearchResponse(BaseModel):
     """Response model for search results."""
     results: List[SearchResult] = Field(default_factory=list, description="Search results")
     total_results: int = Field(..., ge=0, description="Total number of results found")
     success: bool = Field(default=True, description="Whether the search was successful")
 
+class ClusterSummary(BaseModel):
+    """Summary of one cluster of similar reviews."""
+    size: int = Field(..., ge=0, description="Number of review chunks in the cluster")
+    summary: str = Field(..., description="Summary of the cluster")
+    sample_ids: List[str] = Field(default_factory=list, description="Ids of the most central chunks")
+
+class SummaryResponse(BaseModel):
+    """Response model for whole-collection summaries."""
+    summary: str = Field(..., description="Summary of the whole review collection")
+    clusters: List[ClusterSummary] = Field(default_factory=list, description="Per-cluster summaries, largest first")
+    clusters_recomputed: int = Field(..., ge=0, description="Clusters summarized in this call (the rest came from cache)")
+    success: bool = Field(default=True, description="Whether the summarization was successful")
+
+class DocumentMutationResponse(BaseModel):
+    """Response model for delete and replace operations."""
+    message: str = Field(..., description="Operation status message")
+    affected: int = Field(..., ge=0, description="Number of documents deleted or replaced")
+    version: int = Field(..., ge=0, description="Collection version after the operation")
+    success: bool = Field(default=True, description="Whether the operation was successful")
+
+class CollectionVersionResponse(BaseModel):
+    """Response model for the collection version."""
+    version: int = Field(..., ge=0, description="Collection version, bumped on every mutation")
+    document_count: int = Field(..., ge=0, description="Number of stored documents")
+    success: bool = Field(default=True, description="Whether the request was successful")
+
 class UploadResponse(BaseModel):
     """Response model for upload operations."""
     message: str = Field(..., description="Upload status message")
     documents_processed: int = Field(..., ge=0, description="Number of documents processed")
+    job_id: Optional[str] = Field(None, description="Ingestion job identifier, poll /jobs/{job_id} for progress")
+    status: Optional[str] = Field(None, description="Ingestion job status")
     success: bool = Field(default=True, description="Whether the upload was successful")
 
+class JobStatusResponse(BaseModel):
+    """Response model for ingestion job progress."""
+    job_id: str = Field(..., description="Ingestion job identifier")
+    status: str = Field(..., description="queued, running, completed or failed")
+    total_chunks: Optional[int] = Field(None, ge=0, description="Number of chunks to store (known once the text is split)")
+    processed_chunks: int = Field(..., ge=0, description="Number of chunks stored so far")
+    progress: float = Field(..., ge=0, le=1, description="Fraction of chunks stored")
+    chunks_per_second: Optional[float] = Field(None, description="Throughput of the current (or last) run")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    created_at: float = Field(..., description="Unix time the job was queued")
+    started_at: Optional[float] = Field(None, description="Unix time processing first started")
+    finished_at: Optional[float] = Field(None, description="Unix time the job completed or failed")
+    success: bool = Field(default=True, description="Whether the request was successful")
+
 # ===============================================
 # CHAT MODELS
 # ===============================================
@@ -69,6 +154,7 @@ class ChatMessage(BaseModel):
 class ChatHistory(BaseModel):
     """Chat history model."""
     history: List[ChatMessage] = Field(default_factory=list, description="List of chat messages")
+    summary: Optional[str] = Field(default=None, description="Rolling summary of the older turns sent instead of them")
 
 # ===============================================
 # ERROR MODELS
@@ -0,0 +1,147 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Documents Router for the RAG Chatbot API.
+Deletes and replaces stored review chunks and reports the collection
+version, which every mutation bumps. The endpoints are plain functions:
+re-embedding and Chroma I/O block, so FastAPI runs them in its threadpool.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+from fastapi import APIRouter, HTTPException
+from ..models.models import (
+    CollectionVersionResponse,
+    DeleteDocumentsRequest,
+    DocumentMutationResponse,
+    ErrorResponse,
+    ReplaceDocumentRequest,
+)
+from ..services.chroma_database import delete_documents, get_collection_stats, replace_document
+from ..services.precomputed_answers import get_precomputed_answers
+from ..services.replica import ensure_writable, publish_after_change
+from ..config import settings
+from ..exceptions import (
+    RAGChatbotException,
+    NoResultsException,
+    ReadOnlyReplicaException,
+    UpstreamUnavailableException,
+    ValidationException,
+    convert_to_http_exception
+)
+
+# ===============================================
+# ROUTER
+# ===============================================
+
+router = APIRouter()
+
+# ===============================================
+# ENDPOINTS
+# ===============================================
+
+@router.post(
+    "/documents/delete",
+    response_model=DocumentMutationResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        403: {"model": ErrorResponse, "description": "Read-only Replica"},
+        422: {"model": ErrorResponse, "description": "Invalid Metadata Filter"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"}
+    }
+)
+def delete(delete_request: DeleteDocumentsRequest):
+    """
+    Delete documents by id, by metadata filter, or both.
+    
+    Args:
+        delete_request: Ids and/or a metadata filter (e.g. {"job_id": "..."})
+        
+    Returns:
+        DocumentMutationResponse with the number of deleted documents and the new version
+        
+    Raises:
+        HTTPException: If nothing was selected or the deletion fails
+    """
+    try:
+        ensure_writable()
+        deleted, version = delete_documents(ids=delete_request.ids, where=delete_request.where)
+        if deleted:
+            publish_after_change()
+            if settings.precomputed_answers_enabled:
+                get_precomputed_answers().schedule_refresh()
+        return DocumentMutationResponse(
+            message=f"Deleted {deleted} document(s).",
+            affected=deleted,
+            version=version,
+            success=True
+        )
+    except ValidationException as e:
+        raise convert_to_http_exception(e, 400)
+    except ReadOnlyReplicaException as e:
+        raise convert_to_http_exception(e, 403)
+    except RAGChatbotException as e:
+        raise convert_to_http_exception(e, 500)
+
+@router.put(
+    "/documents/{document_id}",
+    response_model=DocumentMutationResponse,
+    responses={
+        403: {"model": ErrorResponse, "description": "Read-only Replica"},
+        404: {"model": ErrorResponse, "description": "Document Not Found"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Upstream LLM Unavailable"}
+    }
+)
+def replace(document_id: str, replace_request: ReplaceDocumentRequest):
+    """
+    Replace the content of a stored document, re-embedding it.
+    
+    Args:
+        document_id: Id of the document to replace
+        replace_request: The new content
+        
+    Returns:
+        DocumentMutationResponse with the new version
+        
+    Raises:
+        HTTPException: If the document does not exist or the replacement fails
+    """
+    try:
+        ensure_writable()
+        version = replace_document(document_id, replace_request.content)
+        publish_after_change()
+        if settings.precomputed_answers_enabled:
+            get_precomputed_answers().schedule_refresh()
+        return DocumentMutationResponse(
+            message=f"Replaced document '{document_id}'.",
+            affected=1,
+            version=version,
+            success=True
+        )
+    except ReadOnlyReplicaException as e:
+        raise convert_to_http_exception(e, 403)
+    except NoResultsException as e:
+        raise convert_to_http_exception(e, 404)
+    except UpstreamUnavailableException as e:
+        raise convert_to_http_exception(e, 503)
+    except RAGChatbotException as e:
+        raise convert_to_http_exception(e, 500)
+
+@router.get("/documents/version", response_model=CollectionVersionResponse)
+def get_version():
+    """
+    Get the collection version and document count.
+    
+    Caches of answers, embeddings or rankings can compare this version to
+    the one they were built at to know whether anything changed.
+    """
+    try:
+        stats = get_collection_stats()
+        return CollectionVersionResponse(version=stats["version"], document_count=stats["document_count"], success=True)
+    except RAGChatbotException as e:
+        raise convert_to_http_exception(e, 500)
@@ -49,7 +49,7 @@ async def get_chat_history(llm_service: CohereLLMService = Depends(get_llm_depen
         llm_service: Injected LLM service instance
         
     Returns:
-        ChatHistory with all chat messages
+        ChatHistory with all chat messages and, once older turns were compacted, their summary
         
     Raises:
         HTTPException: If retrieving chat history fails
@@ -64,7 +64,7 @@ async def get_chat_history(llm_service: CohereLLMService = Depends(get_llm_depen
             for msg in history_data
         ]
         
-        return ChatHistory(history=history)
+        return ChatHistory(history=history, summary=llm_service.get_history_summary())
         
     except RAGChatbotException as e:
         raise convert_to_http_exception(e, 500)
@@ -0,0 +1,125 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Jobs Router for the RAG Chatbot API.
+Exposes progress, throughput and errors of background ingestion jobs.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+from fastapi import APIRouter, HTTPException, Depends
+from ..models.models import JobStatusResponse, ErrorResponse
+from ..services.ingestion_jobs import JobStore, describe_job, get_job_store, get_worker_pool
+from ..services.replica import ensure_writable
+from ..exceptions import ReadOnlyReplicaException, convert_to_http_exception
+
+# ===============================================
+# ROUTER
+# ===============================================
+
+router = APIRouter()
+
+# ===============================================
+# DEPENDENCY INJECTION
+# ===============================================
+
+def get_job_store_dependency() -> JobStore:
+    """Dependency injection for the ingestion job store."""
+    return get_job_store()
+
+# ===============================================
+# HELPER FUNCTIONS
+# ===============================================
+
+def to_job_status(job: dict) -> JobStatusResponse:
+    """Convert a job row into a JobStatusResponse."""
+    job = describe_job(job)
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        total_chunks=job["total_chunks"],
+        processed_chunks=job["processed_chunks"],
+        progress=job["progress"],
+        chunks_per_second=job["chunks_per_second"],
+        error=job["error"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        success=True
+    )
+
+def job_not_found(job_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail={
+            "error": "Job not found",
+            "detail": f"No ingestion job with id '{job_id}'",
+            "success": False
+        }
+    )
+
+# ===============================================
+# ENDPOINTS
+# ===============================================
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Job Not Found"}
+    }
+)
+def get_job_status(job_id: str, store: JobStore = Depends(get_job_store_dependency)):
+    """
+    Get progress, throughput and errors of an ingestion job.
+    
+    Args:
+        job_id: Identifier returned by /upload/
+        store: Injected job store
+        
+    Returns:
+        JobStatusResponse with the job's progress
+        
+    Raises:
+        HTTPException: If the job does not exist
+    """
+    job = store.get(job_id)
+    if job is None:
+        raise job_not_found(job_id)
+    return to_job_status(job)
+
+@router.post(
+    "/jobs/{job_id}/retry",
+    response_model=JobStatusResponse,
+    responses={
+        403: {"model": ErrorResponse, "description": "Read-only Replica"},
+        404: {"model": ErrorResponse, "description": "Job Not Found"}
+    }
+)
+def retry_job(job_id: str, store: JobStore = Depends(get_job_store_dependency)):
+    """
+    Queue a failed ingestion job again; it resumes from its last stored batch.
+    
+    Args:
+        job_id: Identifier of the failed job
+        store: Injected job store
+        
+    Returns:
+        JobStatusResponse with the job's new status
+        
+    Raises:
+        HTTPException: If the job does not exist or this instance is a read-only replica
+    """
+    try:
+        ensure_writable()
+    except ReadOnlyReplicaException as e:
+        raise convert_to_http_exception(e, 403)
+    job = store.retry(job_id)
+    if job is None:
+        raise job_not_found(job_id)
+    get_worker_pool().notify()
+    return to_job_status(job)
@@ -0,0 +1,110 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Metrics Router for the RAG Chatbot API.
+Exposes admission control counters (queue depth, admissions, rejections),
+the slowest recent requests with their stage breakdown, and downloadable
+request profiles of the worker process that serves the request.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+from typing import Literal, Optional
+from fastapi import APIRouter, Query
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from ..models.models import ErrorResponse
+from ..config import settings
+from ..services.admission import get_admission_controller, get_rate_limiter
+from ..services.profiling import get_request_profiler
+from ..services.replica import get_replica
+from ..exceptions import NoResultsException, convert_to_http_exception
+
+# ===============================================
+# ROUTER
+# ===============================================
+
+router = APIRouter()
+
+# ===============================================
+# ENDPOINTS
+# ===============================================
+
+@router.get("/metrics/")
+async def get_metrics():
+    """
+    Get admission control, rate limiting and replica metrics.
+    
+    Returns:
+        Dictionary with in-flight requests, queue depth, rejection counts and,
+        on read-only replicas, the snapshot being served
+    """
+    return {
+        "admission": get_admission_controller().metrics(),
+        "rate_limiter": {"tracked_clients": get_rate_limiter().tracked_clients},
+        "replica": get_replica().status() if settings.replica_mode else None,
+        "success": True
+    }
+
+@router.get("/metrics/slow-requests/")
+async def get_slow_requests(limit: Optional[int] = Query(default=None, ge=1, le=100)):
+    """
+    Get the slowest requests among the most recent ones.
+    
+    Args:
+        limit: Number of requests to return (defaults to SLOW_REQUESTS_TOP_N)
+        
+    Returns:
+        Dictionary with the slowest requests, slowest first, each with its stage timings in ms
+    """
+    profiler = get_request_profiler()
+    return {
+        "requests": profiler.slowest(limit or settings.slow_requests_top_n),
+        "window": profiler.window_size,
+        "success": True
+    }
+
+@router.get("/metrics/profiles/")
+async def list_profiles():
+    """
+    List the request profiles kept in memory, newest first.
+    
+    Returns:
+        Dictionary with the id, request, sample count and duration of each profile
+    """
+    return {"profiles": get_request_profiler().profiles(), "success": True}
+
+@router.get(
+    "/metrics/profiles/{profile_id}",
+    responses={404: {"model": ErrorResponse, "description": "Profile Not Found"}}
+)
+async def download_profile(profile_id: str, format: Literal["speedscope", "collapsed"] = "speedscope"):
+    """
+    Download a request profile.
+    
+    Args:
+        profile_id: Id from the X-Profile-Id response header or the profile list
+        format: "speedscope" (JSON, open at https://www.speedscope.app) or
+            "collapsed" (folded stacks for flamegraph.pl)
+        
+    Returns:
+        The profile as a file attachment
+        
+    Raises:
+        HTTPException: If the profile does not exist (or was already evicted)
+    """
+    profile = get_request_profiler().get_profile(profile_id)
+    if profile is None:
+        raise convert_to_http_exception(
+            NoResultsException("Profile not found", f"No profile with id {profile_id}; only the last {settings.profiling_max_profiles} are kept"),
+            404
+        )
+    
+    if format == "collapsed":
+        headers = {"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+        return PlainTextResponse(profile.collapsed(), headers=headers)
+    headers = {"Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'}
+    return ORJSONResponse(profile.speedscope(), headers=headers)
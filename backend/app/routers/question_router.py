@@ -11,14 +11,23 @@ Handles question-answering endpoints with proper error handling and validation.
 # IMPORTS
 # ===============================================
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from ..models.models import QuestionRequest, QuestionResponse, SearchResult, ErrorResponse
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from ..models.models import QuestionRequest, QuestionResponse, PrecomputedAnswersResponse, ErrorResponse
 from ..services.chroma_database import search_similar_reviews
+from ..services.result_formatting import format_search_results
 from ..services.cohere_llm import get_llm_service, CohereLLMService
+from ..services.precomputed_answers import get_precomputed_answers
+from ..services.admission import AdmissionRejected
+from ..middleware.admission import ADMISSION_BYPASSED, LIMITED_ROUTES, QUESTIONS_ROUTE, admitted, rejection_response
+from ..services.profiling import stage
+from ..config import settings
 from ..exceptions import (
     RAGChatbotException, 
     NoResultsException, 
+    UpstreamUnavailableException,
     convert_to_http_exception
 )
 
@@ -37,35 +46,68 @@ def get_llm_dependency() -> CohereLLMService:
     return get_llm_service()
 
 # ===============================================
-# HELPER FUNCTIONS
+# HELPERS
 # ===============================================
 
-def format_search_results(result: dict) -> List[SearchResult]:
-    """
-    Format ChromaDB search results into SearchResult models.
+def precomputed_response(question_request: QuestionRequest, llm_service: CohereLLMService) -> Optional[ORJSONResponse]:
+    """Answer a frequent question from the precomputed answers, or None if it needs the live pipeline."""
+    # --- Stored answers ignore context: only the first question of the caller's conversation may use one --- #
+    if question_request.follow_up:
+        return None
+    with stage("precomputed_lookup"):
+        precomputed = get_precomputed_answers().lookup(question_request.question)
+    if not precomputed:
+        return None
+    llm_service.append_exchange(precomputed["question_en"], precomputed["answer_en"])
+    return ORJSONResponse({
+        "answer": precomputed["answer"],
+        "results": format_search_results(precomputed["result"], fields=question_request.fields),
+        "precomputed": True,
+        "success": True
+    })
+
+def live_response(question_request: QuestionRequest, llm_service: CohereLLMService) -> ORJSONResponse:
+    """Answer a question with retrieval and the LLM."""
+    # --- step 1: Translate question to English if needed --- #
+    with stage("translate_question"):
+        question_en = llm_service.translate_text(
+            question_request.question, 
+            target_language="English"
+        )
     
-    Args:
-        result: Raw ChromaDB search result
-        
-    Returns:
-        List of formatted SearchResult objects
-    """
-    if not result.get("ids") or not result["ids"][0]:
-        return []
+    # --- step 2: Search for similar reviews --- #
+    with stage("retrieval"):
+        similar_reviews, search_result = search_similar_reviews(question_en)
     
-    formatted_results = []
-    for i in range(len(result["ids"][0])):
-        # ChromaDB returns distances (lower is more similar)
-        distance = result["distances"][0][i]
-        
-        search_result = SearchResult(
-            document_id=result["ids"][0][i],
-            content_snippet=result["documents"][0][i][:100] + "..." if len(result["documents"][0][i]) > 100 else result["documents"][0][i],
-            similarity_score=round(distance, 3)  # Keep distance as-is (lower means more similar)
+    # --- step 3: Check if we found any results --- #
+    if not similar_reviews:
+        raise NoResultsException(
+            "No reviews found for that question",
+            "The database might be empty or the question might not be related to available reviews"
+        )
+    
+    # --- step 4: Generate answer using LLM --- #
+    with stage("generation"):
+        llm_answer = llm_service.generate_answer(question_en, similar_reviews)
+    
+    # --- step 5: Translate answer back to Spanish --- #
+    with stage("translate_answer"):
+        llm_answer_translated = llm_service.translate_text(
+            llm_answer,
+            target_language="Spanish"
         )
-        formatted_results.append(search_result)
     
-    return formatted_results
+    # --- step 6: Format search results --- #
+    with stage("formatting"):
+        formatted_results = format_search_results(search_result, fields=question_request.fields)
+    
+    # --- Plain dicts serialized by orjson, skipping per-result model validation --- #
+    return ORJSONResponse({
+        "answer": llm_answer_translated,
+        "results": formatted_results,
+        "precomputed": False,
+        "success": True
+    })
 
 # ===============================================
 # ENDPOINTS
@@ -77,17 +119,21 @@ def format_search_results(result: dict) -> List[SearchResult]:
     responses={
         400: {"model": ErrorResponse, "description": "Bad Request"},
         404: {"model": ErrorResponse, "description": "No Results Found"},
-        500: {"model": ErrorResponse, "description": "Internal Server Error"}
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Upstream LLM Unavailable"}
     }
 )
 async def ask_question(
     question_request: QuestionRequest,
+    request: Request,
     llm_service: CohereLLMService = Depends(get_llm_dependency)
 ):
     """
     Process a question and return an AI-generated answer based on similar reviews.
     
-    This endpoint:
+    A question that opens a conversation (not `follow_up`) is answered from
+    the precomputed answers when it is a frequent one and the collection has
+    not changed since they were computed. Otherwise this endpoint:
     1. Translates the question to English if needed
     2. Searches for similar reviews in the database
     3. Generates an answer using the LLM
@@ -95,6 +141,7 @@ async def ask_question(
     
     Args:
         question_request: Question request containing the user's question
+        request: Incoming request (tells whether admission control was bypassed)
         llm_service: Injected LLM service instance
         
     Returns:
@@ -104,43 +151,28 @@ async def ask_question(
         HTTPException: For various error conditions
     """
     try:
-        # --- step 1: Translate question to English if needed --- #
-        question_en = llm_service.translate_text(
-            question_request.question, 
-            target_language="English"
-        )
-        
-        # --- step 2: Search for similar reviews --- #
-        similar_reviews, search_result = search_similar_reviews(question_en)
+        # --- Blocking LLM and database calls run in the threadpool, off the event loop --- #
+        if settings.precomputed_answers_enabled:
+            response = await run_in_threadpool(precomputed_response, question_request, llm_service)
+            if response is not None:
+                return response
         
-        # --- step 3: Check if we found any results --- #
-        if not similar_reviews:
-            raise NoResultsException(
-                "No reviews found for that question",
-                "The database might be empty or the question might not be related to available reviews"
-            )
+        if getattr(request.state, ADMISSION_BYPASSED, False):
+            # --- Let through for a precomputed answer that is gone by now: admit it like any other --- #
+            try:
+                async with admitted(request.scope, LIMITED_ROUTES[QUESTIONS_ROUTE]):
+                    return await run_in_threadpool(live_response, question_request, llm_service)
+            except AdmissionRejected as rejection:
+                return rejection_response(rejection)
         
-        # --- step 4: Generate answer using LLM --- #
-        llm_answer = llm_service.generate_answer(question_en, similar_reviews)
-        
-        # --- step 5: Translate answer back to Spanish --- #
-        llm_answer_translated = llm_service.translate_text(
-            llm_answer,
-            target_language="Spanish"
-        )
-        
-        # --- step 6: Format search results --- #
-        formatted_results = format_search_results(search_result)
-        
-        return QuestionResponse(
-            answer=llm_answer_translated,
-            results=formatted_results,
-            success=True
-        )
+        return await run_in_threadpool(live_response, question_request, llm_service)
         
     except NoResultsException as e:
         raise convert_to_http_exception(e, 404)
         
+    except UpstreamUnavailableException as e:
+        raise convert_to_http_exception(e, 503)
+        
     except RAGChatbotException as e:
         raise convert_to_http_exception(e, 500)
         
@@ -154,6 +186,36 @@ async def ask_question(
             }
         )
 
+@router.get("/questions/precomputed/", response_model=PrecomputedAnswersResponse)
+async def list_precomputed_answers():
+    """
+    List the frequent questions that have a precomputed answer.
+    
+    Returns:
+        PrecomputedAnswersResponse with each question, how often its cluster
+        was asked, and whether the answer matches the current collection
+    """
+    try:
+        precomputed = get_precomputed_answers()
+        return PrecomputedAnswersResponse(
+            answers=precomputed.entries(),
+            tracked_questions=precomputed.tracked_questions(),
+            success=True
+        )
+    except RAGChatbotException as e:
+        raise convert_to_http_exception(e, 500)
+
+@router.post("/questions/precomputed/refresh/")
+async def refresh_precomputed_answers():
+    """
+    Recompute the answers of the most frequent questions in the background.
+    
+    Returns:
+        Success message (the refresh itself runs after the response)
+    """
+    get_precomputed_answers().schedule_refresh()
+    return {"message": "Precomputed answers refresh scheduled", "success": True}
+
 @router.post("/questions/clear-history/")
 async def clear_chat_history(llm_service: CohereLLMService = Depends(get_llm_dependency)):
     """
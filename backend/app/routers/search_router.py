@@ -12,11 +12,13 @@ Handles search endpoints with proper error handling and validation.
 # ===============================================
 
 from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from ..models.models import SearchRequest, SearchResponse, SearchResult, ErrorResponse
+from fastapi.responses import ORJSONResponse
+from ..models.models import SearchRequest, SearchResponse, ErrorResponse
 from ..services.chroma_database import search_similar_reviews
+from ..services.result_formatting import format_search_results
 from ..services.cohere_llm import get_llm_service, CohereLLMService
-from ..exceptions import RAGChatbotException, convert_to_http_exception
+from ..services.profiling import stage
+from ..exceptions import RAGChatbotException, UpstreamUnavailableException, convert_to_http_exception
 
 # ===============================================
 # ROUTER
@@ -32,37 +34,6 @@ def get_llm_dependency() -> CohereLLMService:
     """Dependency injection for LLM service."""
     return get_llm_service()
 
-# ===============================================
-# HELPER FUNCTIONS
-# ===============================================
-
-def format_search_results(result: dict) -> List[SearchResult]:
-    """
-    Format ChromaDB search results into SearchResult models.
-    
-    Args:
-        result: Raw ChromaDB search result
-        
-    Returns:
-        List of formatted SearchResult objects
-    """
-    if not result.get("ids") or not result["ids"][0]:
-        return []
-    
-    formatted_results = []
-    for i in range(len(result["ids"][0])):
-        # ChromaDB returns distances (lower is more similar)
-        distance = result["distances"][0][i]
-        
-        search_result = SearchResult(
-            document_id=result["ids"][0][i],
-            content_snippet=result["documents"][0][i][:100] + "..." if len(result["documents"][0][i]) > 100 else result["documents"][0][i],
-            similarity_score=round(distance, 3)  # Keep distance as-is (lower means more similar)
-        )
-        formatted_results.append(search_result)
-    
-    return formatted_results
-
 # ===============================================
 # ENDPOINTS
 # ===============================================
@@ -72,10 +43,11 @@ def format_search_results(result: dict) -> List[SearchResult]:
     response_model=SearchResponse,
     responses={
         400: {"model": ErrorResponse, "description": "Bad Request"},
-        500: {"model": ErrorResponse, "description": "Internal Server Error"}
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Upstream LLM Unavailable"}
     }
 )
-async def search(
+def search(
     search_request: SearchRequest,
     llm_service: CohereLLMService = Depends(get_llm_dependency)
 ):
@@ -99,22 +71,33 @@ async def search(
     """
     try:
         # --- step 1: Translate the query to English --- #
-        query_en = llm_service.translate_text(
-            search_request.query, 
-            target_language="English"
-        )
+        try:
+            with stage("translate_query"):
+                query_en = llm_service.translate_text(
+                    search_request.query, 
+                    target_language="English"
+                )
+        except UpstreamUnavailableException:
+            # --- The LLM is down: search with the original query instead of failing --- #
+            query_en = search_request.query
         
         # --- step 2: Search for similar reviews --- #
-        docs, result = search_similar_reviews(query_en)
+        with stage("retrieval"):
+            docs, result = search_similar_reviews(query_en, ef=search_request.ef)
         
         # --- step 3: Format search results --- #
-        formatted_results = format_search_results(result)
+        with stage("formatting"):
+            formatted_results = format_search_results(result, fields=search_request.fields)
+        
+        # --- Plain dicts serialized by orjson, skipping per-result model validation --- #
+        return ORJSONResponse({
+            "results": formatted_results,
+            "total_results": len(formatted_results),
+            "success": True
+        })
         
-        return SearchResponse(
-            results=formatted_results,
-            total_results=len(formatted_results),
-            success=True
-        )
+    except UpstreamUnavailableException as e:
+        raise convert_to_http_exception(e, 503)
         
     except RAGChatbotException as e:
         raise convert_to_http_exception(e, 500)
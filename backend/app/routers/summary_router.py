@@ -0,0 +1,105 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Summary Router for the RAG Chatbot API.
+Handles whole-collection summarization endpoints with proper error handling.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+from fastapi import APIRouter, HTTPException, Depends
+from ..models.models import SummaryRequest, SummaryResponse, ClusterSummary, ErrorResponse
+from ..services.summarizer import get_summarizer, CorpusSummarizer
+from ..services.profiling import stage
+from ..exceptions import (
+    RAGChatbotException,
+    NoResultsException,
+    UpstreamUnavailableException,
+    convert_to_http_exception
+)
+
+# ===============================================
+# ROUTER
+# ===============================================
+
+router = APIRouter()
+
+# ===============================================
+# DEPENDENCY INJECTION
+# ===============================================
+
+def get_summarizer_dependency() -> CorpusSummarizer:
+    """Dependency injection for the summarizer service."""
+    return get_summarizer()
+
+# ===============================================
+# ENDPOINTS
+# ===============================================
+
+@router.post(
+    "/summary/",
+    response_model=SummaryResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "No Reviews To Summarize"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Upstream LLM Unavailable"}
+    }
+)
+def summarize_reviews(
+    summary_request: SummaryRequest,
+    summarizer: CorpusSummarizer = Depends(get_summarizer_dependency)
+):
+    """
+    Summarize the whole review collection with a map-reduce over clusters.
+    
+    This endpoint:
+    1. Clusters every stored review embedding
+    2. Summarizes each changed cluster in parallel (unchanged ones come from cache)
+    3. Combines the cluster summaries into one final summary
+    
+    Args:
+        summary_request: Summary options (number of clusters, refresh)
+        summarizer: Injected summarizer instance
+        
+    Returns:
+        SummaryResponse with the final and per-cluster summaries
+        
+    Raises:
+        HTTPException: For various error conditions
+    """
+    try:
+        with stage("summarization"):
+            result = summarizer.summarize(
+                num_clusters=summary_request.num_clusters,
+                refresh=summary_request.refresh
+            )
+        
+        return SummaryResponse(
+            summary=result["summary"],
+            clusters=[ClusterSummary(**cluster) for cluster in result["clusters"]],
+            clusters_recomputed=result["clusters_recomputed"],
+            success=True
+        )
+        
+    except NoResultsException as e:
+        raise convert_to_http_exception(e, 404)
+        
+    except UpstreamUnavailableException as e:
+        raise convert_to_http_exception(e, 503)
+        
+    except RAGChatbotException as e:
+        raise convert_to_http_exception(e, 500)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "An unexpected error occurred during summarization",
+                "detail": str(e),
+                "success": False
+            }
+        )
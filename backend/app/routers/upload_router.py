@@ -11,10 +11,10 @@ Upload Router for the RAG Chatbot API.
 # ===============================================
 
 from fastapi import APIRouter, HTTPException
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from ..models.models import UploadRequest, UploadResponse
-from ..services.chroma_database import save_documents
-from ..config import settings
+from ..services.ingestion_jobs import get_job_store, get_worker_pool
+from ..services.replica import ensure_writable
+from ..exceptions import ReadOnlyReplicaException, convert_to_http_exception
 
 # ===============================================
 # ROUTER
@@ -26,30 +26,29 @@ router = APIRouter()
 # UPLOAD REVIEWS FUNCTION
 # ===============================================
 
-@router.post("/upload/", response_model=UploadResponse)
-async def upload_reviews(reviews: UploadRequest):
+@router.post("/upload/", response_model=UploadResponse, status_code=202)
+def upload_reviews(reviews: UploadRequest):
     """
-    Endpoint that receives a string with reviews, processes them, vectorizes them and stores them in ChromaDB.
+    Endpoint that receives a string with reviews and queues them for ingestion.
+    Splitting, vectorizing and storing in ChromaDB happen in a background job; poll /jobs/{job_id} for progress.
+    A plain function: queueing the job writes to SQLite, so it runs in the threadpool.
     """
     if not reviews.reviews:
         raise HTTPException(status_code=400, detail="String can't be empty.")
 
     try:
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.chunk_size, 
-            chunk_overlap=settings.chunk_overlap
-        )
-        chunks = text_splitter.split_text(reviews.reviews)
-        
-        # --- store the documents in ChromaDB --- #
-        save_documents(chunks)
+        ensure_writable()
+        job = get_job_store().enqueue(reviews.reviews)
+        get_worker_pool().notify()
         
         return UploadResponse(
-            message="Reviews uploaded and processed successfully.",
-            documents_processed=len(chunks),
+            message="Reviews queued for processing.",
+            documents_processed=0,
+            job_id=job["id"],
+            status=job["status"],
             success=True
         )
+    except ReadOnlyReplicaException as e:
+        raise convert_to_http_exception(e, 403)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
-
@@ -0,0 +1,280 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Admission control for the RAG Chatbot API.
+Bounds the number of LLM-backed requests in flight with a priority wait
+queue (cheap searches are admitted before questions and keep reserved
+slots), and rate limits each client with a token bucket. Counters for
+queue depth, admissions and rejections are exposed as metrics.
+
+State is per worker process: with N uvicorn workers the effective limits
+are N times the configured ones.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from ..config import settings
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+# --- Lower value is served first --- #
+PRIORITY_HIGH = 0
+PRIORITY_LOW = 1
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_LOW: "low"}
+
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+RATE_LIMITED = "rate_limited"
+
+# ===============================================
+# REJECTION
+# ===============================================
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted; carries the reason and a Retry-After hint."""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(reason)
+
+# ===============================================
+# RATE LIMITING
+# ===============================================
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `capacity` saved up."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, cost: float) -> float:
+        """Take `cost` tokens; returns 0 on success, else the seconds until enough tokens accrue."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+class RateLimiter:
+    """Token buckets keyed by client (API key or IP), least recently seen clients evicted first."""
+
+    def __init__(self, per_minute: float, burst: float, max_clients: int = 10000):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client: str, cost: float = 1.0) -> None:
+        """
+        Charge `cost` tokens to a client.
+
+        Raises:
+            AdmissionRejected: If the client's bucket does not hold enough tokens
+        """
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[client] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            # --- A request costing more than the burst could never pass: charge at most the burst --- #
+            wait = bucket.take(min(cost, self.burst))
+        if wait > 0:
+            raise AdmissionRejected(RATE_LIMITED, wait)
+
+    @property
+    def tracked_clients(self) -> int:
+        return len(self._buckets)
+
+# ===============================================
+# CONCURRENCY LIMITING
+# ===============================================
+
+class AdmissionController:
+    """
+    Global concurrency limiter with a bounded priority wait queue.
+
+    High-priority requests may use every slot; low-priority requests leave
+    `reserved_high` slots free, so searches keep flowing while questions
+    saturate the limiter. Waiters are admitted highest priority first, then
+    in arrival order, and a high-priority arrival at a full queue pushes out
+    the newest low-priority waiter instead of being rejected.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float, reserved_high: int = 0):
+        """
+        Args:
+            max_concurrency: Requests allowed in flight
+            max_queue: Requests allowed to wait for a slot; more are rejected immediately
+            queue_timeout: Seconds a request may wait before it is rejected
+            reserved_high: Slots low-priority requests may not take
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.reserved_high = min(max(0, reserved_high), self.max_concurrency - 1)
+        self._in_flight = {PRIORITY_HIGH: 0, PRIORITY_LOW: 0}
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._service_time = 1.0
+        self.admitted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.rejected = {QUEUE_FULL: 0, QUEUE_TIMEOUT: 0, RATE_LIMITED: 0}
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._in_flight.values())
+
+    def queue_depth(self, priority: Optional[int] = None) -> int:
+        return sum(1 for entry in self._waiters if not entry[2].done() and (priority is None or entry[0] == priority))
+
+    def _fits(self, priority: int) -> bool:
+        if self.in_flight >= self.max_concurrency:
+            return False
+        return priority == PRIORITY_HIGH or self._in_flight[PRIORITY_LOW] < self.max_concurrency - self.reserved_high
+
+    def _retry_after(self) -> float:
+        """Rough wait for a slot: queued work times the average service time, spread over the slots."""
+        return self._service_time * (self.queue_depth() + 1) / self.max_concurrency
+
+    def _admit(self, priority: int) -> None:
+        self._in_flight[priority] += 1
+        self.admitted[PRIORITY_NAMES[priority]] += 1
+
+    def _dispatch(self) -> None:
+        """Hand freed slots to waiters, highest priority first."""
+        blocked_low = False
+        remaining = []
+        while self._waiters:
+            entry = heapq.heappop(self._waiters)
+            priority, _, future = entry
+            if future.done():
+                continue
+            if (priority == PRIORITY_LOW and blocked_low) or not self._fits(priority):
+                blocked_low = blocked_low or priority == PRIORITY_LOW
+                remaining.append(entry)
+                continue
+            self._admit(priority)
+            future.set_result(None)
+        for entry in remaining:
+            heapq.heappush(self._waiters, entry)
+
+    def _evict_lower(self, priority: int) -> bool:
+        """Make room in a full queue by rejecting the newest waiter of lower priority, if there is one."""
+        waiting = [entry for entry in self._waiters if not entry[2].done() and entry[0] > priority]
+        if not waiting:
+            return False
+        victim = max(waiting, key=lambda entry: (entry[0], entry[1]))
+        self.rejected[QUEUE_FULL] += 1
+        victim[2].set_exception(AdmissionRejected(QUEUE_FULL, self._retry_after()))
+        return True
+
+    async def acquire(self, priority: int) -> float:
+        """
+        Wait for a slot.
+
+        Returns:
+            Monotonic start time, to pass back to `release`
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait times out
+        """
+        ahead = any(not entry[2].done() and entry[0] <= priority for entry in self._waiters)
+        if not ahead and self._fits(priority):
+            self._admit(priority)
+            return time.monotonic()
+
+        if self.queue_depth() >= self.max_queue and not self._evict_lower(priority):
+            self.rejected[QUEUE_FULL] += 1
+            raise AdmissionRejected(QUEUE_FULL, self._retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._sequence), future])
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                self.rejected[QUEUE_TIMEOUT] += 1
+                raise AdmissionRejected(QUEUE_TIMEOUT, self._retry_after())
+        except asyncio.CancelledError:
+            # --- Client went away while waiting: give back a slot granted in the meantime --- #
+            if future.done() and not future.cancelled():
+                self.release(priority, time.monotonic())
+            else:
+                future.cancel()
+            raise
+        return time.monotonic()
+
+    def release(self, priority: int, started: float) -> None:
+        """Free a slot and update the average service time."""
+        self._in_flight[priority] -= 1
+        self._service_time = 0.9 * self._service_time + 0.1 * (time.monotonic() - started)
+        self._dispatch()
+
+    def record_rejection(self, reason: str) -> None:
+        """Count a rejection decided outside the limiter (e.g. by the rate limiter)."""
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "in_flight": self.in_flight,
+            "in_flight_by_priority": {PRIORITY_NAMES[p]: count for p, count in self._in_flight.items()},
+            "queue_depth": self.queue_depth(),
+            "queue_depth_by_priority": {PRIORITY_NAMES[p]: self.queue_depth(p) for p in PRIORITY_NAMES},
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "reserved_high": self.reserved_high,
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+            "avg_service_ms": round(self._service_time * 1000, 1),
+        }
+
+# ===============================================
+# SERVICE INSTANCES
+# ===============================================
+
+_admission_controller = None
+_rate_limiter = None
+
+def get_admission_controller() -> AdmissionController:
+    """Get or create the admission controller (singleton pattern)."""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            max_concurrency=settings.admission_max_concurrency,
+            max_queue=settings.admission_max_queue,
+            queue_timeout=settings.admission_queue_timeout,
+            reserved_high=settings.admission_reserved_search,
+        )
+    return _admission_controller
+
+def get_rate_limiter() -> RateLimiter:
+    """Get or create the per-client rate limiter (singleton pattern)."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(settings.rate_limit_per_minute, settings.rate_limit_burst)
+    return _rate_limiter
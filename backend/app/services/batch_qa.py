@@ -0,0 +1,184 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Offline batch question-answering service for the RAG Chatbot API.
+Runs retrieval for many questions with batched embeddings and a batched
+collection query, generates answers with bounded concurrency and streams one
+JSON line per question, so an interrupted run can resume where it stopped.
+Results are matched to questions by a hash of the question text, so resuming
+after the input file was edited never pairs an answer with another question.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+from .chroma_database import search_similar_reviews_batch
+from .cohere_llm import get_llm_service
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+# --- Cohere accepts at most 96 texts per embed call --- #
+EMBED_BATCH_SIZE = 96
+
+# ===============================================
+# INPUT / OUTPUT HELPERS
+# ===============================================
+
+def load_questions(path: str) -> List[str]:
+    """Read one question per non-empty line."""
+    with open(path, "r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+def question_id(question: str) -> str:
+    """Stable id of a question: a hash of its text, independent of its line in the input."""
+    return hashlib.sha1(question.encode("utf-8")).hexdigest()[:16]
+
+def load_completed(output_path: str) -> Set[str]:
+    """
+    Collect the questions already answered successfully in a previous run.
+
+    Lines that are not result records (truncated by a crash, edited by hand)
+    are ignored; records without a `question_id` fall back to their question.
+
+    Args:
+        output_path: JSON Lines output file (may not exist yet)
+
+    Returns:
+        Set of question ids to skip
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # --- A crash can leave a truncated last line behind --- #
+                continue
+            if not isinstance(record, dict) or not record.get("success"):
+                continue
+            if isinstance(record.get("question_id"), str):
+                completed.add(record["question_id"])
+            elif isinstance(record.get("question"), str):
+                completed.add(question_id(record["question"]))
+    return completed
+
+# ===============================================
+# BATCH RUNNER
+# ===============================================
+
+def run_batch(
+    questions: List[str],
+    output_path: str,
+    concurrency: int = 4,
+    batch_size: int = EMBED_BATCH_SIZE,
+    translate: bool = False,
+    on_record: Optional[Callable[[dict], None]] = None,
+) -> Dict[str, float]:
+    """
+    Answer every question not yet answered in `output_path`.
+
+    Failed questions are written with `success: false` and retried on the
+    next run; when a question appears more than once the last line wins.
+
+    Args:
+        questions: Questions to answer, identified by their position
+        output_path: JSON Lines file results are appended to
+        concurrency: Maximum number of concurrent LLM calls
+        batch_size: Questions per embedding/retrieval batch (at most EMBED_BATCH_SIZE)
+        translate: Translate questions to English and answers to Spanish, like /questions/
+        on_record: Optional callback invoked with every written record
+
+    Returns:
+        Summary with counts and wall-clock time
+    """
+    llm_service = get_llm_service()
+    batch_size = min(max(1, batch_size), EMBED_BATCH_SIZE)
+    completed = load_completed(output_path)
+    pending = [(index, question) for index, question in enumerate(questions) if question_id(question) not in completed]
+    summary = {"total": len(questions), "skipped": len(questions) - len(pending), "answered": 0, "failed": 0}
+    write_lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(max(1, concurrency) * 2)
+    start = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as output, ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+
+        def write(record: dict) -> None:
+            with write_lock:
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                summary["answered" if record["success"] else "failed"] += 1
+            if on_record:
+                on_record(record)
+
+        def answer(index: int, question: str, query: str, docs: List[str], result: dict, retrieval_ms: float) -> dict:
+            generation_start = time.perf_counter()
+            answer_text = llm_service.generate_standalone_answer(query, docs)
+            if translate:
+                answer_text = llm_service.translate_text(answer_text, target_language="Spanish")
+            generation_ms = (time.perf_counter() - generation_start) * 1000
+            return {
+                "index": index,
+                "question_id": question_id(question),
+                "question": question,
+                "answer": answer_text,
+                "document_ids": result["ids"][0],
+                "success": True,
+                "timings_ms": {
+                    "retrieval": round(retrieval_ms, 2),
+                    "generation": round(generation_ms, 2),
+                    "total": round(retrieval_ms + generation_ms, 2),
+                },
+            }
+
+        def finish(future, index: int, question: str) -> None:
+            try:
+                write(future.result())
+            except Exception as e:
+                write({"index": index, "question_id": question_id(question), "question": question, "success": False, "error": str(e)})
+            finally:
+                in_flight.release()
+
+        for batch_start in range(0, len(pending), batch_size):
+            batch = pending[batch_start:batch_start + batch_size]
+            retrieval_start = time.perf_counter()
+            try:
+                # --- Retrieval for the whole batch: one embed call, one collection query --- #
+                queries = [question for _, question in batch]
+                if translate:
+                    queries = list(executor.map(lambda text: llm_service.translate_text(text, target_language="English"), queries))
+                embeddings = llm_service.get_embeddings(queries)
+                retrieved = search_similar_reviews_batch(embeddings)
+            except Exception as e:
+                for index, question in batch:
+                    write({"index": index, "question_id": question_id(question), "question": question, "success": False, "error": f"Retrieval failed: {e}"})
+                continue
+
+            # --- Amortize the batch retrieval time over its questions --- #
+            retrieval_ms = (time.perf_counter() - retrieval_start) * 1000 / len(batch)
+
+            for (index, question), query, (docs, result) in zip(batch, queries, retrieved):
+                if not docs:
+                    write({"index": index, "question_id": question_id(question), "question": question, "success": False, "error": "No reviews found for that question"})
+                    continue
+                # --- Bound queued work so retrieval of the next batch overlaps generation --- #
+                in_flight.acquire()
+                future = executor.submit(answer, index, question, query, docs, result, retrieval_ms)
+                future.add_done_callback(lambda future, index=index, question=question: finish(future, index, question))
+
+    summary["elapsed_s"] = round(time.perf_counter() - start, 2)
+    return summary
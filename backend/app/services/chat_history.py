@@ -0,0 +1,201 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Chat history compaction for the RAG Chatbot API.
+The full conversation stays in the state store, but answers are generated
+from a bounded prompt: once the turns not yet summarized exceed a token
+budget, the older ones are folded into a rolling summary by a background
+thread, and only that summary plus the turns after it are sent to the LLM.
+Asking a question never waits for a summary: until it is ready, the turns
+it will cover are sent verbatim, so the prompt briefly exceeds the budget
+rather than losing context.
+
+Summaries live in the shared state store, so every worker uses the same one.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import json
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+SUMMARY_KEY_PREFIX = "chat_history_summary:"
+# --- Bumped when a conversation is cleared, so a summary computed before that is never used --- #
+GENERATION_KEY_PREFIX = "chat_history_generation:"
+
+# --- Rough token estimate; no tokenizer is needed to keep a prompt within a budget --- #
+CHARS_PER_TOKEN = 4
+TOKENS_PER_MESSAGE = 4
+
+SUMMARY_INSTRUCTIONS = """
+You maintain a running summary of a conversation between a user and an
+assistant that answers questions about product reviews.
+You receive the current summary (possibly empty) followed by the turns that
+happened after it. Write the updated summary.
+
+Rules:
+- Keep every product, feature, preference and conclusion later questions may refer to
+- Keep what the assistant said it could not answer
+- Drop greetings and repetition
+- Write plain prose in English, at most 200 words
+- Answer only with the summary
+"""
+
+# ===============================================
+# HELPERS
+# ===============================================
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Approximate prompt tokens taken by chat messages."""
+    return sum(len(message["content"]) // CHARS_PER_TOKEN + TOKENS_PER_MESSAGE for message in messages)
+
+def format_turns(messages: List[Dict[str, str]]) -> str:
+    return "\n".join(f"{message['role'].capitalize()}: {message['content']}" for message in messages)
+
+# ===============================================
+# COMPACTOR
+# ===============================================
+
+class ChatHistoryCompactor:
+    """Builds bounded prompts from a conversation and summarizes its older turns in the background."""
+
+    def __init__(
+        self,
+        state_store,
+        summarize: Callable[[str, str], str],
+        token_budget: int = 2000,
+        keep_turns: int = 3,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            state_store: Store holding the messages and the summaries
+            summarize: Function (instructions, text) -> summary
+            token_budget: Estimated tokens of history sent before older turns are summarized
+            keep_turns: Most recent question/answer pairs always sent verbatim
+            enabled: Whether to compact at all (False sends the whole history)
+        """
+        self.state_store = state_store
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.keep_messages = max(1, keep_turns) * 2
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._pending: Dict[str, bool] = {}
+
+    # --- Stored summary --- #
+
+    def _generation(self, conversation_id: str) -> int:
+        return int(self.state_store.get_value(GENERATION_KEY_PREFIX + conversation_id) or 0)
+
+    def _load(self, conversation_id: str) -> Tuple[str, int]:
+        """(summary, number of messages it covers) for the current generation of the conversation."""
+        raw = self.state_store.get_value(SUMMARY_KEY_PREFIX + conversation_id)
+        if not raw:
+            return "", 0
+        stored = json.loads(raw)
+        if stored["generation"] != self._generation(conversation_id):
+            return "", 0
+        return stored["summary"], stored["covered"]
+
+    def get_summary(self, conversation_id: str) -> Optional[str]:
+        """Rolling summary of the older turns, if any were summarized yet."""
+        return self._load(conversation_id)[0] or None
+
+    def reset(self, conversation_id: str) -> None:
+        """Forget the summary of a cleared conversation (including one still being computed)."""
+        self.state_store.increment(GENERATION_KEY_PREFIX + conversation_id)
+
+    # --- Prompt --- #
+
+    def prompt_history(self, conversation_id: str) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """
+        History to send with the next request.
+
+        Args:
+            conversation_id: Conversation to read
+
+        Returns:
+            Tuple of (summary of the older turns or None, messages to send verbatim)
+        """
+        messages = self.state_store.get_messages(conversation_id)
+        if not self.enabled:
+            return None, messages
+
+        summary, covered = self._load(conversation_id)
+        if covered > len(messages):
+            summary, covered = "", 0
+        # --- Every turn the summary does not cover yet, even over budget: none may be dropped --- #
+        return summary or None, messages[covered:]
+
+    # --- Compaction --- #
+
+    def maybe_compact(self, conversation_id: str) -> None:
+        """Summarize the older turns in the background if the unsummarized history is over budget."""
+        if not self.enabled:
+            return
+        _, covered = self._load(conversation_id)
+        messages = self.state_store.get_messages(conversation_id)
+        if estimate_tokens(messages[covered:]) <= self.token_budget:
+            return
+        # --- Only the kept turns are unsummarized: they alone are over budget, and there is nothing to fold --- #
+        if len(messages) - self.keep_messages <= covered:
+            return
+
+        # --- One compaction per conversation at a time; a request made meanwhile runs once more --- #
+        with self._lock:
+            if conversation_id in self._pending:
+                self._pending[conversation_id] = True
+                return
+            self._pending[conversation_id] = False
+        threading.Thread(target=self._compact_loop, args=(conversation_id,), name="chat-history-compaction", daemon=True).start()
+
+    def _compact_loop(self, conversation_id: str) -> None:
+        while True:
+            try:
+                self.compact(conversation_id)
+            except Exception:
+                logger.exception("Failed to summarize chat history of conversation %s", conversation_id)
+            with self._lock:
+                if not self._pending[conversation_id]:
+                    del self._pending[conversation_id]
+                    return
+                self._pending[conversation_id] = False
+
+    def compact(self, conversation_id: str) -> int:
+        """
+        Fold every turn but the last few into the rolling summary.
+
+        Returns:
+            Number of messages the summary covers
+        """
+        generation = self._generation(conversation_id)
+        summary, covered = self._load(conversation_id)
+        messages = self.state_store.get_messages(conversation_id)
+        target = len(messages) - self.keep_messages
+        if target <= covered:
+            return covered
+
+        text = f"Current summary:\n{summary or '(empty)'}\n\nNew turns:\n{format_turns(messages[covered:target])}"
+        summary = self.summarize(SUMMARY_INSTRUCTIONS, text)
+
+        # --- Skip the write if the conversation was cleared or another worker got further meanwhile --- #
+        if self._generation(conversation_id) != generation or self._load(conversation_id)[1] >= target:
+            return target
+        self.state_store.set_value(
+            SUMMARY_KEY_PREFIX + conversation_id,
+            json.dumps({"generation": generation, "covered": target, "summary": summary}, ensure_ascii=False)
+        )
+        logger.info("Summarized %d messages of conversation %s", target, conversation_id)
+        return target
@@ -11,11 +11,29 @@ Handles ChromaDB operations with improved error handling.
 # IMPORTS
 # ===============================================
 
+import logging
+import re
+import threading
+import uuid
 import chromadb
 from chromadb import EmbeddingFunction, Documents, Embeddings
 from .cohere_llm import get_llm_service
+from .state_store import get_state_store
+from .vector_index import QuantizedVectorIndex, get_vector_index, set_vector_index
 from ..config import settings
-from ..exceptions import DatabaseException
+from ..exceptions import DatabaseException, NoResultsException, UpstreamUnavailableException, ValidationException
+
+logger = logging.getLogger(__name__)
+
+# --- Shared key of the collection version counter --- #
+COLLECTION_VERSION_KEY = "collection_version"
+
+# --- Words ignored by the lexical fallback search --- #
+_STOPWORDS = {
+    "the", "and", "for", "are", "but", "not", "you", "all", "any", "can", "was", "one", "our",
+    "has", "have", "had", "its", "this", "that", "with", "what", "how", "why", "who", "does",
+    "about", "they", "their", "there", "from", "would", "could", "should", "which", "when",
+}
 
 # ===============================================
 # EMBEDDING FUNCTION CLASS
@@ -32,6 +50,8 @@ class MyEmbeddingFunction(EmbeddingFunction):
         """Generate embeddings for the input documents."""
         try:
             return self.llm_service.get_embeddings(input)
+        except UpstreamUnavailableException:
+            raise
         except Exception as e:
             raise DatabaseException("Failed to generate embeddings for documents", str(e))
 
@@ -39,6 +59,40 @@ class MyEmbeddingFunction(EmbeddingFunction):
 # CHROMA CLIENT AND COLLECTION
 # ===============================================
 
+def get_chroma_client():
+    """Create the configured ChromaDB client (local files or a shared server)."""
+    if settings.chroma_server_host:
+        # --- One Chroma server owns the files, every worker talks to it over HTTP --- #
+        return chromadb.HttpClient(host=settings.chroma_server_host, port=settings.chroma_server_port)
+    return chromadb.PersistentClient(path=settings.chroma_db_path)
+
+def hnsw_configuration(space: str = None, m: int = None, ef_construction: int = None, ef_search: int = None) -> dict:
+    """
+    Build the HNSW collection configuration, defaulting to the configured values.
+    
+    Only applied when a collection is created: an existing collection keeps
+    its parameters until it is rebuilt (see `rebuild_collection`).
+    """
+    return {
+        "hnsw": {
+            "space": space or settings.hnsw_space,
+            "max_neighbors": m or settings.hnsw_m,
+            "ef_construction": ef_construction or settings.hnsw_ef_construction,
+            "ef_search": ef_search or settings.hnsw_ef_search,
+        }
+    }
+
+def collection_space(collection) -> str:
+    """
+    Distance function a collection was created with.
+    
+    `HNSW_SPACE` only applies to new collections, so an existing one may use
+    another space; falls back to the setting for handles without a stored
+    configuration (e.g. replica snapshots).
+    """
+    configuration = getattr(collection, "configuration_json", None) or {}
+    return (configuration.get("hnsw") or {}).get("space") or settings.hnsw_space
+
 def get_chroma_collection():
     """
     Get or create ChromaDB collection with error handling.
@@ -50,9 +104,9 @@ def get_chroma_collection():
         DatabaseException: If collection initialization fails
     """
     try:
-        chroma_client = chromadb.PersistentClient(path=settings.chroma_db_path)
-        collection = chroma_client.get_or_create_collection(
+        collection = get_chroma_client().get_or_create_collection(
             name=settings.collection_name,
+            configuration=hnsw_configuration(),
             embedding_function=MyEmbeddingFunction(),
         )
         return collection
@@ -66,19 +120,127 @@ def get_collection():
     """Get or create collection instance (singleton pattern)."""
     global _collection
     if _collection is None:
+        if settings.replica_mode:
+            # --- Replicas never open Chroma: they serve the snapshot installed by `set_collection` --- #
+            raise DatabaseException("No published snapshot loaded", f"Waiting for a snapshot in {settings.snapshot_publish_dir}")
         _collection = get_chroma_collection()
     return _collection
 
+def set_collection(collection) -> None:
+    """Install a collection handle (read-only replicas install their snapshot collection)."""
+    global _collection
+    _collection = collection
+
+def reset_collection():
+    """Drop the cached collection handle (e.g. after the collection was rebuilt)."""
+    global _collection
+    _collection = None
+
+def initialize_vector_index():
+    """
+    Load the quantized in-memory index from the collection, if enabled.
+    
+    Returns:
+        The loaded index, or None when the index is disabled
+        
+    Raises:
+        DatabaseException: If the index cannot be built
+    """
+    if not settings.vector_index_enabled:
+        return None
+    
+    # --- Read the version first: the index holds at least every write finished before it --- #
+    version = get_collection_version()
+    collection = get_collection()
+    index = QuantizedVectorIndex.from_collection(
+        collection,
+        quantization=settings.vector_index_quantization,
+        space=collection_space(collection),
+        rescore_factor=settings.vector_index_rescore_factor,
+        storage_dir=settings.vector_index_mmap_dir,
+    )
+    index.version = version
+    set_vector_index(index)
+    return index
+
+_index_reload_lock = threading.Lock()
+_index_reloading = False
+
+def _reload_vector_index() -> None:
+    global _index_reloading
+    try:
+        initialize_vector_index()
+    except Exception:
+        logger.exception("Failed to reload the in-memory vector index")
+    finally:
+        with _index_reload_lock:
+            _index_reloading = False
+
+def get_current_vector_index():
+    """
+    Get the in-memory index if it reflects the current collection version.
+    
+    Another worker (or the ingest instance) may have changed the collection
+    since this worker's index was built. Then the index is reloaded in a
+    background thread and None is returned meanwhile, so searches fall back
+    to Chroma instead of serving stale results.
+    
+    Returns:
+        The index, or None when it is disabled or being reloaded
+    """
+    global _index_reloading
+    index = get_vector_index()
+    if index is None or index.version is None or index.version == get_collection_version():
+        return index
+    with _index_reload_lock:
+        if not _index_reloading:
+            _index_reloading = True
+            threading.Thread(target=_reload_vector_index, name="vector-index-reload", daemon=True).start()
+    return None
+
+def advance_index_version(index, previous: int, version: int) -> None:
+    """Mark a write applied to the index, if no other write happened since it was current."""
+    if index is not None and index.version == previous:
+        index.version = version
+
+# ===============================================
+# COLLECTION VERSION
+# ===============================================
+
+def get_collection_version() -> int:
+    """
+    Current collection version, bumped on every mutation (upload batch, delete, replace).
+    
+    Every stored chunk also carries the version it was written at in its
+    "version" metadata, so caches can key on (id, version) pairs and only
+    drop entries whose documents actually changed.
+    """
+    if settings.replica_mode:
+        # --- A replica is at the version of the snapshot it serves, not at the ingest side's counter --- #
+        return _collection.version if _collection is not None else 0
+    return int(get_state_store().get_value(COLLECTION_VERSION_KEY) or 0)
+
+def bump_collection_version() -> int:
+    """
+    Atomically increment the collection version (shared across workers) and return it.
+    
+    Writes that stamp records bump once before writing (the stamp) and once
+    after, so a reader that sees a version also sees every write stamped
+    below it.
+    """
+    return get_state_store().increment(COLLECTION_VERSION_KEY)
+
 # ===============================================
 # DATABASE OPERATIONS
 # ===============================================
 
-def search_similar_reviews(question: str):
+def search_similar_reviews(question: str, ef: int = None):
     """
     Search for similar reviews in ChromaDB.
     
     Args:
         question: The search query
+        ef: Optional per-request search breadth; higher trades latency for recall
         
     Returns:
         Tuple of (documents, raw_result)
@@ -87,51 +249,264 @@ def search_similar_reviews(question: str):
         DatabaseException: If search fails
     """
     try:
-        collection = get_collection()
-        result = collection.query(
-            query_texts=[question],
-            n_results=settings.similarity_results
-        )
+        try:
+            query_embedding = MyEmbeddingFunction()([question])[0]
+        except UpstreamUnavailableException:
+            # --- Embeddings are unavailable: degrade to keyword matching if allowed --- #
+            if not settings.lexical_fallback_enabled:
+                raise
+            result = lexical_search(question, settings.similarity_results)
+            return result["documents"][0], result
+        
+        n_results = settings.similarity_results
+        ef = min(ef, settings.max_search_ef) if ef else None
+        index = get_current_vector_index()
+        if index is not None:
+            # --- Hot path: quantized scan in-process, no Chroma round trip; ef can only widen the rescored pool --- #
+            result = index.query(query_embedding, n_results, candidates=ef)
+        else:
+            # --- HNSW searches with max(ef_search, n_results): asking for ef results widens the search --- #
+            collection = get_collection()
+            result = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=max(n_results, ef or 0)
+            )
+            result = {key: [result[key][0][:n_results]] for key in ("ids", "documents", "distances")}
         
         docs = result["documents"][0] if result["documents"] and result["documents"][0] else []
         return docs, result
         
+    except UpstreamUnavailableException:
+        raise
     except Exception as e:
         raise DatabaseException("Failed to search similar reviews", str(e))
 
-def save_documents(docs):
+def lexical_search(question: str, n_results: int) -> dict:
+    """
+    Keyword search used when the embedding service is unavailable.
+    
+    Documents containing any of the query's keywords are ranked by the
+    fraction of keywords they contain; the distance is 1 minus that fraction.
+    
+    Args:
+        question: The search query
+        n_results: Maximum number of results
+        
+    Returns:
+        Result dictionary shaped like ChromaDB's `collection.query` output
+        
+    Raises:
+        DatabaseException: If search fails
+    """
+    try:
+        terms = []
+        for term in re.findall(r"[a-z0-9]+", question.lower()):
+            if len(term) > 2 and term not in _STOPWORDS and term not in terms:
+                terms.append(term)
+        terms = terms[:8]
+        if not terms:
+            return {"ids": [[]], "documents": [[]], "distances": [[]]}
+        
+        # --- $contains is case-sensitive: match the usual capitalizations of every keyword --- #
+        filters = [{"$contains": variant} for term in terms for variant in (term, term.capitalize(), term.upper())]
+        where_document = filters[0] if len(filters) == 1 else {"$or": filters}
+        candidates = get_collection().get(where_document=where_document, include=["documents"])
+        
+        scored = []
+        for doc_id, document in zip(candidates["ids"], candidates["documents"]):
+            text = document.lower()
+            matched = sum(1 for term in terms if term in text)
+            scored.append((1.0 - matched / len(terms), doc_id, document))
+        scored.sort(key=lambda item: item[0])
+        scored = scored[:n_results]
+        
+        return {
+            "ids": [[doc_id for _, doc_id, _ in scored]],
+            "documents": [[document for _, _, document in scored]],
+            "distances": [[distance for distance, _, _ in scored]],
+        }
+    except Exception as e:
+        raise DatabaseException("Failed to run lexical search", str(e))
+
+def search_similar_reviews_batch(query_embeddings, n_results: int = None):
+    """
+    Search for similar reviews for many pre-computed query embeddings at once.
+    
+    Args:
+        query_embeddings: List of query embedding vectors
+        n_results: Results per query (defaults to settings.similarity_results)
+        
+    Returns:
+        List of (documents, raw_result) tuples, one per query, where each
+        raw_result has the same single-query shape as `search_similar_reviews`
+        
+    Raises:
+        DatabaseException: If search fails
+    """
+    n_results = n_results or settings.similarity_results
+    try:
+        index = get_current_vector_index()
+        if index is not None:
+            results = [index.query(embedding, n_results) for embedding in query_embeddings]
+        else:
+            batched = get_collection().query(
+                query_embeddings=[list(embedding) for embedding in query_embeddings],
+                n_results=n_results,
+                include=["documents", "distances"]
+            )
+            results = [
+                {key: [batched[key][i]] for key in ("ids", "documents", "distances")}
+                for i in range(len(query_embeddings))
+            ]
+        
+        return [(result["documents"][0] or [], result) for result in results]
+        
+    except Exception as e:
+        raise DatabaseException("Failed to search similar reviews", str(e))
+
+# --- Cohere embeds at most 96 texts per call --- #
+SAVE_BATCH_SIZE = 96
+
+def save_documents(docs, start_batch: int = 0, on_batch=None, metadata: dict = None, id_prefix: str = None):
     """
     Store documents in ChromaDB with batch processing.
     
+    Chunks are upserted under ids made of `id_prefix` and their position, so
+    re-running a batch of the same upload (e.g. when a job resumes after a
+    crash) is idempotent, while different uploads never overwrite each other.
+    Every batch bumps the collection version and records it in the chunks'
+    metadata.
+    
     Args:
         docs: List of documents to store
+        start_batch: Index of the first batch to store (earlier ones are skipped)
+        on_batch: Optional callback(batch_num, total_batches, batch_len) run after each batch
+        metadata: Optional metadata stored on every chunk (e.g. the ingestion job id)
+        id_prefix: Prefix unique to the upload, e.g. the job id (a random one by default)
         
     Raises:
         DatabaseException: If saving fails
     """
     try:
         collection = get_collection()
+        embedding_function = MyEmbeddingFunction()
+        index = get_vector_index()
         
         # --- Divide documents into batches to avoid memory issues --- #
-        batch_size = 96
+        batch_size = SAVE_BATCH_SIZE
         total_batches = (len(docs) + batch_size - 1) // batch_size
+        id_prefix = id_prefix or uuid.uuid4().hex
         
-        for i in range(0, len(docs), batch_size):
+        for i in range(start_batch * batch_size, len(docs), batch_size):
             batch_docs = docs[i:i + batch_size]
-            batch_ids = [f"chunk_{i+j}_doc_id{i+j}" for j in range(len(batch_docs))]
+            batch_ids = [f"{id_prefix}_chunk_{i+j}" for j in range(len(batch_docs))]
+            
+            # --- Embed once, reuse the vectors for Chroma and the in-memory index --- #
+            batch_embeddings = embedding_function(batch_docs)
             
             # --- Store the batch of documents --- #
-            collection.add(
+            version = bump_collection_version()
+            collection.upsert(
                 documents=batch_docs,
+                embeddings=batch_embeddings,
+                metadatas=[{**(metadata or {}), "version": version}] * len(batch_docs),
                 ids=batch_ids
             )
+            if index is not None:
+                index.upsert(batch_ids, batch_docs, batch_embeddings)
+            advance_index_version(index, version - 1, bump_collection_version())
             
             batch_num = i // batch_size + 1
-            print(f"Batch {batch_num} of {total_batches} saved successfully.")
+            if on_batch is not None:
+                on_batch(batch_num, total_batches, len(batch_docs))
+        
+        # --- Rewrite the index files once per upload, not once per batch --- #
+        if index is not None:
+            index.flush()
             
+    except InterruptedError:
+        # --- Raised by on_batch to stop at a checkpoint (shutdown), not a failure --- #
+        raise
     except Exception as e:
         raise DatabaseException("Failed to save documents to ChromaDB", str(e))
 
+def delete_documents(ids=None, where: dict = None):
+    """
+    Delete documents by id and/or metadata filter.
+    
+    Args:
+        ids: Document ids to delete (unknown ids are ignored)
+        where: Chroma metadata filter, e.g. {"job_id": "..."} to undo an upload
+        
+    Returns:
+        Tuple of (number of deleted documents, collection version)
+        
+    Raises:
+        ValidationException: If neither ids nor a filter is given
+        DatabaseException: If deletion fails
+    """
+    if not ids and not where:
+        raise ValidationException("Nothing to delete", "Pass document ids, a metadata filter or both")
+    try:
+        collection = get_collection()
+        # --- Resolve the filter to ids first, so the count and the in-memory index stay exact --- #
+        matched = collection.get(ids=list(ids) if ids else None, where=where or None, include=[])["ids"]
+        if not matched:
+            return 0, get_collection_version()
+        
+        collection.delete(ids=matched)
+        index = get_vector_index()
+        if index is not None:
+            index.delete(matched)
+            index.flush()
+        version = bump_collection_version()
+        advance_index_version(index, version - 1, version)
+        return len(matched), version
+    except Exception as e:
+        raise DatabaseException("Failed to delete documents", str(e))
+
+def replace_document(document_id: str, content: str, metadata: dict = None) -> int:
+    """
+    Replace the content (and re-embed) an existing document.
+    
+    Args:
+        document_id: Id of the document to replace
+        content: New document text
+        metadata: Optional metadata to merge into the stored metadata
+        
+    Returns:
+        The new collection version
+        
+    Raises:
+        NoResultsException: If the document does not exist
+        DatabaseException: If the replacement fails
+    """
+    try:
+        collection = get_collection()
+        existing = collection.get(ids=[document_id], include=["metadatas"])
+        if not existing["ids"]:
+            raise NoResultsException("Document not found", f"No document with id '{document_id}'")
+        
+        embedding = MyEmbeddingFunction()([content])
+        version = bump_collection_version()
+        collection.upsert(
+            ids=[document_id],
+            documents=[content],
+            embeddings=embedding,
+            metadatas=[{**(existing["metadatas"][0] or {}), **(metadata or {}), "version": version}]
+        )
+        index = get_vector_index()
+        if index is not None:
+            index.upsert([document_id], [content], embedding)
+            index.flush()
+        written = bump_collection_version()
+        advance_index_version(index, version - 1, written)
+        return written
+    except (NoResultsException, UpstreamUnavailableException):
+        raise
+    except Exception as e:
+        raise DatabaseException("Failed to replace document", str(e))
+
 def get_collection_stats():
     """
     Get collection statistics.
@@ -145,6 +520,7 @@ def get_collection_stats():
         return {
             "document_count": count,
             "collection_name": settings.collection_name,
+            "version": get_collection_version(),
             "status": "healthy" if count > 0 else "empty"
         }
     except Exception as e:
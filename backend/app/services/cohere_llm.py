@@ -12,9 +12,19 @@ Handles all LLM operations including embeddings, chat, and translation.
 # ===============================================
 
 import cohere
-from typing import List, Dict, Any
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Any, Optional, TypeVar
+from .chat_history import ChatHistoryCompactor
+from .resilience import CircuitBreaker, RetryPolicy, hedged_call, is_retryable
+from .state_store import get_state_store
 from ..config import settings
-from ..exceptions import LLMException, TranslationException
+from ..exceptions import LLMException, TranslationException, UpstreamUnavailableException
+
+T = TypeVar("T")
+
+# --- The API keeps a single conversation --- #
+DEFAULT_CONVERSATION_ID = "default"
 
 # ===============================================
 # COHERE CLIENT
@@ -24,13 +34,82 @@ class CohereLLMService:
     """Service class for Cohere LLM operations."""
     
     def __init__(self):
-        """Initialize Cohere client."""
+        """Initialize Cohere client with a pooled HTTP transport and resilience policies."""
         try:
-            self.client = cohere.ClientV2(settings.cohere_api_key)
-            self.chat_history: List[Dict[str, str]] = []
+            # --- Keep-alive pool sized for our concurrency, retries are handled below --- #
+            self.http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=settings.cohere_max_connections,
+                    max_keepalive_connections=settings.cohere_max_keepalive_connections
+                ),
+                timeout=httpx.Timeout(settings.cohere_chat_timeout, connect=settings.cohere_connect_timeout)
+            )
+            client_options = {"httpx_client": self.http_client}
+            if settings.cohere_base_url:
+                client_options["base_url"] = settings.cohere_base_url
+            self.client = cohere.ClientV2(settings.cohere_api_key, **client_options)
+            
+            self.retry_policy = RetryPolicy(
+                max_attempts=settings.cohere_max_attempts,
+                base_delay=settings.cohere_retry_base_delay,
+                max_delay=settings.cohere_retry_max_delay
+            )
+            self.circuit_breaker = CircuitBreaker(
+                "Cohere",
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                reset_timeout=settings.circuit_breaker_reset_timeout
+            )
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=settings.cohere_max_connections,
+                thread_name_prefix="cohere-hedge"
+            )
+            # --- History lives in the state store so every worker sees the same conversation --- #
+            self.state_store = get_state_store()
+            self.conversation_id = DEFAULT_CONVERSATION_ID
+            # --- Older turns are summarized in the background so prompts stay a constant size --- #
+            self.history_compactor = ChatHistoryCompactor(
+                self.state_store,
+                self.summarize_text,
+                token_budget=settings.chat_history_token_budget,
+                keep_turns=settings.chat_history_keep_turns,
+                enabled=settings.chat_history_compaction_enabled
+            )
         except Exception as e:
             raise LLMException("Failed to initialize LLM service", str(e))
     
+    def _request_options(self, timeout: float) -> Dict[str, Any]:
+        """Per-call options: our own timeout, and no SDK retries on top of ours."""
+        return {"timeout_in_seconds": timeout, "max_retries": 0}
+    
+    def _resilient_call(self, fn: Callable[[], T], hedge: bool = False) -> T:
+        """
+        Run an upstream call through the circuit breaker and retry policy.
+        
+        Args:
+            fn: Callable performing one upstream request
+            hedge: Fire a duplicate request when the first is slow (idempotent calls only)
+            
+        Returns:
+            The upstream response
+            
+        Raises:
+            UpstreamUnavailableException: If the circuit is open or transient failures outlasted the retries
+        """
+        if hedge:
+            attempt = lambda: hedged_call(self._hedge_executor, fn, settings.cohere_hedge_delay)
+        else:
+            attempt = fn
+        try:
+            return self.circuit_breaker.call(lambda: self.retry_policy.call(attempt))
+        except Exception as e:
+            # --- Timeouts and 5xx after the last retry mean the upstream is unhealthy, not that the request was bad --- #
+            if is_retryable(e):
+                raise UpstreamUnavailableException(
+                    "Cohere is temporarily unavailable",
+                    f"Gave up after {self.retry_policy.max_attempts} attempts: {e}"
+                ) from e
+            raise
+    
     def get_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Get embeddings from Cohere.
@@ -45,13 +124,19 @@ class CohereLLMService:
             LLMException: If embedding generation fails
         """
         try:
-            response = self.client.embed(
-                texts=texts,
-                model=settings.embedding_model,
-                input_type="search_query",
-                embedding_types=["float"],
+            response = self._resilient_call(
+                lambda: self.client.embed(
+                    texts=texts,
+                    model=settings.embedding_model,
+                    input_type="search_query",
+                    embedding_types=["float"],
+                    request_options=self._request_options(settings.cohere_embed_timeout),
+                ),
+                hedge=True
             )
             return response.embeddings.float_
+        except UpstreamUnavailableException:
+            raise
         except Exception as e:
             raise LLMException("Failed to generate embeddings", str(e))
     
@@ -67,8 +152,16 @@ class CohereLLMService:
             Generated response text
         """
         try:
-            response = self.client.chat(model=model, messages=messages)
+            response = self._resilient_call(
+                lambda: self.client.chat(
+                    model=model,
+                    messages=messages,
+                    request_options=self._request_options(settings.cohere_chat_timeout),
+                )
+            )
             return response.message.content[0].text
+        except UpstreamUnavailableException:
+            raise
         except Exception as e:
             raise LLMException("Chat completion failed", str(e))
     
@@ -109,27 +202,29 @@ class CohereLLMService:
             translated_text = self._chat_completion(messages, settings.llm_model)
             return translated_text.strip()
             
+        except UpstreamUnavailableException:
+            raise
         except Exception as e:
             raise TranslationException("Translation failed", str(e))
     
-    def generate_answer(self, question: str, context_reviews: List[str]) -> str:
+    def _answer_system_prompt(self, context_reviews: List[str], history_summary: Optional[str] = None) -> str:
         """
-        Generate answer based on question and context reviews.
+        Build the system prompt that grounds answers in the given reviews.
         
         Args:
-            question: User question
             context_reviews: List of relevant reviews
+            history_summary: Summary of the earlier conversation, if it was compacted
             
         Returns:
-            Generated answer
-            
-        Raises:
-            LLMException: If answer generation fails
+            System prompt text
         """
-        try:
-            context = "\n".join(context_reviews)
-            
-            system_prompt = f"""
+        context = "\n".join(context_reviews)
+        earlier = f"""
+            Summary of the earlier conversation (use it only to understand the question):
+            {history_summary}
+            """ if history_summary else ""
+        
+        return f"""
             You are a specialized system for answering questions about product reviews.
             You must answer the user's question using ONLY the reviews provided below.
 
@@ -142,30 +237,114 @@ class CohereLLMService:
             - Do not use emojis or emoticons
             - Be concise and factual
             - If the question is unrelated to product reviews, say "This question is not related to product reviews."
-            """
+            {earlier}"""
+    
+    def generate_answer(self, question: str, context_reviews: List[str]) -> str:
+        """
+        Generate answer based on question and context reviews.
+        
+        Args:
+            question: User question
+            context_reviews: List of relevant reviews
             
+        Returns:
+            Generated answer
+            
+        Raises:
+            LLMException: If answer generation fails
+        """
+        try:
             # Add to chat history for context
-            self.chat_history.append({"role": "user", "content": question})
+            self.state_store.append_message(self.conversation_id, "user", question)
             
-            messages = [{"role": "system", "content": system_prompt}] + self.chat_history
+            # Only the summary of older turns and the turns it does not cover yet are sent
+            history_summary, recent = self.history_compactor.prompt_history(self.conversation_id)
+            system_prompt = self._answer_system_prompt(context_reviews, history_summary)
+            messages = [{"role": "system", "content": system_prompt}] + recent
             
             answer = self._chat_completion(messages, settings.llm_model)
             
             # Add response to chat history
-            self.chat_history.append({"role": "assistant", "content": answer})
+            self.state_store.append_message(self.conversation_id, "assistant", answer)
+            self.history_compactor.maybe_compact(self.conversation_id)
             
             return answer
             
+        except UpstreamUnavailableException:
+            raise
+        except Exception as e:
+            raise LLMException("Failed to generate answer", str(e))
+    
+    def generate_standalone_answer(self, question: str, context_reviews: List[str]) -> str:
+        """
+        Generate an answer without reading or updating the chat history.
+        Safe to call concurrently from several threads.
+        
+        Args:
+            question: User question
+            context_reviews: List of relevant reviews
+            
+        Returns:
+            Generated answer
+            
+        Raises:
+            LLMException: If answer generation fails
+        """
+        try:
+            messages = [
+                {"role": "system", "content": self._answer_system_prompt(context_reviews)},
+                {"role": "user", "content": question}
+            ]
+            return self._chat_completion(messages, settings.llm_model)
+        except UpstreamUnavailableException:
+            raise
         except Exception as e:
             raise LLMException("Failed to generate answer", str(e))
     
+    def summarize_text(self, instructions: str, text: str) -> str:
+        """
+        Summarize text following the given instructions, without chat history.
+        
+        Args:
+            instructions: System prompt describing the summary to produce
+            text: Text to summarize
+            
+        Returns:
+            Generated summary
+            
+        Raises:
+            LLMException: If summarization fails
+        """
+        messages = [
+            {"role": "system", "content": instructions},
+            {"role": "user", "content": text}
+        ]
+        return self._chat_completion(messages, settings.llm_model).strip()
+    
+    def append_exchange(self, question: str, answer: str) -> None:
+        """
+        Add a question and an answer produced elsewhere (e.g. precomputed) to the chat history.
+        
+        Args:
+            question: User question, in the language answers are generated in
+            answer: Answer to it
+        """
+        self.state_store.append_message(self.conversation_id, "user", question)
+        self.state_store.append_message(self.conversation_id, "assistant", answer)
+        self.history_compactor.maybe_compact(self.conversation_id)
+    
     def clear_chat_history(self) -> None:
         """Clear the chat history."""
-        self.chat_history = []
+        self.state_store.clear_messages(self.conversation_id)
+        self.history_compactor.reset(self.conversation_id)
     
     def get_chat_history(self) -> List[Dict[str, str]]:
         """Get current chat history."""
-        return self.chat_history.copy()
+        return self.state_store.get_messages(self.conversation_id)
+    
+    def get_history_summary(self) -> Optional[str]:
+        """Get the rolling summary of the older turns, if the history was compacted."""
+        return self.history_compactor.get_summary(self.conversation_id)
 
 # ===============================================
 # SERVICE INSTANCE
@@ -0,0 +1,241 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Offline retrieval evaluation for the RAG Chatbot API.
+Runs a labelled question set against a review dump for a grid of chunking
+and retrieval settings, using a deterministic hashing embedder instead of
+Cohere, and reports recall@k, MRR and the prompt tokens each setting costs.
+Grid points are evaluated in parallel worker processes.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import itertools
+import json
+import math
+import re
+import zlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set
+from .ingestion_jobs import split_reviews
+from .preprocessing import preprocess_text
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+# --- Rough English average, good enough to compare settings with each other --- #
+CHARS_PER_TOKEN = 4
+
+_REVIEW_MARKER = re.compile(r"REVIEW\s+(\d+)\s*:", re.IGNORECASE)
+_TOKENS = re.compile(r"[a-z0-9]+")
+
+# ===============================================
+# OFFLINE EMBEDDER
+# ===============================================
+
+class HashingEmbedder:
+    """
+    Deterministic bag-of-words embedder (signed feature hashing of unigrams
+    and bigrams with tf-idf weights), so evaluations need no API calls and
+    give identical numbers on every run.
+    """
+
+    def __init__(self, dimension: int = 1024):
+        self.dimension = dimension
+        self._idf: Dict[int, float] = {}
+
+    def _features(self, text: str) -> Dict[int, float]:
+        words = _TOKENS.findall(text.lower())
+        counts: Dict[int, float] = {}
+        for term in itertools.chain(words, (f"{a} {b}" for a, b in zip(words, words[1:]))):
+            hashed = zlib.crc32(term.encode("utf-8"))
+            counts[hashed] = counts.get(hashed, 0.0) + 1.0
+        return counts
+
+    def fit(self, texts: Sequence[str]) -> "HashingEmbedder":
+        """Learn idf weights from the indexed texts."""
+        document_frequency: Dict[int, int] = {}
+        for text in texts:
+            for hashed in self._features(text):
+                document_frequency[hashed] = document_frequency.get(hashed, 0) + 1
+        self._idf = {hashed: math.log((1 + len(texts)) / (1 + df)) + 1.0 for hashed, df in document_frequency.items()}
+        return self
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into L2-normalized float32 rows."""
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for hashed, count in self._features(text).items():
+                sign = 1.0 if hashed & 0x80000000 else -1.0
+                matrix[row, hashed % self.dimension] += sign * (1.0 + math.log(count)) * self._idf.get(hashed, 1.0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+# ===============================================
+# LABELS AND CHUNKS
+# ===============================================
+
+def load_labelled_queries(path: str) -> List[dict]:
+    """
+    Read a JSON Lines query set: {"question": str, "relevant_reviews": [review numbers]}.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        queries = [json.loads(line) for line in file if line.strip()]
+    return [query for query in queries if query.get("relevant_reviews")]
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def chunk_review_sets(text: str, chunks: Sequence[str]) -> List[Set[int]]:
+    """
+    Review numbers each chunk overlaps, from the "REVIEW n:" markers in the text.
+
+    Chunks are located in the source text in order, so a chunk that starts
+    in the middle of a long review is still attributed to it.
+    """
+    markers = [(match.start(), int(match.group(1))) for match in _REVIEW_MARKER.finditer(text)]
+    starts = np.array([position for position, _ in markers], dtype=np.int64)
+    numbers = [number for _, number in markers]
+
+    review_sets, cursor = [], 0
+    for chunk in chunks:
+        start = text.find(chunk, cursor)
+        if start < 0:
+            start = text.find(chunk)
+        end = start + len(chunk)
+        cursor = max(start + 1, 0)
+        # --- The review open at `start` plus every review that begins inside the chunk --- #
+        first = int(np.searchsorted(starts, start, side="right")) - 1
+        last = int(np.searchsorted(starts, end, side="left"))
+        review_sets.append({numbers[i] for i in range(max(first, 0), last)} if start >= 0 else set())
+    return review_sets
+
+# ===============================================
+# EVALUATION
+# ===============================================
+
+def evaluate_chunking(
+    text: str,
+    queries: List[dict],
+    chunk_size: int,
+    chunk_overlap: int,
+    similarity_results: Sequence[int],
+    dimension: int = 1024,
+) -> List[dict]:
+    """
+    Evaluate one chunking setting for several result counts.
+
+    Args:
+        text: Review dump (already preprocessed if uploads are)
+        queries: Labelled queries (see `load_labelled_queries`)
+        chunk_size: Splitter chunk size
+        chunk_overlap: Splitter chunk overlap
+        similarity_results: Values of k to evaluate
+        dimension: Embedding dimension of the offline embedder
+
+    Returns:
+        One row per k with recall@k, MRR, mean prompt tokens and index size;
+        no rows when none of the labelled reviews is in the text
+    """
+    chunks = split_reviews(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    review_sets = chunk_review_sets(text, chunks)
+
+    # --- Reviews dropped by preprocessing (duplicates) cannot be retrieved, so they are not counted --- #
+    present = {int(number) for number in _REVIEW_MARKER.findall(text)}
+    queries = [
+        {**query, "relevant_reviews": [number for number in query["relevant_reviews"] if number in present]}
+        for query in queries
+    ]
+    queries = [query for query in queries if query["relevant_reviews"]]
+    if not queries:
+        return []
+    embedder = HashingEmbedder(dimension).fit(chunks)
+    chunk_vectors = embedder(chunks)
+    query_vectors = embedder([query["question"] for query in queries])
+
+    max_k = min(max(similarity_results), len(chunks))
+    if max_k == 0:
+        # --- Nothing indexed: every query retrieves nothing --- #
+        ranked = np.empty((len(queries), 0), dtype=np.int64)
+    else:
+        scores = query_vectors @ chunk_vectors.T
+        top = np.argpartition(-scores, max_k - 1, axis=1)[:, :max_k]
+        ranked = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+    chunk_tokens = np.array([estimate_tokens(chunk) for chunk in chunks], dtype=np.int64)
+
+    rows = []
+    for k in sorted(set(similarity_results)):
+        k_eff = min(k, len(chunks))
+        recalls, reciprocal_ranks, prompt_tokens = [], [], []
+        for query, ranking in zip(queries, ranked[:, :k_eff]):
+            relevant = set(query["relevant_reviews"])
+            covered: Set[int] = set()
+            first_hit = 0
+            for rank, chunk_row in enumerate(ranking, start=1):
+                hits = review_sets[chunk_row] & relevant
+                if hits and not first_hit:
+                    first_hit = rank
+                covered |= hits
+            recalls.append(len(covered) / len(relevant))
+            reciprocal_ranks.append(1.0 / first_hit if first_hit else 0.0)
+            prompt_tokens.append(int(chunk_tokens[ranking].sum()) + estimate_tokens(query["question"]))
+        rows.append({
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "similarity_results": k,
+            "recall": round(float(np.mean(recalls)), 4),
+            "mrr": round(float(np.mean(reciprocal_ranks)), 4),
+            "prompt_tokens": round(float(np.mean(prompt_tokens)), 1),
+            "chunks": len(chunks),
+            "index_tokens": int(chunk_tokens.sum()),
+        })
+    return rows
+
+def _evaluate_point(args) -> List[dict]:
+    return evaluate_chunking(*args)
+
+def evaluate_grid(
+    text: str,
+    queries: List[dict],
+    chunk_sizes: Sequence[int],
+    chunk_overlaps: Sequence[int],
+    similarity_results: Sequence[int],
+    processes: int = 1,
+    preprocess: bool = True,
+    dimension: int = 1024,
+) -> List[dict]:
+    """
+    Evaluate every (chunk_size, chunk_overlap, k) combination.
+
+    Each chunking setting is split, embedded and scored in its own worker
+    process; the k values reuse that work.
+
+    Returns:
+        Rows from `evaluate_chunking`, cheapest prompt first
+    """
+    if preprocess:
+        text, _ = preprocess_text(text)
+    points = [
+        (text, queries, size, overlap, list(similarity_results), dimension)
+        for size, overlap in itertools.product(chunk_sizes, chunk_overlaps)
+        if overlap < size
+    ]
+    if processes > 1 and len(points) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(points))) as executor:
+            results = list(executor.map(_evaluate_point, points))
+    else:
+        results = [_evaluate_point(point) for point in points]
+
+    rows = [row for result in results for row in result]
+    return sorted(rows, key=lambda row: (row["prompt_tokens"], -row["recall"]))
+
+def pick_cheapest(rows: List[dict], min_recall: float = 0.0, min_mrr: float = 0.0) -> Optional[dict]:
+    """The row with the fewest prompt tokens that meets both quality targets, if any."""
+    eligible = [row for row in rows if row["recall"] >= min_recall and row["mrr"] >= min_mrr]
+    return min(eligible, key=lambda row: (row["prompt_tokens"], row["index_tokens"])) if eligible else None
@@ -0,0 +1,366 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Background ingestion jobs for the RAG Chatbot API.
+Uploads are queued in a local SQLite database and processed by a pool of
+worker threads that checkpoint after every stored batch, so a crashed or
+restarted server resumes a job instead of starting it over.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import List, Optional
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from .chroma_database import SAVE_BATCH_SIZE, save_documents
+from .precomputed_answers import get_precomputed_answers
+from .preprocessing import preprocess_text
+from .replica import publish_after_change
+from ..config import settings
+from ..exceptions import DatabaseException
+
+logger = logging.getLogger(__name__)
+
+# ===============================================
+# JOB STATUSES
+# ===============================================
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# ===============================================
+# TEXT SPLITTING
+# ===============================================
+
+def split_reviews(text: str, chunk_size: Optional[int] = None, chunk_overlap: Optional[int] = None) -> List[str]:
+    """Split raw review text into chunks, by default using the configured chunk size and overlap."""
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size or settings.chunk_size,
+        chunk_overlap=settings.chunk_overlap if chunk_overlap is None else chunk_overlap
+    )
+    return text_splitter.split_text(text)
+
+# ===============================================
+# JOB STORE
+# ===============================================
+
+class JobStore:
+    """Persistent job table shared by every worker thread and process."""
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the jobs database.
+
+        Args:
+            path: SQLite database file
+
+        Raises:
+            DatabaseException: If the database cannot be initialized
+        """
+        self.path = path
+        self._local = threading.local()
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection().executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    total_chunks INTEGER,
+                    processed_chunks INTEGER NOT NULL DEFAULT 0,
+                    total_batches INTEGER,
+                    next_batch INTEGER NOT NULL DEFAULT 0,
+                    run_started_at REAL,
+                    run_start_chunks INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    worker TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    heartbeat_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+                CREATE TABLE IF NOT EXISTS job_payloads (
+                    job_id TEXT PRIMARY KEY,
+                    text TEXT,
+                    chunks TEXT
+                );
+            """)
+        except Exception as e:
+            raise DatabaseException("Failed to initialize ingestion job store", str(e))
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def enqueue(self, text: str) -> dict:
+        """Queue raw review text for ingestion and return the new job."""
+        job_id = uuid.uuid4().hex
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("INSERT INTO jobs (id, status, created_at) VALUES (?, ?, ?)", (job_id, QUEUED, time.time()))
+            connection.execute("INSERT INTO job_payloads (job_id, text) VALUES (?, ?)", (job_id, text))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def claim_next(self, worker: str) -> Optional[dict]:
+        """Atomically move the oldest queued job to running and return it."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT id, processed_chunks FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            now = time.time()
+            connection.execute(
+                "UPDATE jobs SET status = ?, worker = ?, run_started_at = ?, run_start_chunks = ?, "
+                "started_at = COALESCE(started_at, ?), heartbeat_at = ?, error = NULL WHERE id = ?",
+                (RUNNING, worker, now, row["processed_chunks"], now, now, row["id"])
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return self.get(row["id"])
+
+    def requeue_stale(self, stale_after: float) -> int:
+        """Requeue running jobs whose worker stopped sending heartbeats (crash or restart)."""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = ?, worker = NULL WHERE status = ? AND heartbeat_at < ?",
+            (QUEUED, RUNNING, time.time() - stale_after)
+        )
+        return cursor.rowcount
+
+    def release(self, job_id: str) -> None:
+        """Put a running job back in the queue, keeping its checkpoint."""
+        self._connection().execute("UPDATE jobs SET status = ?, worker = NULL WHERE id = ? AND status = ?", (QUEUED, job_id, RUNNING))
+
+    def retry(self, job_id: str) -> Optional[dict]:
+        """Queue a failed job again; it resumes from its last checkpoint."""
+        self._connection().execute("UPDATE jobs SET status = ? WHERE id = ? AND status = ?", (QUEUED, job_id, FAILED))
+        return self.get(job_id)
+
+    def load_chunks(self, job_id: str) -> Optional[List[str]]:
+        row = self._connection().execute("SELECT chunks FROM job_payloads WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row["chunks"]) if row and row["chunks"] else None
+
+    def load_text(self, job_id: str) -> str:
+        row = self._connection().execute("SELECT text FROM job_payloads WHERE job_id = ?", (job_id,)).fetchone()
+        return row["text"] if row else ""
+
+    def save_chunks(self, job_id: str, chunks: List[str], total_batches: int) -> None:
+        """Persist the split chunks so a resumed job sees exactly the same batches."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # --- The raw text is no longer needed once the chunks are stored --- #
+            connection.execute("UPDATE job_payloads SET chunks = ?, text = NULL WHERE job_id = ?", (json.dumps(chunks), job_id))
+            connection.execute(
+                "UPDATE jobs SET total_chunks = ?, total_batches = ?, heartbeat_at = ? WHERE id = ?",
+                (len(chunks), total_batches, time.time(), job_id)
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def checkpoint(self, job_id: str, next_batch: int, processed_chunks: int) -> None:
+        self._connection().execute(
+            "UPDATE jobs SET next_batch = ?, processed_chunks = ?, heartbeat_at = ? WHERE id = ?",
+            (next_batch, processed_chunks, time.time(), job_id)
+        )
+
+    def heartbeat(self, job_id: str) -> None:
+        self._connection().execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?", (time.time(), job_id, RUNNING))
+
+    def finish(self, job_id: str, error: Optional[str] = None) -> None:
+        self._connection().execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, heartbeat_at = ? WHERE id = ?",
+            (FAILED if error else COMPLETED, error, time.time(), time.time(), job_id)
+        )
+        if not error:
+            self._connection().execute("DELETE FROM job_payloads WHERE job_id = ?", (job_id,))
+
+# ===============================================
+# WORKER POOL
+# ===============================================
+
+class IngestionWorkerPool:
+    """Threads that pull queued jobs and ingest them batch by batch."""
+
+    def __init__(self, store: JobStore, workers: int = 1, stale_after: float = 300.0):
+        self.store = store
+        self.workers = max(1, workers)
+        self.stale_after = stale_after
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Requeue interrupted jobs and start the worker threads."""
+        requeued = self.store.requeue_stale(self.stale_after)
+        if requeued:
+            logger.info("Requeued %d interrupted ingestion job(s)", requeued)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"ingestion-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask workers to stop after their current batch."""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was enqueued."""
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        worker = f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+        last_stale_check = time.monotonic()
+        while not self._stopping.is_set():
+            try:
+                # --- Pick up jobs left behind by a crashed process --- #
+                if time.monotonic() - last_stale_check > self.stale_after / 2:
+                    self.store.requeue_stale(self.stale_after)
+                    last_stale_check = time.monotonic()
+                job = self.store.claim_next(worker)
+            except Exception:
+                logger.exception("Failed to poll the ingestion queue")
+                job = None
+            if job is None:
+                self._wakeup.wait(timeout=1.0)
+                self._wakeup.clear()
+                continue
+            self.process(job)
+
+    def _beat(self, job_id: str, done: threading.Event) -> None:
+        while not done.wait(self.stale_after / 3):
+            try:
+                self.store.heartbeat(job_id)
+            except Exception:
+                logger.exception("Failed to record a heartbeat for job %s", job_id)
+
+    def process(self, job: dict) -> None:
+        """Ingest one claimed job, sending heartbeats until it is done."""
+        # --- Preprocessing, splitting or embedding a batch can outlast stale_after on their own --- #
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._beat, args=(job["id"], done), name=f"heartbeat-{job['id'][:8]}", daemon=True)
+        heartbeat.start()
+        try:
+            self._ingest(job)
+        finally:
+            done.set()
+            heartbeat.join()
+
+    def _ingest(self, job: dict) -> None:
+        """Ingest one claimed job, checkpointing after every batch."""
+        job_id = job["id"]
+        try:
+            chunks = self.store.load_chunks(job_id)
+            if chunks is None:
+                text = self.store.load_text(job_id)
+                if settings.preprocess_uploads:
+                    text, stats = preprocess_text(text, settings.near_duplicate_threshold)
+                    logger.info(
+                        "Job %s: preprocessed %d line(s) into %d review(s), dropped %d exact and %d near duplicate(s) at %.2f MB/s",
+                        job_id, stats["lines_in"], stats["reviews_out"],
+                        stats["exact_duplicates"], stats["near_duplicates"], stats["mb_per_s"]
+                    )
+                chunks = split_reviews(text)
+                total_batches = (len(chunks) + SAVE_BATCH_SIZE - 1) // SAVE_BATCH_SIZE
+                self.store.save_chunks(job_id, chunks, total_batches)
+
+            processed = {"chunks": job["processed_chunks"]}
+
+            def on_batch(batch_num: int, total_batches: int, batch_len: int) -> None:
+                processed["chunks"] += batch_len
+                self.store.checkpoint(job_id, batch_num, processed["chunks"])
+                logger.info("Job %s: batch %d of %d saved", job_id, batch_num, total_batches)
+                if self._stopping.is_set():
+                    raise InterruptedError("Server shutting down")
+
+            save_documents(chunks, start_batch=job["next_batch"], on_batch=on_batch, metadata={"job_id": job_id}, id_prefix=job_id)
+            self.store.finish(job_id)
+            publish_after_change()
+            # --- New reviews can change the answers to frequent questions --- #
+            if settings.precomputed_answers_enabled:
+                get_precomputed_answers().schedule_refresh()
+        except InterruptedError:
+            # --- Graceful shutdown: the next worker resumes from the last checkpoint --- #
+            self.store.release(job_id)
+            logger.info("Job %s released at its last checkpoint", job_id)
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            self.store.finish(job_id, error=getattr(e, "detail", None) or str(e))
+
+# ===============================================
+# SERVICE INSTANCES
+# ===============================================
+
+_job_store = None
+_worker_pool = None
+
+def get_job_store() -> JobStore:
+    """Get or create the job store (singleton pattern)."""
+    global _job_store
+    if _job_store is None:
+        _job_store = JobStore(settings.jobs_db_path)
+    return _job_store
+
+def get_worker_pool() -> IngestionWorkerPool:
+    """Get or create the worker pool (singleton pattern)."""
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = IngestionWorkerPool(
+            get_job_store(),
+            workers=settings.ingestion_workers,
+            stale_after=settings.ingestion_stale_after
+        )
+    return _worker_pool
+
+def describe_job(job: dict) -> dict:
+    """Add derived progress and throughput figures to a job row."""
+    total = job["total_chunks"]
+    processed = job["processed_chunks"]
+    end = job["finished_at"] or time.time()
+    chunks_per_second = None
+    if job["run_started_at"] and end > job["run_started_at"]:
+        chunks_per_second = round((processed - job["run_start_chunks"]) / (end - job["run_started_at"]), 2)
+    return {
+        **job,
+        "progress": round(processed / total, 4) if total else (1.0 if job["status"] == COMPLETED else 0.0),
+        "chunks_per_second": chunks_per_second,
+    }
@@ -0,0 +1,369 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Precomputed answers for frequent questions.
+Counts the questions asked to /questions/ by their normalized text and,
+in the background after every ingestion (or document change), clusters the
+most frequent ones by embedding and answers one representative question per
+cluster with the regular pipeline (translate, retrieve, generate, translate
+back). Any phrasing already seen in a cluster is then answered from the
+stored result, without calling the LLM or the database.
+
+Answers live in the shared state store together with the collection version
+they were computed at, and are only served while that version is current.
+Each worker counts questions in memory and adds its new counts to the shared
+counts in the state store on every refresh, so answers follow the questions
+asked across all workers.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import json
+import logging
+import re
+import threading
+import unicodedata
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from .chroma_database import get_collection_version, search_similar_reviews_batch
+from .cohere_llm import get_llm_service
+from .state_store import get_state_store
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+PRECOMPUTED_ANSWERS_KEY = "precomputed_answers"
+# --- {normalized question: {"count": n, "question": first phrasing}}, summed over every worker --- #
+PRECOMPUTED_COUNTS_KEY = "precomputed_question_counts"
+# --- Bumped on every write, so workers only re-read the answers when they changed --- #
+PRECOMPUTED_REVISION_KEY = "precomputed_answers_revision"
+
+# --- Distinct questions embedded per answer slot, so paraphrases can merge into one cluster --- #
+CANDIDATES_PER_ANSWER = 4
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+_EMPTY_ANSWERS = {"version": None, "answers": {}, "aliases": {}}
+
+# ===============================================
+# QUESTION FREQUENCY
+# ===============================================
+
+def normalize_question(question: str) -> str:
+    """Case, accent, punctuation and whitespace insensitive form of a question."""
+    text = unicodedata.normalize("NFKD", question.casefold())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+class QuestionTracker:
+    """Thread-safe counts of normalized questions not yet merged into the shared counts, with the first phrasing seen of each."""
+
+    def __init__(self, max_tracked: int = 10000):
+        self.max_tracked = max_tracked
+        self._counts: Dict[str, int] = {}
+        self._phrasings: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def record(self, normalized: str, question: str) -> None:
+        with self._lock:
+            self._counts[normalized] = self._counts.get(normalized, 0) + 1
+            self._phrasings.setdefault(normalized, question)
+            if len(self._counts) > self.max_tracked:
+                self._trim()
+
+    def _trim(self) -> None:
+        # --- Keep the most frequent half; one-off questions are the ones dropped --- #
+        keep = sorted(self._counts, key=self._counts.get, reverse=True)[:self.max_tracked // 2]
+        self._counts = {key: self._counts[key] for key in keep}
+        self._phrasings = {key: self._phrasings[key] for key in keep}
+
+    def snapshot(self) -> Dict[str, Tuple[int, str]]:
+        """Current counts as {normalized: (count, phrasing)}."""
+        with self._lock:
+            return {key: (count, self._phrasings[key]) for key, count in self._counts.items()}
+
+    def subtract(self, snapshot: Dict[str, Tuple[int, str]]) -> None:
+        """Remove counts that were merged elsewhere; questions recorded since the snapshot stay."""
+        with self._lock:
+            for key, (count, _) in snapshot.items():
+                remaining = self._counts.get(key, 0) - count
+                if remaining > 0:
+                    self._counts[key] = remaining
+                else:
+                    self._counts.pop(key, None)
+                    self._phrasings.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+def cluster_questions(embeddings: np.ndarray, threshold: float) -> List[List[int]]:
+    """
+    Greedy single-pass clustering of question embeddings.
+
+    Questions are visited in order (most frequent first); each joins the
+    cluster whose first member is the most similar to it, if the cosine
+    similarity reaches `threshold`, and starts a new cluster otherwise.
+
+    Args:
+        embeddings: (n, dim) question embeddings
+        threshold: Minimum cosine similarity to join a cluster
+
+    Returns:
+        Clusters as lists of row indices; the first index of each is its representative
+    """
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    representatives: List[int] = []
+    clusters: List[List[int]] = []
+    for i, vector in enumerate(vectors):
+        if representatives:
+            similarities = vectors[representatives] @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                clusters[best].append(i)
+                continue
+        representatives.append(i)
+        clusters.append([i])
+    return clusters
+
+# ===============================================
+# PRECOMPUTED ANSWERS
+# ===============================================
+
+class PrecomputedAnswers:
+    """Serves stored answers for frequent questions and refreshes them in the background."""
+
+    def __init__(
+        self,
+        top_n: int = 20,
+        min_count: int = 3,
+        cluster_threshold: float = 0.9,
+        concurrency: int = 4,
+        max_tracked: int = 10000,
+    ):
+        """
+        Args:
+            top_n: Question clusters answered in advance
+            min_count: Times a question cluster must have been asked to be answered in advance
+            cluster_threshold: Cosine similarity for two questions to share an answer
+            concurrency: Concurrent LLM calls while refreshing
+            max_tracked: Distinct questions counted before the least frequent are dropped
+        """
+        self.top_n = top_n
+        self.min_count = min_count
+        self.cluster_threshold = cluster_threshold
+        self.concurrency = max(1, concurrency)
+        self.tracker = QuestionTracker(max_tracked)
+        self._cached_revision: Optional[str] = None
+        self._cached = _EMPTY_ANSWERS
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._refresh_again = False
+
+    def _load(self) -> dict:
+        store = get_state_store()
+        revision = store.get_value(PRECOMPUTED_REVISION_KEY)
+        if revision != self._cached_revision:
+            raw = store.get_value(PRECOMPUTED_ANSWERS_KEY)
+            self._cached = json.loads(raw) if raw else _EMPTY_ANSWERS
+            self._cached_revision = revision
+        return self._cached
+
+    def get(self, normalized: str) -> Optional[dict]:
+        """Stored answer for a normalized question, if it is current."""
+        answers = self._load()
+        cluster = answers["aliases"].get(normalized)
+        if cluster is None or answers["version"] != get_collection_version():
+            return None
+        return answers["answers"][cluster]
+
+    def lookup(self, question: str) -> Optional[dict]:
+        """
+        Count a question and return its precomputed answer, if any.
+
+        Args:
+            question: Question as asked by the user
+
+        Returns:
+            Dict with question_en, answer_en, answer (translated back) and the raw
+            search result, or None when the question must go through the live pipeline
+        """
+        normalized = normalize_question(question)
+        self.tracker.record(normalized, question)
+        return self.get(normalized)
+
+    def _merge_counts(self) -> List[Tuple[str, str, int]]:
+        """
+        Add this worker's new question counts to the shared counts.
+
+        Returns:
+            (normalized, phrasing, count) of every question counted by any worker, most frequent first
+        """
+        local = self.tracker.snapshot()
+        max_tracked = self.tracker.max_tracked
+
+        def merge(raw: Optional[str]) -> str:
+            shared = json.loads(raw) if raw else {}
+            for normalized, (count, phrasing) in local.items():
+                entry = shared.setdefault(normalized, {"count": 0, "question": phrasing})
+                entry["count"] += count
+            if len(shared) > max_tracked:
+                # --- Same rule as the tracker: keep the most frequent half --- #
+                keep = sorted(shared, key=lambda key: shared[key]["count"], reverse=True)[:max_tracked // 2]
+                shared = {key: shared[key] for key in keep}
+            return json.dumps(shared, ensure_ascii=False)
+
+        # --- Read, add and write under the store's write lock: concurrent refreshes never lose counts --- #
+        merged = json.loads(get_state_store().update_value(PRECOMPUTED_COUNTS_KEY, merge))
+        self.tracker.subtract(local)
+        ranked = sorted(merged.items(), key=lambda item: item[1]["count"], reverse=True)
+        return [(key, entry["question"], entry["count"]) for key, entry in ranked]
+
+    def tracked_questions(self) -> int:
+        """Distinct questions counted by any worker, including this worker's unmerged ones."""
+        raw = get_state_store().get_value(PRECOMPUTED_COUNTS_KEY)
+        return len(set(json.loads(raw) if raw else {}) | set(self.tracker.snapshot()))
+
+    def entries(self) -> List[dict]:
+        """Summary of the stored answers, most asked first."""
+        answers = self._load()
+        current = answers["version"] == get_collection_version()
+        return [
+            {
+                "question": entry["question"],
+                "count": entry["count"],
+                "phrasings": entry["phrasings"],
+                "version": answers["version"],
+                "current": current,
+            }
+            for entry in sorted(answers["answers"].values(), key=lambda entry: entry["count"], reverse=True)
+        ]
+
+    def schedule_refresh(self) -> None:
+        """Refresh in a background thread; requests made during a refresh coalesce into one more run."""
+        with self._refresh_lock:
+            if self._refreshing:
+                self._refresh_again = True
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_loop, name="precomputed-answers", daemon=True).start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            try:
+                stored = self.refresh()
+                logger.info("Precomputed answers refreshed: %d answer(s)", stored)
+            except Exception:
+                logger.exception("Failed to refresh precomputed answers")
+            with self._refresh_lock:
+                if not self._refresh_again:
+                    self._refreshing = False
+                    return
+                self._refresh_again = False
+
+    def _answer(self, questions: List[str]) -> List[Optional[dict]]:
+        """Run the /questions/ pipeline, without chat history, for every question."""
+        llm_service = get_llm_service()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            questions_en = list(executor.map(lambda text: llm_service.translate_text(text, target_language="English"), questions))
+            # --- Retrieval for every question at once: one embed call, one collection query --- #
+            retrieved = search_similar_reviews_batch(llm_service.get_embeddings(questions_en))
+
+            def answer(question_en: str, docs: List[str], result: dict) -> Optional[dict]:
+                if not docs:
+                    return None
+                answer_en = llm_service.generate_standalone_answer(question_en, docs)
+                return {
+                    "question_en": question_en,
+                    "answer_en": answer_en,
+                    "answer": llm_service.translate_text(answer_en, target_language="Spanish"),
+                    # --- Only what format_search_results reads, as plain JSON types --- #
+                    "result": {
+                        "ids": [list(result["ids"][0])],
+                        "documents": [list(result["documents"][0])],
+                        "distances": [[float(distance) for distance in result["distances"][0]]],
+                    },
+                }
+
+            return list(executor.map(lambda item: answer(item[0], *item[1]), zip(questions_en, retrieved)))
+
+    def refresh(self) -> int:
+        """
+        Merge this worker's question counts into the shared ones and recompute
+        the answers of the most frequent question clusters.
+
+        Answers already computed at the current collection version are reused.
+
+        Returns:
+            Number of answers stored
+        """
+        version = get_collection_version()
+        candidates = self._merge_counts()[:self.top_n * CANDIDATES_PER_ANSWER]
+        answers, aliases = {}, {}
+
+        if candidates:
+            embeddings = get_llm_service().get_embeddings([phrasing for _, phrasing, _ in candidates])
+            clusters = cluster_questions(np.asarray(embeddings), self.cluster_threshold)
+            # --- Rare phrasings still count towards the cluster of a frequent question --- #
+            counts = [sum(candidates[i][2] for i in members) for members in clusters]
+            clusters = [members for members, count in sorted(zip(clusters, counts), key=lambda item: item[1], reverse=True) if count >= self.min_count]
+
+            previous = self._load()
+            reusable = previous["answers"] if previous["version"] == version else {}
+            pending = []
+            for members in clusters[:self.top_n]:
+                cluster_id, phrasing, _ = candidates[members[0]]
+                entry = {
+                    "question": phrasing,
+                    "count": sum(candidates[i][2] for i in members),
+                    "phrasings": len(members),
+                }
+                for i in members:
+                    aliases[candidates[i][0]] = cluster_id
+                if cluster_id in reusable:
+                    answers[cluster_id] = {**reusable[cluster_id], **entry}
+                else:
+                    answers[cluster_id] = entry
+                    pending.append(cluster_id)
+
+            if pending:
+                for cluster_id, computed in zip(pending, self._answer([answers[cluster_id]["question"] for cluster_id in pending])):
+                    if computed is None:
+                        # --- No reviews for it: let the live pipeline answer (and report) it --- #
+                        del answers[cluster_id]
+                    else:
+                        answers[cluster_id].update(computed)
+            aliases = {alias: cluster_id for alias, cluster_id in aliases.items() if cluster_id in answers}
+
+        store = get_state_store()
+        store.set_value(PRECOMPUTED_ANSWERS_KEY, json.dumps({"version": version, "answers": answers, "aliases": aliases}, ensure_ascii=False))
+        store.increment(PRECOMPUTED_REVISION_KEY)
+        return len(answers)
+
+# ===============================================
+# SERVICE INSTANCE
+# ===============================================
+
+_precomputed_answers = None
+
+def get_precomputed_answers() -> PrecomputedAnswers:
+    """Get or create the precomputed answers service (singleton pattern)."""
+    global _precomputed_answers
+    if _precomputed_answers is None:
+        _precomputed_answers = PrecomputedAnswers(
+            top_n=settings.precomputed_answers_top_n,
+            min_count=settings.precomputed_answers_min_count,
+            cluster_threshold=settings.precomputed_answers_cluster_threshold,
+            concurrency=settings.precomputed_answers_concurrency,
+            max_tracked=settings.precomputed_answers_max_tracked,
+        )
+    return _precomputed_answers
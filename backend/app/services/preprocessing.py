@@ -0,0 +1,296 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Streaming review preprocessing for the RAG Chatbot API.
+Normalizes whitespace, strips boilerplate, repairs encoding problems and
+drops exact and near-duplicate reviews (MinHash + LSH) in a single pass over
+a generator of lines, optionally spreading the per-line work over processes.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import hashlib
+import re
+import time
+import unicodedata
+import zlib
+import numpy as np
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+# --- Marker that prefixes every review in our dumps, ignored when comparing reviews --- #
+RECORD_PREFIX = re.compile(r"^\s*REVIEW\s+\d+\s*:\s*", re.IGNORECASE)
+
+# --- Alternatives of a single regex, so every line is scanned once --- #
+BOILERPLATE = re.compile("|".join([
+    r"<[^>]{1,200}>",
+    r"\b\d+\s+(?:people|person)\s+found\s+this\s+(?:review\s+)?helpful\.?",
+    r"\bwas\s+this\s+review\s+helpful\s*(?:to\s+you)?\s*\??",
+    r"\bverified\s+purchase\b",
+    r"\bread\s+more\b\.*",
+]), re.IGNORECASE)
+
+# --- Cheap substring checks: the regex only runs on lines that contain one of these --- #
+_BOILERPLATE_HINTS = ("<", "helpful", "purchase", "read more")
+
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b-\x1f\x7f-\x9f]")
+_WORDS = re.compile(r"\w+")
+
+# --- Sequences that show up when utf-8 text was decoded as cp1252/latin-1 --- #
+_MOJIBAKE_MARKERS = ("Ã", "Â", "â€")
+
+# --- MinHash parameters: 64 permutations in 8 bands of 8 rows (~0.77 LSH threshold) --- #
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 8
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD_HASH_CACHE_SIZE = 200_000
+_WORD_HASHES: Dict[str, int] = {}
+_PERMUTATION_RNG = np.random.default_rng(1)
+_PERM_A = _PERMUTATION_RNG.integers(1, _MERSENNE_PRIME, size=NUM_PERMUTATIONS, dtype=np.int64)
+_PERM_B = _PERMUTATION_RNG.integers(0, _MERSENNE_PRIME, size=NUM_PERMUTATIONS, dtype=np.int64)
+
+# ===============================================
+# NORMALIZATION
+# ===============================================
+
+def fix_encoding(line: Union[bytes, str]) -> str:
+    """
+    Decode a raw line and repair common mojibake.
+
+    Bytes are decoded as utf-8, falling back to cp1252; text that looks like
+    utf-8 mis-decoded as cp1252 (e.g. "cafÃ©") is re-decoded.
+    """
+    if isinstance(line, bytes):
+        try:
+            line = line.decode("utf-8")
+        except UnicodeDecodeError:
+            line = line.decode("cp1252", errors="replace")
+
+    if any(marker in line for marker in _MOJIBAKE_MARKERS):
+        try:
+            line = line.encode("cp1252").decode("utf-8")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return line
+
+def normalize_review(line: Union[bytes, str]) -> str:
+    """Fix encoding, normalize unicode, strip boilerplate and collapse whitespace."""
+    text = _CONTROL_CHARS.sub(" ", unicodedata.normalize("NFKC", fix_encoding(line)))
+    lowered = text.lower()
+    if any(hint in lowered for hint in _BOILERPLATE_HINTS):
+        text = BOILERPLATE.sub(" ", text)
+    return " ".join(text.split())
+
+# ===============================================
+# DUPLICATE DETECTION
+# ===============================================
+
+def dedup_body(text: str) -> str:
+    """Text used to compare reviews: no record prefix, case-insensitive."""
+    return RECORD_PREFIX.sub("", text).lower()
+
+def _word_hash(word: str) -> int:
+    """Stable (process-independent) 32-bit word hash, memoized since review vocabularies are small."""
+    value = _WORD_HASHES.get(word)
+    if value is None:
+        value = zlib.crc32(word.encode("utf-8"))
+        if len(_WORD_HASHES) < _WORD_HASH_CACHE_SIZE:
+            _WORD_HASHES[word] = value
+    return value
+
+def minhash_signature(body: str, shingle_size: int = 3) -> np.ndarray:
+    """
+    MinHash signature of the word shingles of a review.
+
+    Args:
+        body: Review text (see `dedup_body`)
+        shingle_size: Words per shingle
+
+    Returns:
+        int64 array of NUM_PERMUTATIONS minimum hash values
+    """
+    words = _WORDS.findall(body) or [""]
+    # --- Hash every word once, then combine word hashes into shingle hashes vectorized --- #
+    word_hashes = np.fromiter((_word_hash(word) for word in words), dtype=np.int64, count=len(words))
+    width = min(shingle_size, len(word_hashes))
+    hashes = np.zeros(len(word_hashes) - width + 1, dtype=np.int64)
+    for offset in range(width):
+        hashes = (hashes * 1000003 + word_hashes[offset:offset + len(hashes)]) & 0xFFFFFFFF
+    hashes = np.unique(hashes)
+
+    # --- (a * h + b) mod p for every permutation and shingle, then the minimum per permutation --- #
+    return ((_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+def prepare_line(line: Union[bytes, str]) -> Optional[Tuple[str, bytes, np.ndarray]]:
+    """
+    Per-line work that needs no shared state (safe to run in worker processes).
+
+    Returns:
+        (normalized text, exact-duplicate key, MinHash signature), or None for blank lines
+    """
+    text = normalize_review(line)
+    if not text:
+        return None
+    body = dedup_body(text)
+    return text, hashlib.blake2b(body.encode("utf-8"), digest_size=16).digest(), minhash_signature(body)
+
+def _prepare_batch(lines: List[bytes]) -> List[Optional[Tuple[str, bytes, np.ndarray]]]:
+    return [prepare_line(line) for line in lines]
+
+# ===============================================
+# PREPROCESSOR
+# ===============================================
+
+class ReviewPreprocessor:
+    """
+    Single-pass review cleaner with exact and near-duplicate removal.
+
+    Normalization and signatures can run in worker processes; duplicate
+    detection keeps its state (hash set and LSH buckets) in this process.
+    """
+
+    def __init__(self, near_duplicate_threshold: float = 0.8, processes: int = 1, batch_lines: int = 2000):
+        """
+        Args:
+            near_duplicate_threshold: Estimated Jaccard similarity above which a review is a near duplicate
+            processes: Worker processes for normalization (1 keeps everything in-process)
+            batch_lines: Lines sent to a worker at a time
+        """
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.processes = max(1, processes)
+        self.batch_lines = batch_lines
+        self._seen_exact = set()
+        self._buckets: List[Dict[bytes, int]] = [{} for _ in range(LSH_BANDS)]
+        self._signatures: List[np.ndarray] = []
+        self.stats = {
+            "bytes_in": 0, "lines_in": 0, "reviews_out": 0,
+            "exact_duplicates": 0, "near_duplicates": 0, "elapsed_s": 0.0, "mb_per_s": 0.0,
+        }
+
+    def _is_near_duplicate(self, signature: np.ndarray) -> bool:
+        rows = NUM_PERMUTATIONS // LSH_BANDS
+        keys = [signature[band * rows:(band + 1) * rows].tobytes() for band in range(LSH_BANDS)]
+        candidates = {self._buckets[band][key] for band, key in enumerate(keys) if key in self._buckets[band]}
+        for candidate in candidates:
+            if np.mean(self._signatures[candidate] == signature) >= self.near_duplicate_threshold:
+                return True
+
+        position = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, position)
+        return False
+
+    def _accept(self, prepared: Optional[Tuple[str, bytes, np.ndarray]]) -> Optional[str]:
+        if prepared is None:
+            return None
+        text, exact_key, signature = prepared
+        if exact_key in self._seen_exact:
+            self.stats["exact_duplicates"] += 1
+            return None
+        self._seen_exact.add(exact_key)
+        if self._is_near_duplicate(signature):
+            self.stats["near_duplicates"] += 1
+            return None
+        self.stats["reviews_out"] += 1
+        return text
+
+    def _batches(self, lines: Iterable[Union[bytes, str]]) -> Iterator[List[Union[bytes, str]]]:
+        batch = []
+        for line in lines:
+            self.stats["lines_in"] += 1
+            self.stats["bytes_in"] += len(line) if isinstance(line, bytes) else len(line.encode("utf-8"))
+            batch.append(line)
+            if len(batch) >= self.batch_lines:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def process(self, lines: Iterable[Union[bytes, str]]) -> Iterator[str]:
+        """
+        Clean a stream of lines (one review per line), yielding kept reviews in order.
+
+        Args:
+            lines: Iterable of raw lines, bytes or str
+
+        Yields:
+            Normalized, de-duplicated reviews
+        """
+        start = time.perf_counter()
+        try:
+            if self.processes == 1:
+                prepared_batches = map(_prepare_batch, self._batches(lines))
+                for prepared_batch in prepared_batches:
+                    for prepared in prepared_batch:
+                        text = self._accept(prepared)
+                        if text is not None:
+                            yield text
+            else:
+                with Pool(self.processes) as pool:
+                    # --- imap keeps input order, so "first occurrence wins" stays deterministic --- #
+                    for prepared_batch in pool.imap(_prepare_batch, self._batches(lines)):
+                        for prepared in prepared_batch:
+                            text = self._accept(prepared)
+                            if text is not None:
+                                yield text
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats["elapsed_s"] = round(elapsed, 3)
+            self.stats["mb_per_s"] = round(self.stats["bytes_in"] / 1e6 / elapsed, 2) if elapsed > 0 else 0.0
+
+# ===============================================
+# CONVENIENCE FUNCTIONS
+# ===============================================
+
+def preprocess_text(text: str, near_duplicate_threshold: float = 0.8) -> Tuple[str, dict]:
+    """
+    Clean an uploaded review dump held in memory.
+
+    Args:
+        text: Raw reviews, one per line
+        near_duplicate_threshold: See ReviewPreprocessor
+
+    Returns:
+        Tuple of (cleaned text with reviews separated by blank lines, stats)
+    """
+    preprocessor = ReviewPreprocessor(near_duplicate_threshold=near_duplicate_threshold)
+    cleaned = "\n\n".join(preprocessor.process(text.splitlines()))
+    return cleaned, preprocessor.stats
+
+def preprocess_file(
+    input_path: str,
+    output_path: str,
+    processes: int = 1,
+    near_duplicate_threshold: float = 0.8,
+) -> dict:
+    """
+    Clean a review dump file, streaming it line by line.
+
+    Args:
+        input_path: Raw dump, one review per line (any encoding issues are repaired)
+        output_path: Destination, reviews separated by blank lines
+        processes: Worker processes for normalization
+        near_duplicate_threshold: See ReviewPreprocessor
+
+    Returns:
+        Preprocessing stats, including throughput in MB/s
+    """
+    preprocessor = ReviewPreprocessor(near_duplicate_threshold=near_duplicate_threshold, processes=processes)
+    with open(input_path, "rb") as source, open(output_path, "w", encoding="utf-8") as destination:
+        first = True
+        for review in preprocessor.process(source):
+            if not first:
+                destination.write("\n\n")
+            destination.write(review)
+            first = False
+        destination.write("\n")
+    return preprocessor.stats
@@ -0,0 +1,349 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Request profiling for the RAG Chatbot API.
+Times the stages of every request (admission wait, translation, retrieval,
+generation, formatting) and keeps the slowest recent requests. Requests can
+also be profiled with a sampling profiler that periodically captures the
+stack of the threads running the request and exports it as a speedscope or
+collapsed-stack (flamegraph.pl) file.
+
+Sampling costs nothing unless a request is profiled: no tracing hooks are
+installed, a background thread only reads the stacks every few milliseconds.
+Blocking work runs in threadpool workers, which carry the request's context:
+every stage attaches the thread it runs on to the request's profiler, and
+the event loop thread is sampled while no stage is running elsewhere. The
+event loop thread is shared, so those samples also contain any other
+request that ran on it at the same time.
+
+State is per worker process.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import heapq
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, List, Optional, Tuple
+from ..config import settings
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+MAX_STACK_DEPTH = 256
+
+# --- Time not covered by any stage (middleware, validation, serialization) --- #
+OTHER_STAGE = "other"
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("current_trace", default=None)
+
+# ===============================================
+# STAGE TIMING
+# ===============================================
+
+class RequestTrace:
+    """Wall-clock duration of one request and of its named stages."""
+
+    def __init__(self, method: str, path: str, profiler: Optional["SamplingProfiler"] = None):
+        self.method = method
+        self.path = path
+        self.profiler = profiler
+        self.profile_id = profiler.profile_id if profiler else None
+        self.started_at = time.time()
+        self.status: Optional[int] = None
+        self.duration_ms = 0.0
+        self.stages: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    def add_stage(self, name: str, elapsed_ms: float) -> None:
+        # --- Stages entered more than once (e.g. two translations) accumulate --- #
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    def finish(self, status: int) -> None:
+        self.status = status
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+
+    def to_dict(self) -> dict:
+        stages = {name: round(ms, 2) for name, ms in self.stages.items()}
+        stages[OTHER_STAGE] = round(max(0.0, self.duration_ms - sum(self.stages.values())), 2)
+        return {
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 2),
+            "started_at": self.started_at,
+            "stages": stages,
+            "profile_id": self.profile_id,
+        }
+
+def start_trace(method: str, path: str, profiler: Optional["SamplingProfiler"] = None) -> Tuple[RequestTrace, Token]:
+    """Make a new trace the current one for this request's context."""
+    trace = RequestTrace(method, path, profiler)
+    return trace, _current_trace.set(trace)
+
+def end_trace(token: Token) -> None:
+    _current_trace.reset(token)
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as a named stage of the current request (no-op outside a request).
+
+    When the request is profiled, the calling thread (a threadpool worker for
+    blocking calls) is sampled for the duration of the block.
+
+    Args:
+        name: Stage name shown in the slow request breakdown
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    if trace.profiler:
+        trace.profiler.attach(thread_id)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_stage(name, (time.perf_counter() - start) * 1000)
+        if trace.profiler:
+            trace.profiler.detach(thread_id)
+
+# ===============================================
+# SAMPLING PROFILER
+# ===============================================
+
+def _short_path(path: str) -> str:
+    """Trim site-packages and working directory prefixes from a source path."""
+    marker = "site-packages" + os.sep
+    if marker in path:
+        return path.split(marker, 1)[1]
+    cwd = os.getcwd() + os.sep
+    return path[len(cwd):] if path.startswith(cwd) else path
+
+class Profile:
+    """Stack samples of one request; frames are interned and stacks stored root first."""
+
+    def __init__(self, profile_id: str, name: str, frames: List[Tuple[str, str, int]], samples: List[Tuple[int, ...]], weights: List[float], started_at: float):
+        self.profile_id = profile_id
+        self.name = name
+        self.frames = frames
+        self.samples = samples
+        self.weights = weights
+        self.started_at = started_at
+
+    @property
+    def duration_ms(self) -> float:
+        return sum(self.weights)
+
+    def summary(self) -> dict:
+        return {
+            "profile_id": self.profile_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "samples": len(self.samples),
+            "duration_ms": round(self.duration_ms, 2),
+        }
+
+    def _frame_label(self, index: int) -> str:
+        function, path, line = self.frames[index]
+        return f"{function} ({_short_path(path)}:{line})"
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one `root;...;leaf count` line per distinct stack (flamegraph.pl, speedscope)."""
+        counts: Dict[Tuple[int, ...], int] = {}
+        for sample in self.samples:
+            counts[sample] = counts.get(sample, 0) + 1
+        labels = [self._frame_label(index).replace(";", ":") for index in range(len(self.frames))]
+        lines = [f"{';'.join(labels[index] for index in sample)} {count}" for sample, count in counts.items()]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict:
+        """Sampled profile in the speedscope file format, weighted by measured wall time."""
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": self.name,
+            "exporter": settings.app_name,
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": function, "file": _short_path(path), "line": line}
+                    for function, path, line in self.frames
+                ]
+            },
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(self.duration_ms, 3),
+                "samples": [list(sample) for sample in self.samples],
+                "weights": [round(weight, 3) for weight in self.weights],
+            }],
+        }
+
+class SamplingProfiler:
+    """Background thread that samples the stacks of a request's threads at a fixed interval."""
+
+    def __init__(self, profile_id: str, name: str, thread_id: int, interval: float):
+        """
+        Args:
+            profile_id: Id the finished profile is stored under
+            name: Human readable profile name (method and path)
+            thread_id: Identifier of the thread the request starts on (the event loop thread)
+            interval: Seconds between samples
+        """
+        self.profile_id = profile_id
+        self.name = name
+        self.thread_id = thread_id
+        self.interval = interval
+        # --- Threads running a stage of the request -> nested stages on them --- #
+        self._attached: Dict[int, int] = {}
+        self._attached_lock = threading.Lock()
+        self._frame_index: Dict[Tuple[str, str, int], int] = {}
+        self._frames: List[Tuple[str, str, int]] = []
+        self._samples: List[Tuple[int, ...]] = []
+        self._weights: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{profile_id}", daemon=True)
+        self._started_at = time.time()
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def attach(self, thread_id: int) -> None:
+        """Sample `thread_id` until the matching `detach`."""
+        with self._attached_lock:
+            self._attached[thread_id] = self._attached.get(thread_id, 0) + 1
+
+    def detach(self, thread_id: int) -> None:
+        with self._attached_lock:
+            if self._attached.get(thread_id, 0) > 1:
+                self._attached[thread_id] -= 1
+            else:
+                self._attached.pop(thread_id, None)
+
+    def _sampled_threads(self) -> List[int]:
+        with self._attached_lock:
+            workers = [thread_id for thread_id in self._attached if thread_id != self.thread_id]
+        # --- While a worker runs a blocking stage the loop only waits for it, so it is left out --- #
+        return workers or [self.thread_id]
+
+    def _stack(self, frame) -> Tuple[int, ...]:
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self._frames)
+                self._frames.append(key)
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            for thread_id in self._sampled_threads():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self._samples.append(self._stack(frame))
+                    # --- Weight by real elapsed time: the GIL can delay samples past the interval --- #
+                    self._weights.append((now - last) * 1000)
+            last = now
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        self._thread.join()
+        return Profile(self.profile_id, self.name, self._frames, self._samples, self._weights, self._started_at)
+
+# ===============================================
+# REQUEST PROFILER
+# ===============================================
+
+class RequestProfiler:
+    """Rolling window of recent request traces plus the last profiles captured."""
+
+    def __init__(self, window: int, max_profiles: int, sample_rate: float = 0.0, interval_ms: float = 5.0):
+        """
+        Args:
+            window: Recent requests the slowest are picked from
+            max_profiles: Profiles kept for download (oldest dropped first)
+            sample_rate: Fraction of requests profiled without being asked to
+            interval_ms: Milliseconds between stack samples
+        """
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.max_profiles = max_profiles
+        self._recent = deque(maxlen=window)
+        self._profiles: "OrderedDict[str, Profile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start_profiler(self, name: str) -> SamplingProfiler:
+        """Start sampling the calling thread (the event loop thread the request starts on)."""
+        return SamplingProfiler(uuid.uuid4().hex[:12], name, threading.get_ident(), self.interval).start()
+
+    def record(self, trace: RequestTrace, profile: Optional[Profile] = None) -> None:
+        with self._lock:
+            self._recent.append(trace.to_dict())
+            if profile is not None:
+                self._profiles[profile.profile_id] = profile
+                while len(self._profiles) > self.max_profiles:
+                    self._profiles.popitem(last=False)
+
+    def slowest(self, limit: int) -> List[dict]:
+        """Slowest requests of the window, slowest first, with their stage breakdown."""
+        with self._lock:
+            return heapq.nlargest(limit, self._recent, key=lambda entry: entry["duration_ms"])
+
+    @property
+    def window_size(self) -> int:
+        return len(self._recent)
+
+    def profiles(self) -> List[dict]:
+        with self._lock:
+            return [profile.summary() for profile in reversed(self._profiles.values())]
+
+    def get_profile(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+# ===============================================
+# PROFILER INSTANCE
+# ===============================================
+
+_request_profiler = None
+
+def get_request_profiler() -> RequestProfiler:
+    """Get or create the request profiler (singleton pattern)."""
+    global _request_profiler
+    if _request_profiler is None:
+        _request_profiler = RequestProfiler(
+            window=settings.slow_requests_window,
+            max_profiles=settings.profiling_max_profiles,
+            sample_rate=settings.profiling_sample_rate,
+            interval_ms=settings.profiling_interval_ms,
+        )
+    return _request_profiler
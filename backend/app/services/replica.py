@@ -0,0 +1,274 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Read-only query replicas for the RAG Chatbot API.
+The ingest instance (PUBLISH_SNAPSHOTS=true) publishes a memory-mappable
+snapshot of the collection after every ingestion job or document change.
+Replicas (REPLICA_MODE=true) never open Chroma: they serve searches,
+questions and summaries from the newest published snapshot, poll for a new
+one and switch to it atomically, and refuse writes. Embedding and write load
+from big uploads therefore stays on the ingest instance, and replicas can be
+added behind a load balancer as query traffic grows.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+from .chroma_database import set_collection
+from .precomputed_answers import get_precomputed_answers
+from .snapshot import current_snapshot_name, open_published_snapshot, publish_snapshot
+from .vector_index import set_vector_index
+from ..config import settings
+from ..exceptions import DatabaseException, ReadOnlyReplicaException
+
+logger = logging.getLogger(__name__)
+
+# ===============================================
+# WRITE GUARD
+# ===============================================
+
+def ensure_writable() -> None:
+    """
+    Refuse writes on read-only replicas.
+
+    Raises:
+        ReadOnlyReplicaException: If this instance runs in replica mode
+    """
+    if settings.replica_mode:
+        raise ReadOnlyReplicaException(
+            "This instance is a read-only replica",
+            "Send uploads and document changes to the ingestion instance"
+        )
+
+# ===============================================
+# SNAPSHOT COLLECTION
+# ===============================================
+
+def _matches(where_document: dict, text: str) -> bool:
+    """Evaluate the subset of Chroma document filters used by the lexical search."""
+    if "$contains" in where_document:
+        return where_document["$contains"] in text
+    if "$or" in where_document:
+        return any(_matches(condition, text) for condition in where_document["$or"])
+    if "$and" in where_document:
+        return all(_matches(condition, text) for condition in where_document["$and"])
+    raise DatabaseException("Unsupported document filter on a replica", json.dumps(where_document))
+
+class SnapshotCollection:
+    """Read-only stand-in for a Chroma collection, backed by a published snapshot."""
+
+    def __init__(self, snapshot: dict):
+        """
+        Args:
+            snapshot: Result of `open_published_snapshot`
+        """
+        manifest = snapshot["manifest"]
+        self.manifest = manifest
+        self.name = manifest["collection_name"]
+        self.version = manifest["version"]
+        self.index = snapshot["index"]
+        self._metadatas = snapshot["metadatas"]
+
+    def count(self) -> int:
+        return len(self.index)
+
+    def get(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[dict] = None,
+        where_document: Optional[dict] = None,
+        include: Sequence[str] = ("documents", "metadatas"),
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Dict[str, object]:
+        """Same result shape as `Collection.get`; metadata filters are not supported."""
+        if where:
+            raise DatabaseException("Metadata filters are not supported on a replica", json.dumps(where))
+        if ids is not None:
+            rows = self.index.rows(ids)
+        elif where_document:
+            rows = [row for row in range(len(self.index)) if _matches(where_document, self.index.documents[row])]
+        else:
+            rows = range(len(self.index))
+        rows = list(rows[offset:offset + limit] if limit is not None else rows[offset:])
+
+        result = {"ids": [self.index.ids[row] for row in rows], "documents": None, "metadatas": None, "embeddings": None}
+        if "documents" in include:
+            result["documents"] = [self.index.documents[row] for row in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [json.loads(meta) if meta else None for meta in (self._metadatas[row] for row in rows)]
+        if "embeddings" in include:
+            result["embeddings"] = self.index.embeddings(rows)
+        return result
+
+    def query(self, query_embeddings: List[Sequence[float]], n_results: int = 10, **kwargs) -> Dict[str, list]:
+        """Same result shape as `Collection.query`, answered by the snapshot's quantized index."""
+        results = [self.index.query(embedding, n_results) for embedding in query_embeddings]
+        return {key: [result[key][0] for result in results] for key in ("ids", "documents", "distances")}
+
+    def _read_only(self, *args, **kwargs):
+        ensure_writable()
+        raise ReadOnlyReplicaException("Snapshot collections are read-only")
+
+    add = upsert = update = delete = modify = _read_only
+
+# ===============================================
+# REPLICA
+# ===============================================
+
+class SnapshotReplica:
+    """Serves the live published snapshot and switches to newer ones from a background thread."""
+
+    def __init__(self, publish_dir: str, poll_interval: float = 5.0):
+        """
+        Args:
+            publish_dir: Directory the ingest instance publishes to
+            poll_interval: Seconds between checks for a new snapshot
+        """
+        self.publish_dir = publish_dir
+        self.poll_interval = poll_interval
+        self.collection: Optional[SnapshotCollection] = None
+        self.loaded_at: Optional[float] = None
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def reload(self) -> bool:
+        """
+        Switch to the live published snapshot if it changed.
+
+        Returns:
+            Whether a new snapshot was installed
+
+        Raises:
+            DatabaseException: If the snapshot cannot be opened (the current one stays in use)
+        """
+        with self._lock:
+            name = current_snapshot_name(self.publish_dir)
+            if name is None or (self.collection is not None and self.collection.manifest["name"] == name):
+                return False
+            collection = SnapshotCollection(open_published_snapshot(name, self.publish_dir))
+
+            # --- Reference swaps: in-flight requests finish on the old snapshot, new ones see the new one --- #
+            set_collection(collection)
+            set_vector_index(collection.index)
+            self.collection = collection
+            self.loaded_at = time.time()
+            self.reloads += 1
+            self.last_error = None
+
+        logger.info("Serving snapshot %s (version %d, %d records)", name, collection.version, collection.count())
+        # --- Answers precomputed for the previous snapshot no longer match its version --- #
+        if settings.precomputed_answers_enabled:
+            get_precomputed_answers().schedule_refresh()
+        return True
+
+    def _reload_logged(self) -> None:
+        try:
+            self.reload()
+        except Exception as e:
+            self.last_error = getattr(e, "detail", None) or str(e)
+            logger.exception("Failed to load the published snapshot")
+
+    def start(self) -> None:
+        """Load the live snapshot (if any) and start watching for new ones."""
+        self._reload_logged()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-replica", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.poll_interval):
+            self._reload_logged()
+
+    def status(self) -> dict:
+        manifest = self.collection.manifest if self.collection else {}
+        return {
+            "snapshot": manifest.get("name"),
+            "version": manifest.get("version"),
+            "records": manifest.get("records"),
+            "published_at": manifest.get("published_at"),
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+
+# ===============================================
+# PUBLISHER
+# ===============================================
+
+class SnapshotPublisher:
+    """Publishes snapshots in a background thread; requests made while publishing coalesce into one more run."""
+
+    def __init__(self, publish_dir: str):
+        self.publish_dir = publish_dir
+        self.last_manifest: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._publishing = False
+        self._publish_again = False
+
+    def schedule(self) -> None:
+        with self._lock:
+            if self._publishing:
+                self._publish_again = True
+                return
+            self._publishing = True
+        threading.Thread(target=self._run, name="snapshot-publisher", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                start = time.perf_counter()
+                self.last_manifest = publish_snapshot(self.publish_dir)
+                logger.info(
+                    "Published snapshot %s (%d records) in %.2fs",
+                    self.last_manifest["name"], self.last_manifest["records"], time.perf_counter() - start
+                )
+            except Exception:
+                logger.exception("Failed to publish a snapshot")
+            with self._lock:
+                if not self._publish_again:
+                    self._publishing = False
+                    return
+                self._publish_again = False
+
+# ===============================================
+# SERVICE INSTANCES
+# ===============================================
+
+_replica = None
+_publisher = None
+
+def get_replica() -> SnapshotReplica:
+    """Get or create the snapshot replica (singleton pattern)."""
+    global _replica
+    if _replica is None:
+        _replica = SnapshotReplica(settings.snapshot_publish_dir, settings.replica_poll_interval)
+    return _replica
+
+def get_snapshot_publisher() -> SnapshotPublisher:
+    """Get or create the snapshot publisher (singleton pattern)."""
+    global _publisher
+    if _publisher is None:
+        _publisher = SnapshotPublisher(settings.snapshot_publish_dir)
+    return _publisher
+
+def publish_after_change() -> None:
+    """Schedule a snapshot for the replicas after the collection changed, if publishing is enabled."""
+    if settings.publish_snapshots:
+        get_snapshot_publisher().schedule()
@@ -0,0 +1,204 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Resilience helpers for upstream calls in the RAG Chatbot API.
+Provides jittered retries, hedged requests and a circuit breaker so a slow
+or unhealthy upstream fails fast instead of holding requests forever.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import random
+import threading
+import time
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Callable, Optional, TypeVar
+import httpx
+from ..exceptions import UpstreamUnavailableException
+
+T = TypeVar("T")
+
+# ===============================================
+# RETRY CLASSIFICATION
+# ===============================================
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Decide whether an upstream error is transient.
+
+    Timeouts, connection errors and 408/429/5xx responses are retried;
+    anything else (bad request, auth errors, ...) is raised immediately.
+    """
+    if isinstance(exc, (httpx.TimeoutException, httpx.TransportError)):
+        return True
+    return getattr(exc, "status_code", None) in RETRYABLE_STATUS_CODES
+
+# ===============================================
+# RETRY POLICY
+# ===============================================
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 4.0):
+        """
+        Args:
+            max_attempts: Total attempts, including the first one
+            base_delay: Backoff ceiling for the first retry, in seconds
+            max_delay: Upper bound for any single backoff, in seconds
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Random delay in [0, min(max_delay, base_delay * 2**attempt)]."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """
+        Call `fn`, retrying transient failures.
+
+        Raises:
+            The last exception once attempts are exhausted or a
+            non-retryable error occurs
+        """
+        for attempt in range(self.max_attempts):
+            try:
+                return fn()
+            except Exception as e:
+                if attempt == self.max_attempts - 1 or not is_retryable(e):
+                    raise
+                time.sleep(self.backoff(attempt))
+
+# ===============================================
+# HEDGED REQUESTS
+# ===============================================
+
+def hedged_call(executor: Executor, fn: Callable[[], T], hedge_delay: float) -> T:
+    """
+    Call `fn`, firing a duplicate request if the first one is slow.
+
+    The first successful response wins; the call only fails if both
+    attempts fail. Only use this for idempotent requests.
+
+    Args:
+        executor: Executor running the attempts
+        fn: Idempotent callable
+        hedge_delay: Seconds to wait before sending the duplicate (<= 0 disables hedging)
+
+    Returns:
+        The first successful result
+    """
+    if hedge_delay <= 0:
+        return fn()
+
+    primary = executor.submit(fn)
+    done, _ = wait([primary], timeout=hedge_delay)
+    if done:
+        return primary.result()
+
+    pending = {primary, executor.submit(fn)}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+# ===============================================
+# CIRCUIT BREAKER
+# ===============================================
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast for `reset_timeout` seconds; then a single trial call
+    is let through and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            UpstreamUnavailableException: If the circuit is open
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if self._state == self.OPEN and remaining <= 0:
+                # --- Let exactly one trial request through --- #
+                self._state = self.HALF_OPEN
+                return
+            raise UpstreamUnavailableException(
+                f"{self.name} is temporarily unavailable",
+                f"Circuit open after {self._failures} consecutive failures, retry in {max(remaining, 0):.0f}s"
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """
+        Run `fn` through the breaker, counting transient failures.
+
+        Raises:
+            UpstreamUnavailableException: If the circuit is open
+        """
+        self.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            if is_retryable(e):
+                self.record_failure()
+            else:
+                # --- The upstream answered, it is healthy even if the request was bad --- #
+                self.record_success()
+            raise
+        self.record_success()
+        return result
@@ -0,0 +1,70 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Shared search result formatting for the RAG Chatbot API.
+Turns a Chroma-shaped query result into compact, JSON-ready dicts in one
+pass, so the hot endpoints can serialize them directly with orjson instead
+of building and validating a Pydantic object per result.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import numpy as np
+from typing import List
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+SNIPPET_LENGTH = 100
+
+# --- Values accepted by the `fields` option of SearchRequest/QuestionRequest --- #
+SNIPPET_FIELDS = "snippet"
+FULL_FIELDS = "full"
+ID_FIELDS = "ids"
+
+# ===============================================
+# FORMATTING
+# ===============================================
+
+def format_search_results(result: dict, fields: str = SNIPPET_FIELDS, snippet_length: int = SNIPPET_LENGTH) -> List[dict]:
+    """
+    Format a ChromaDB search result into SearchResult-shaped dicts.
+
+    Args:
+        result: Raw ChromaDB search result (ids, documents, distances)
+        fields: "snippet" for a content preview, "full" for whole documents, "ids" for ids and scores only
+        snippet_length: Characters kept in a content preview
+
+    Returns:
+        List of dicts with document_id, similarity_score and the selected content field
+    """
+    ids = (result.get("ids") or [[]])[0]
+    if not ids:
+        return []
+
+    # --- ChromaDB returns distances (lower is more similar); round them all at once --- #
+    scores = np.round(np.asarray(result["distances"][0], dtype=np.float64), 3).tolist()
+
+    if fields == ID_FIELDS:
+        return [{"document_id": doc_id, "similarity_score": score} for doc_id, score in zip(ids, scores)]
+
+    documents = result["documents"][0]
+    if fields == FULL_FIELDS:
+        return [
+            {"document_id": doc_id, "content": document, "similarity_score": score}
+            for doc_id, document, score in zip(ids, documents, scores)
+        ]
+
+    return [
+        {
+            "document_id": doc_id,
+            "content_snippet": document[:snippet_length] + "..." if len(document) > snippet_length else document,
+            "similarity_score": score,
+        }
+        for doc_id, document, score in zip(ids, documents, scores)
+    ]
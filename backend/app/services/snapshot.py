@@ -0,0 +1,460 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Collection snapshot service for the RAG Chatbot API.
+Exports a ChromaDB collection (ids, documents, metadata and embeddings) to a
+compact compressed .npz file and imports it back with bulk inserts, so a new
+instance can be populated without re-embedding the corpus. The same copy
+path rebuilds the collection with new HNSW parameters.
+
+Snapshots can also be published as a directory of uncompressed .npy arrays
+(quantized codes, float vectors and packed strings) that read-only replicas
+memory-map instead of loading; a CURRENT file names the live snapshot and is
+replaced atomically once a new snapshot is complete.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import json
+import os
+import shutil
+import time
+import numpy as np
+from collections.abc import Sequence as SequenceABC
+from typing import Dict, Iterator, List, Optional, Sequence
+from .chroma_database import (
+    MyEmbeddingFunction,
+    advance_index_version,
+    bump_collection_version,
+    collection_space,
+    get_chroma_client,
+    get_collection,
+    get_collection_version,
+    hnsw_configuration,
+    initialize_vector_index,
+    reset_collection,
+)
+from .vector_index import QuantizedVectorIndex, get_vector_index
+from ..config import settings
+from ..exceptions import DatabaseException
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# --- Below Chroma's default max batch size (5461) --- #
+IMPORT_BATCH_SIZE = 5000
+
+PUBLISHED_FORMAT_VERSION = 1
+CURRENT_POINTER = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+
+# ===============================================
+# ENCODING HELPERS
+# ===============================================
+
+def _pack_strings(values: Sequence[str]):
+    """Pack strings into a single utf-8 byte buffer plus an offsets array."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+def _unpack_strings(buffer: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """Inverse of `_pack_strings`."""
+    raw = buffer.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+class PackedStrings(SequenceABC):
+    """Read-only sequence over a `_pack_strings` buffer, decoding each string on access."""
+
+    def __init__(self, buffer: np.ndarray, offsets: np.ndarray):
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return max(0, len(self._offsets) - 1)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        position = int(position)
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        return self._buffer[self._offsets[position]:self._offsets[position + 1]].tobytes().decode("utf-8")
+
+def _map_array(path: str) -> np.ndarray:
+    """Memory-map an .npy file read-only (empty arrays cannot be mapped and are loaded)."""
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        return np.load(path)
+
+def iter_collection_pages(collection, include: List[str], page_size: int = 1000) -> Iterator[dict]:
+    """
+    Iterate over a collection in pages of `collection.get` results.
+
+    Args:
+        collection: ChromaDB collection to read
+        include: Fields to include in every page
+        page_size: Records per page
+
+    Yields:
+        Raw `collection.get` result dictionaries
+    """
+    offset = 0
+    while True:
+        page = collection.get(include=include, limit=page_size, offset=offset)
+        if not page["ids"]:
+            return
+        yield page
+        offset += len(page["ids"])
+
+# ===============================================
+# EXPORT / IMPORT
+# ===============================================
+
+def export_collection(path: str, collection=None, float16: bool = False) -> Dict[str, int]:
+    """
+    Export a collection to a compressed .npz snapshot.
+
+    Args:
+        path: Destination file
+        collection: Collection to export (defaults to the configured one)
+        float16: Store embeddings as float16 to halve the file size
+
+    Returns:
+        Dictionary with the number of records and embedding dimension
+
+    Raises:
+        DatabaseException: If reading the collection or writing the file fails
+    """
+    try:
+        if collection is None:
+            collection = get_collection()
+        ids, documents, metadatas, embeddings = [], [], [], []
+        for page in iter_collection_pages(collection, include=["documents", "metadatas", "embeddings"]):
+            ids.extend(page["ids"])
+            documents.extend(doc or "" for doc in page["documents"])
+            metadatas.extend(json.dumps(meta) if meta else "" for meta in page["metadatas"])
+            embeddings.append(np.asarray(page["embeddings"], dtype=np.float32))
+
+        matrix = np.concatenate(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+        ids_buffer, ids_offsets = _pack_strings(ids)
+        documents_buffer, documents_offsets = _pack_strings(documents)
+        metadatas_buffer, metadatas_offsets = _pack_strings(metadatas)
+
+        with open(path, "wb") as file:
+            np.savez_compressed(
+                file,
+                format_version=np.array(SNAPSHOT_FORMAT_VERSION),
+                collection_name=np.array(collection.name),
+                ids=ids_buffer,
+                ids_offsets=ids_offsets,
+                documents=documents_buffer,
+                documents_offsets=documents_offsets,
+                metadatas=metadatas_buffer,
+                metadatas_offsets=metadatas_offsets,
+                embeddings=matrix.astype(np.float16 if float16 else np.float32),
+            )
+        return {"records": len(ids), "dimension": int(matrix.shape[1]) if len(ids) else 0}
+    except Exception as e:
+        raise DatabaseException("Failed to export collection snapshot", str(e))
+
+def load_snapshot(path: str) -> dict:
+    """
+    Read a snapshot file into Python lists and a float32 embedding matrix.
+
+    Args:
+        path: Snapshot file produced by `export_collection`
+
+    Returns:
+        Dictionary with ids, documents, metadatas, embeddings and collection_name
+
+    Raises:
+        DatabaseException: If the file is missing, corrupt or of an unknown version
+    """
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["format_version"])
+            if version != SNAPSHOT_FORMAT_VERSION:
+                raise DatabaseException("Unsupported snapshot format", f"Expected version {SNAPSHOT_FORMAT_VERSION}, got {version}")
+            return {
+                "collection_name": str(data["collection_name"]),
+                "ids": _unpack_strings(data["ids"], data["ids_offsets"]),
+                "documents": _unpack_strings(data["documents"], data["documents_offsets"]),
+                "metadatas": [json.loads(meta) if meta else None for meta in _unpack_strings(data["metadatas"], data["metadatas_offsets"])],
+                "embeddings": data["embeddings"].astype(np.float32),
+            }
+    except DatabaseException:
+        raise
+    except Exception as e:
+        raise DatabaseException("Failed to read collection snapshot", str(e))
+
+def import_collection(path: str, collection=None, batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Bulk insert a snapshot into a collection without any embedding calls.
+
+    Existing ids are overwritten (upsert), so re-running an import is safe.
+    Imported records are stamped with a new collection version.
+
+    Args:
+        path: Snapshot file produced by `export_collection`
+        collection: Target collection (defaults to the configured one)
+        batch_size: Records per upsert call
+
+    Returns:
+        Dictionary with the number of imported records
+
+    Raises:
+        DatabaseException: If the snapshot cannot be read or written
+    """
+    snapshot = load_snapshot(path)
+    try:
+        if collection is None:
+            collection = get_collection()
+        index = get_vector_index()
+        ids, documents, metadatas, embeddings = (
+            snapshot["ids"], snapshot["documents"], snapshot["metadatas"], snapshot["embeddings"]
+        )
+
+        for start in range(0, len(ids), batch_size):
+            end = min(start + batch_size, len(ids))
+            version = bump_collection_version()
+            batch_metadatas = [{**(meta or {}), "version": version} for meta in metadatas[start:end]]
+            _upsert_batch(collection, ids[start:end], documents[start:end], batch_metadatas, embeddings[start:end])
+            if index is not None:
+                index.upsert(ids[start:end], documents[start:end], embeddings[start:end])
+            advance_index_version(index, version - 1, bump_collection_version())
+        if index is not None:
+            index.flush()
+
+        return {"records": len(ids)}
+    except Exception as e:
+        raise DatabaseException("Failed to import collection snapshot", str(e))
+
+def _upsert_batch(collection, ids, documents, metadatas, embeddings: np.ndarray) -> None:
+    """Upsert one batch, keeping records without metadata in a separate call."""
+    with_metadata = [i for i, meta in enumerate(metadatas) if meta]
+    without_metadata = [i for i, meta in enumerate(metadatas) if not meta]
+
+    for rows, include_metadata in ((with_metadata, True), (without_metadata, False)):
+        if not rows:
+            continue
+        collection.upsert(
+            ids=[ids[i] for i in rows],
+            documents=[documents[i] for i in rows],
+            embeddings=embeddings[rows],
+            metadatas=[metadatas[i] for i in rows] if include_metadata else None,
+        )
+
+# ===============================================
+# PUBLISHED SNAPSHOTS
+# ===============================================
+
+def publish_snapshot(publish_dir: Optional[str] = None, keep: Optional[int] = None, collection=None) -> dict:
+    """
+    Publish the collection as a memory-mappable snapshot for read-only replicas.
+
+    The snapshot is written to a hidden staging directory, renamed into place
+    and only then named in CURRENT, so replicas never see a partial snapshot.
+
+    Args:
+        publish_dir: Directory shared with the replicas (defaults to SNAPSHOT_PUBLISH_DIR)
+        keep: Published snapshots to keep, including the new one (defaults to SNAPSHOT_KEEP)
+        collection: Collection to publish (defaults to the configured one)
+
+    Returns:
+        The snapshot manifest (name, collection version, records, dimension, ...)
+
+    Raises:
+        DatabaseException: If reading the collection or writing the snapshot fails
+    """
+    publish_dir = publish_dir or settings.snapshot_publish_dir
+    keep = keep or settings.snapshot_keep
+    # --- Read the version first: the snapshot holds at least everything written up to it --- #
+    version = get_collection_version()
+    name = f"v{version:010d}-{int(time.time() * 1000)}"
+    staging = os.path.join(publish_dir, f".{name}.tmp")
+    try:
+        if collection is None:
+            collection = get_collection()
+        index = QuantizedVectorIndex(quantization=settings.vector_index_quantization, space=collection_space(collection))
+        metadatas = []
+        for page in iter_collection_pages(collection, include=["documents", "metadatas", "embeddings"]):
+            index.add(page["ids"], [doc or "" for doc in page["documents"]], np.asarray(page["embeddings"], dtype=np.float32))
+            metadatas.extend(json.dumps(meta) if meta else "" for meta in page["metadatas"])
+
+        index.save(staging)
+        for field, values in (("ids", index.ids), ("documents", index.documents), ("metadatas", metadatas)):
+            buffer, offsets = _pack_strings(values)
+            np.save(os.path.join(staging, f"{field}.npy"), buffer)
+            np.save(os.path.join(staging, f"{field}_offsets.npy"), offsets)
+
+        manifest = {
+            "format_version": PUBLISHED_FORMAT_VERSION,
+            "name": name,
+            "collection_name": collection.name,
+            "version": version,
+            "records": len(index),
+            "dimension": index.dimension or 0,
+            "quantization": index.quantization,
+            "space": index.space,
+            "published_at": time.time(),
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+
+        os.rename(staging, os.path.join(publish_dir, name))
+        pointer = os.path.join(publish_dir, CURRENT_POINTER)
+        with open(pointer + ".tmp", "w", encoding="utf-8") as file:
+            file.write(name)
+        os.replace(pointer + ".tmp", pointer)
+    except Exception as e:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise DatabaseException("Failed to publish collection snapshot", str(e))
+
+    # --- Older snapshots go; replicas still mapping one keep reading it until they switch --- #
+    published = sorted(entry for entry in os.listdir(publish_dir) if entry.startswith("v") and entry != name)
+    for stale in published[:max(0, len(published) - (keep - 1))]:
+        shutil.rmtree(os.path.join(publish_dir, stale), ignore_errors=True)
+    return manifest
+
+def current_snapshot_name(publish_dir: Optional[str] = None) -> Optional[str]:
+    """Name of the live published snapshot, or None if nothing was published yet."""
+    try:
+        with open(os.path.join(publish_dir or settings.snapshot_publish_dir, CURRENT_POINTER), encoding="utf-8") as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def open_published_snapshot(name: str, publish_dir: Optional[str] = None) -> dict:
+    """
+    Open a published snapshot with its arrays memory-mapped.
+
+    Args:
+        name: Snapshot name (see `current_snapshot_name`)
+        publish_dir: Directory the snapshot was published to
+
+    Returns:
+        Dictionary with the manifest, a QuantizedVectorIndex over the snapshot
+        and the metadatas as lazily decoded JSON strings
+
+    Raises:
+        DatabaseException: If the snapshot is missing, corrupt or of an unknown version
+    """
+    directory = os.path.join(publish_dir or settings.snapshot_publish_dir, name)
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest.get("format_version") != PUBLISHED_FORMAT_VERSION:
+            raise DatabaseException("Unsupported snapshot format", f"Expected version {PUBLISHED_FORMAT_VERSION}, got {manifest.get('format_version')}")
+
+        strings = {
+            field: PackedStrings(_map_array(os.path.join(directory, f"{field}.npy")), _map_array(os.path.join(directory, f"{field}_offsets.npy")))
+            for field in ("ids", "documents", "metadatas")
+        }
+        index = QuantizedVectorIndex.open(
+            directory,
+            strings["ids"],
+            strings["documents"],
+            quantization=manifest["quantization"],
+            space=manifest["space"],
+            rescore_factor=settings.vector_index_rescore_factor,
+        )
+        return {"manifest": manifest, "index": index, "metadatas": strings["metadatas"]}
+    except DatabaseException:
+        raise
+    except Exception as e:
+        raise DatabaseException("Failed to open published snapshot", str(e))
+
+# ===============================================
+# REBUILD
+# ===============================================
+
+def rebuild_collection(
+    space: Optional[str] = None,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    keep_previous: bool = False,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> Dict[str, object]:
+    """
+    Rebuild the configured collection with new HNSW parameters.
+
+    Stored embeddings are copied page by page into a new collection (no
+    embedding calls), which then takes over the collection name. The swap is
+    two renames, so requests made between them fail; run it in a quiet
+    period and restart the workers afterwards. Parameters left as None use
+    the configured values.
+
+    Args:
+        space: Distance function ("l2", "ip" or "cosine")
+        m: Maximum neighbors per node
+        ef_construction: Candidate list size while building the graph
+        ef_search: Default candidate list size while searching
+        keep_previous: Keep the old collection as "<name>_previous" instead of deleting it
+        batch_size: Records per upsert call
+
+    Returns:
+        Dictionary with the number of copied records and the new HNSW configuration
+
+    Raises:
+        DatabaseException: If the copy fails (the original collection is left untouched)
+    """
+    name = settings.collection_name
+    staging_name = f"{name}_rebuild"
+    previous_name = f"{name}_previous"
+    configuration = hnsw_configuration(space, m, ef_construction, ef_search)
+    try:
+        client = get_chroma_client()
+        existing = {collection.name for collection in client.list_collections()}
+        for stale in (staging_name, previous_name):
+            if stale in existing:
+                client.delete_collection(stale)
+
+        source = client.get_collection(name=name, embedding_function=MyEmbeddingFunction())
+        target = client.create_collection(
+            name=staging_name,
+            configuration=configuration,
+            embedding_function=MyEmbeddingFunction(),
+        )
+
+        copied = 0
+        for page in iter_collection_pages(source, include=["documents", "metadatas", "embeddings"], page_size=batch_size):
+            _upsert_batch(
+                target, page["ids"], [doc or "" for doc in page["documents"]], page["metadatas"],
+                np.asarray(page["embeddings"], dtype=np.float32)
+            )
+            copied += len(page["ids"])
+
+        if target.count() != source.count():
+            client.delete_collection(staging_name)
+            raise DatabaseException("Collection changed during rebuild", f"Copied {copied} of {source.count()} records, try again")
+
+        # --- Swap names. Between the two renames the name does not exist: requests in that window --- #
+        # --- fail and must be retried, and workers keep their old handle until restarted --- #
+        source.modify(name=previous_name)
+        target.modify(name=name)
+        if not keep_previous:
+            client.delete_collection(previous_name)
+    except DatabaseException:
+        raise
+    except Exception as e:
+        raise DatabaseException("Failed to rebuild collection", str(e))
+
+    # --- Documents keep their versions (same content), but rankings may differ from now on --- #
+    bump_collection_version()
+    reset_collection()
+    if get_vector_index() is not None:
+        initialize_vector_index()
+    return {"records": copied, **configuration["hnsw"]}
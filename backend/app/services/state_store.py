@@ -0,0 +1,184 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Shared state store for the RAG Chatbot API.
+Holds conversation history and small key/value state either in process
+memory (single worker) or in a local SQLite database shared by every
+uvicorn worker on the machine.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from ..config import settings
+from ..exceptions import DatabaseException
+
+# ===============================================
+# IN-MEMORY STORE
+# ===============================================
+
+class InMemoryStateStore:
+    """Process-local store, only correct with a single worker."""
+
+    def __init__(self):
+        self._messages: Dict[str, List[Dict[str, str]]] = {}
+        self._values: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def append_message(self, conversation_id: str, role: str, content: str) -> None:
+        with self._lock:
+            self._messages.setdefault(conversation_id, []).append({"role": role, "content": content})
+
+    def get_messages(self, conversation_id: str) -> List[Dict[str, str]]:
+        with self._lock:
+            return list(self._messages.get(conversation_id, []))
+
+    def clear_messages(self, conversation_id: str) -> None:
+        with self._lock:
+            self._messages.pop(conversation_id, None)
+
+    def get_value(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._values.get(key)
+
+    def set_value(self, key: str, value: str) -> None:
+        with self._lock:
+            self._values[key] = value
+
+    def update_value(self, key: str, update: Callable[[Optional[str]], str]) -> str:
+        """Replace a value with `update(current value)` atomically, and return the new value."""
+        with self._lock:
+            value = self._values[key] = update(self._values.get(key))
+            return value
+
+    def increment(self, key: str) -> int:
+        return int(self.update_value(key, lambda value: str(int(value or "0") + 1)))
+
+# ===============================================
+# SQLITE STORE
+# ===============================================
+
+class SQLiteStateStore:
+    """
+    Store backed by a local SQLite file in WAL mode.
+
+    Every worker process opens its own connections (one per thread); SQLite
+    serializes writers, so appends and counters stay consistent across workers.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the database.
+
+        Args:
+            path: SQLite database file
+
+        Raises:
+            DatabaseException: If the database cannot be initialized
+        """
+        self.path = path
+        self._local = threading.local()
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connection() as connection:
+                connection.executescript("""
+                    CREATE TABLE IF NOT EXISTS chat_messages (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        conversation_id TEXT NOT NULL,
+                        role TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        created_at REAL NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS chat_messages_conversation ON chat_messages (conversation_id, id);
+                    CREATE TABLE IF NOT EXISTS kv (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        updated_at REAL NOT NULL
+                    );
+                """)
+        except Exception as e:
+            raise DatabaseException("Failed to initialize state store", str(e))
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def append_message(self, conversation_id: str, role: str, content: str) -> None:
+        self._connection().execute(
+            "INSERT INTO chat_messages (conversation_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+            (conversation_id, role, content, time.time())
+        )
+
+    def get_messages(self, conversation_id: str) -> List[Dict[str, str]]:
+        rows = self._connection().execute(
+            "SELECT role, content FROM chat_messages WHERE conversation_id = ? ORDER BY id",
+            (conversation_id,)
+        ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def clear_messages(self, conversation_id: str) -> None:
+        self._connection().execute("DELETE FROM chat_messages WHERE conversation_id = ?", (conversation_id,))
+
+    def get_value(self, key: str) -> Optional[str]:
+        row = self._connection().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_value(self, key: str, value: str) -> None:
+        self._connection().execute(
+            "INSERT INTO kv (key, value, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (key, value, time.time())
+        )
+
+    def update_value(self, key: str, update: Callable[[Optional[str]], str]) -> str:
+        """Replace a value with `update(current value)` atomically across workers, and return the new value."""
+        connection = self._connection()
+        # --- BEGIN IMMEDIATE takes the write lock up front, so workers cannot interleave --- #
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+            value = update(row[0] if row else None)
+            connection.execute(
+                "INSERT INTO kv (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (key, value, time.time())
+            )
+            connection.execute("COMMIT")
+            return value
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def increment(self, key: str) -> int:
+        return int(self.update_value(key, lambda value: str(int(value or "0") + 1)))
+
+# ===============================================
+# STORE INSTANCE
+# ===============================================
+
+_state_store = None
+
+def get_state_store():
+    """Get or create the configured state store (singleton pattern)."""
+    global _state_store
+    if _state_store is None:
+        if settings.state_backend == "sqlite":
+            _state_store = SQLiteStateStore(settings.state_db_path)
+        else:
+            _state_store = InMemoryStateStore()
+    return _state_store
@@ -0,0 +1,299 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Whole-corpus summarization service for the RAG Chatbot API.
+Clusters every stored embedding with a vectorized k-means, summarizes each
+cluster in parallel (map) and combines the cluster summaries into a final
+summary (reduce). Cluster summaries are cached by their members' ids and
+versions, so after an upload, delete or replace only the clusters whose
+members changed are recomputed.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from .chroma_database import get_collection
+from .cohere_llm import get_llm_service
+from .snapshot import iter_collection_pages
+from ..config import settings
+from ..exceptions import LLMException, NoResultsException, UpstreamUnavailableException
+
+# ===============================================
+# K-MEANS
+# ===============================================
+
+def kmeans(
+    vectors: np.ndarray,
+    k: int,
+    initial_centroids: Optional[np.ndarray] = None,
+    iterations: int = 25,
+    seed: int = 0,
+):
+    """
+    Vectorized Lloyd's k-means with k-means++ seeding.
+
+    Args:
+        vectors: (n, d) float32 matrix
+        k: Number of clusters
+        initial_centroids: Warm start (e.g. the previous run's centroids)
+        iterations: Maximum Lloyd iterations
+        seed: Random seed for reproducible clustering
+
+    Returns:
+        Tuple of (labels, centroids)
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    k = min(k, n)
+    squared_norms = (vectors * vectors).sum(axis=1)
+
+    if initial_centroids is not None and len(initial_centroids) == k and initial_centroids.shape[1] == vectors.shape[1]:
+        centroids = initial_centroids.astype(np.float32).copy()
+    else:
+        centroids = np.empty((k, vectors.shape[1]), dtype=np.float32)
+        centroids[0] = vectors[rng.integers(n)]
+        closest = squared_norms - 2.0 * vectors @ centroids[0] + centroids[0] @ centroids[0]
+        for i in range(1, k):
+            probabilities = np.maximum(closest, 0.0)
+            total = probabilities.sum()
+            choice = rng.choice(n, p=probabilities / total) if total > 0 else rng.integers(n)
+            centroids[i] = vectors[choice]
+            distances = squared_norms - 2.0 * vectors @ centroids[i] + centroids[i] @ centroids[i]
+            closest = np.minimum(closest, distances)
+
+    labels = np.full(n, -1)
+    for _ in range(iterations):
+        distances = squared_norms[:, None] - 2.0 * vectors @ centroids.T + (centroids * centroids).sum(axis=1)[None, :]
+        new_labels = distances.argmin(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        # --- Empty clusters keep their previous centroid --- #
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+
+    return labels, centroids
+
+# ===============================================
+# SUMMARIZER
+# ===============================================
+
+class CorpusSummarizer:
+    """Map-reduce summarizer over the whole review collection."""
+
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        Initialize the summarizer and load its cache.
+
+        Args:
+            cache_path: JSON file persisting cluster summaries and centroids
+        """
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._cluster_summaries: Dict[str, str] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._final_key: Optional[str] = None
+        self._final_summary: Optional[str] = None
+        self._load_cache()
+
+    # --- Cache --- #
+
+    def _load_cache(self) -> None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            self._cluster_summaries = data.get("cluster_summaries", {})
+            if data.get("centroids"):
+                self._centroids = np.asarray(data["centroids"], dtype=np.float32)
+            self._final_key = data.get("final_key")
+            self._final_summary = data.get("final_summary")
+        except (OSError, ValueError):
+            # --- A corrupt cache only costs a recomputation --- #
+            self._cluster_summaries, self._centroids = {}, None
+
+    def _save_cache(self) -> None:
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({
+                "cluster_summaries": self._cluster_summaries,
+                "centroids": self._centroids.tolist() if self._centroids is not None else None,
+                "final_key": self._final_key,
+                "final_summary": self._final_summary,
+            }, file)
+        os.replace(tmp_path, self.cache_path)
+
+    @staticmethod
+    def _cluster_key(member_ids: List[str]) -> str:
+        """Content address of a cluster: a hash of its sorted members ("id@version")."""
+        return hashlib.sha256("\n".join(sorted(member_ids)).encode("utf-8")).hexdigest()
+
+    # --- Prompts --- #
+
+    @staticmethod
+    def _fit_budget(documents: List[str], max_chars: int) -> str:
+        """Join documents until the character budget is used up."""
+        parts, used = [], 0
+        # --- Chroma returns None for records stored without a document --- #
+        for document in filter(None, documents):
+            if used + len(document) > max_chars:
+                parts.append(document[:max(0, max_chars - used)])
+                break
+            parts.append(document)
+            used += len(document)
+        return "\n".join(part for part in parts if part)
+
+    def _summarize_cluster(self, documents: List[str]) -> str:
+        context = self._fit_budget(documents, settings.summary_cluster_max_chars)
+        return get_llm_service().summarize_text(
+            """
+            You are a specialized system for summarizing product reviews.
+            Summarize the reviews below in a short paragraph: the main topic they share,
+            what customers like, what they complain about and how common each opinion is.
+            Use ONLY the information in the reviews. Do not use emojis or emoticons.
+            """,
+            f"Reviews:\n{context}"
+        )
+
+    def _reduce(self, cluster_summaries: List[dict]) -> str:
+        context = "\n\n".join(
+            f"Group of {summary['size']} review chunks:\n{summary['summary']}"
+            for summary in cluster_summaries
+        )
+        return get_llm_service().summarize_text(
+            """
+            You are a specialized system for summarizing product reviews.
+            You receive summaries of groups of reviews, each with the size of its group.
+            Write one overall summary of what customers think about the product,
+            giving more weight to larger groups. Be concise and factual.
+            Do not use emojis or emoticons.
+            """,
+            context
+        )
+
+    # --- Public API --- #
+
+    def summarize(self, num_clusters: Optional[int] = None, refresh: bool = False) -> dict:
+        """
+        Summarize the whole collection.
+
+        Args:
+            num_clusters: Number of clusters (defaults to settings.summary_clusters)
+            refresh: Ignore cached cluster summaries and recompute all of them
+
+        Returns:
+            Dictionary with the final summary, per-cluster summaries and
+            how many clusters had to be recomputed
+
+        Raises:
+            NoResultsException: If the collection is empty
+            LLMException: If a summarization call fails
+        """
+        ids, members, documents, vectors = [], [], [], []
+        for page in iter_collection_pages(get_collection(), include=["documents", "metadatas", "embeddings"]):
+            ids.extend(page["ids"])
+            # --- A replaced document keeps its id but gets a new version, invalidating its cluster --- #
+            members.extend(
+                f"{doc_id}@{(meta or {}).get('version', 0)}" for doc_id, meta in zip(page["ids"], page["metadatas"])
+            )
+            documents.extend(page["documents"])
+            vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        if not ids:
+            raise NoResultsException("No reviews to summarize", "The database is empty, upload reviews first")
+
+        # --- The lock only guards the cache: LLM calls run unlocked, so summaries never queue behind each other --- #
+        with self._lock:
+            previous_centroids = self._centroids
+            cached = dict(self._cluster_summaries)
+            previous_final_key, previous_final_summary = self._final_key, self._final_summary
+
+        matrix = np.concatenate(vectors)
+        k = num_clusters or settings.summary_clusters
+        # --- Warm start from the previous centroids keeps unchanged clusters stable --- #
+        labels, centroids = kmeans(matrix, k, initial_centroids=None if refresh else previous_centroids)
+
+        clusters = []
+        for label in range(len(centroids)):
+            rows = np.flatnonzero(labels == label)
+            if len(rows) == 0:
+                continue
+            # --- Most central chunks first, so the character budget keeps the typical ones --- #
+            distances = ((matrix[rows] - centroids[label]) ** 2).sum(axis=1)
+            rows = rows[np.argsort(distances)]
+            member_ids = [ids[row] for row in rows]
+            clusters.append({
+                "key": self._cluster_key([members[row] for row in rows]),
+                "size": len(rows),
+                "documents": [documents[row] for row in rows],
+                "sample_ids": member_ids[:5],
+            })
+
+        stale = [cluster for cluster in clusters if refresh or cluster["key"] not in cached]
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, settings.summary_concurrency)) as executor:
+                computed = list(executor.map(lambda cluster: self._summarize_cluster(cluster["documents"]), stale))
+        except UpstreamUnavailableException:
+            raise
+        except Exception as e:
+            raise LLMException("Failed to summarize review clusters", str(e))
+
+        for cluster, summary in zip(stale, computed):
+            cached[cluster["key"]] = summary
+
+        cluster_summaries = [
+            {"size": cluster["size"], "summary": cached[cluster["key"]], "sample_ids": cluster["sample_ids"]}
+            for cluster in sorted(clusters, key=lambda cluster: cluster["size"], reverse=True)
+        ]
+        # --- The reduce step only reruns when some cluster changed --- #
+        final_key = self._cluster_key([cluster["key"] for cluster in clusters])
+        if refresh or stale or previous_final_key != final_key:
+            final_summary = self._reduce(cluster_summaries)
+        else:
+            final_summary = previous_final_summary
+
+        with self._lock:
+            # --- Only keep summaries of the current clusters --- #
+            self._cluster_summaries = {cluster["key"]: cached[cluster["key"]] for cluster in clusters}
+            self._centroids = centroids
+            self._final_key, self._final_summary = final_key, final_summary
+            self._save_cache()
+
+        return {
+            "summary": final_summary,
+            "clusters": cluster_summaries,
+            "clusters_recomputed": len(stale),
+        }
+
+# ===============================================
+# SERVICE INSTANCE
+# ===============================================
+
+# Create a singleton instance
+_summarizer = None
+
+def get_summarizer() -> CorpusSummarizer:
+    """Get or create summarizer instance."""
+    global _summarizer
+    if _summarizer is None:
+        _summarizer = CorpusSummarizer(cache_path=settings.summary_cache_path)
+    return _summarizer
@@ -0,0 +1,414 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Quantized in-memory vector index for the RAG Chatbot API.
+Keeps int8 or binary-quantized embeddings in a contiguous NumPy array and
+answers top-k queries with a vectorized scan followed by float rescoring.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import os
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from ..exceptions import DatabaseException
+
+# ===============================================
+# CONSTANTS
+# ===============================================
+
+SUPPORTED_QUANTIZATIONS = ("int8", "binary")
+SUPPORTED_SPACES = ("l2", "ip", "cosine")
+
+# --- Rows scanned per block, bounds the temporary float32 copy of the codes --- #
+_SCAN_BLOCK_ROWS = 8192
+
+# --- Number of set bits for every byte value (used for hamming distances) --- #
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+# ===============================================
+# QUANTIZED INDEX CLASS
+# ===============================================
+
+class QuantizedVectorIndex:
+    """
+    In-process vector index with quantized storage and float rescoring.
+
+    The quantized codes are used for a cheap first pass over every vector;
+    the best `k * rescore_factor` candidates are then rescored with the
+    float32 embeddings so the returned distances match Chroma's.
+
+    Added batches are buffered and joined to the arrays on the next read, and
+    files in `storage_dir` are only rewritten by `flush`, so a large ingest
+    costs one copy of the arrays instead of one per batch.
+    """
+
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        quantization: str = "int8",
+        space: str = "l2",
+        rescore_factor: int = 4,
+        storage_dir: Optional[str] = None,
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            dimension: Embedding dimension (inferred from the first add if None)
+            quantization: "int8" (per-vector scaled) or "binary" (sign bits)
+            space: Distance space, one of "l2", "ip" or "cosine"
+            rescore_factor: Candidates kept per requested result before rescoring
+            storage_dir: If set, arrays are persisted there by `flush` and memory-mapped
+
+        Raises:
+            DatabaseException: If the configuration is invalid
+        """
+        if quantization not in SUPPORTED_QUANTIZATIONS:
+            raise DatabaseException("Invalid vector index quantization", f"Expected one of {SUPPORTED_QUANTIZATIONS}, got '{quantization}'")
+        if space not in SUPPORTED_SPACES:
+            raise DatabaseException("Invalid vector index space", f"Expected one of {SUPPORTED_SPACES}, got '{space}'")
+
+        self.dimension = dimension
+        self.quantization = quantization
+        self.space = space
+        self.rescore_factor = max(1, rescore_factor)
+        self.storage_dir = storage_dir
+        # --- Collection version the contents reflect; None when nobody tracks it (e.g. snapshots) --- #
+        self.version: Optional[int] = None
+
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._codes = self._empty_codes()
+        self._scales = np.empty(0, dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._vectors = np.empty((0, dimension or 0), dtype=np.float32)
+        # --- (codes, scales, norms, vectors) of batches added since the arrays were last joined --- #
+        self._pending: List[tuple] = []
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def rows(self, ids: Sequence[str]) -> List[int]:
+        """Row positions of the given ids, skipping unknown ones."""
+        return [self._positions[doc_id] for doc_id in ids if doc_id in self._positions]
+
+    def embeddings(self, rows: Sequence[int]) -> np.ndarray:
+        """Float32 copy of the stored vectors of the given rows."""
+        self._join_pending()
+        return np.asarray(self._vectors[list(rows)], dtype=np.float32).reshape(len(rows), self.dimension or 0)
+
+    # --- Quantization helpers --- #
+
+    def _empty_codes(self) -> np.ndarray:
+        dimension = self.dimension or 0
+        if self.quantization == "binary":
+            return np.empty((0, (dimension + 7) // 8), dtype=np.uint8)
+        return np.empty((0, dimension), dtype=np.int8)
+
+    def _quantize(self, vectors: np.ndarray):
+        """Return (codes, scales) for a float32 matrix."""
+        if self.quantization == "binary":
+            return np.packbits(vectors > 0, axis=1), np.ones(len(vectors), dtype=np.float32)
+
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    # --- Mutations --- #
+
+    def _join_pending(self) -> None:
+        """Append the buffered batches to the arrays in a single copy."""
+        with self._lock:
+            if not self._pending:
+                return
+            codes, scales, norms, vectors = zip(*self._pending)
+            self._codes = np.concatenate([self._codes, *codes])
+            self._scales = np.concatenate([self._scales, *scales])
+            self._norms = np.concatenate([self._norms, *norms])
+            self._vectors = np.concatenate([self._vectors, *vectors])
+            self._pending = []
+
+    def add(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+    ) -> int:
+        """
+        Append vectors to the index, ignoring ids that are already present.
+
+        Args:
+            ids: Document ids
+            documents: Document texts
+            embeddings: Float embeddings, one per id
+
+        Returns:
+            Number of vectors actually added
+        """
+        with self._lock:
+            keep = [i for i, doc_id in enumerate(ids) if doc_id not in self._positions]
+            if not keep:
+                return 0
+
+            if self.dimension is None:
+                self.dimension = len(embeddings[keep[0]])
+                self._codes = self._empty_codes()
+                self._vectors = np.empty((0, self.dimension), dtype=np.float32)
+
+            vectors = np.asarray([embeddings[i] for i in keep], dtype=np.float32).reshape(len(keep), self.dimension)
+            codes, scales = self._quantize(vectors)
+
+            start = len(self.ids)
+            for offset, i in enumerate(keep):
+                self.ids.append(ids[i])
+                self.documents.append(documents[i])
+                self._positions[ids[i]] = start + offset
+
+            self._pending.append((codes, scales, np.linalg.norm(vectors, axis=1).astype(np.float32), vectors))
+            self._dirty = True
+            return len(keep)
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """
+        Remove vectors by id, compacting the arrays.
+
+        Args:
+            ids: Document ids to remove (unknown ids are ignored)
+
+        Returns:
+            Number of vectors removed
+        """
+        with self._lock:
+            rows = sorted({self._positions[doc_id] for doc_id in ids if doc_id in self._positions})
+            if not rows:
+                return 0
+
+            self._join_pending()
+            keep = np.ones(len(self.ids), dtype=bool)
+            keep[rows] = False
+            self._codes = self._codes[keep]
+            self._scales = self._scales[keep]
+            self._norms = self._norms[keep]
+            self._vectors = self._vectors[keep]
+            self.ids = [doc_id for doc_id, kept in zip(self.ids, keep) if kept]
+            self.documents = [document for document, kept in zip(self.documents, keep) if kept]
+            self._positions = {doc_id: position for position, doc_id in enumerate(self.ids)}
+            self._dirty = True
+            return len(rows)
+
+    def upsert(self, ids: Sequence[str], documents: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        """Insert vectors, replacing any that already exist with the same id."""
+        with self._lock:
+            self.delete(ids)
+            self.add(ids, documents, embeddings)
+
+    def flush(self) -> None:
+        """Rewrite the files in `storage_dir` if the index changed since the last flush."""
+        with self._lock:
+            if self.storage_dir and self._dirty:
+                self._persist()
+            self._dirty = False
+
+    def save(self, directory: str) -> None:
+        """Write the quantized codes, scales, norms and float vectors to `directory` as .npy files."""
+        self._join_pending()
+        os.makedirs(directory, exist_ok=True)
+        arrays = {"codes": self._codes, "scales": self._scales, "norms": self._norms, "vectors": self._vectors}
+        for name, array in arrays.items():
+            path = os.path.join(directory, f"{name}.npy")
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as file:
+                np.save(file, np.ascontiguousarray(array))
+            os.replace(tmp_path, path)
+
+    def _open_arrays(self, directory: str) -> None:
+        """Memory-map the arrays written by `save` (read-only)."""
+        for name in ("codes", "scales", "norms", "vectors"):
+            path = os.path.join(directory, f"{name}.npy")
+            try:
+                array = np.load(path, mmap_mode="r")
+            except ValueError:
+                # --- Empty arrays cannot be mapped --- #
+                array = np.load(path)
+            setattr(self, f"_{name}", array)
+
+    def _persist(self) -> None:
+        """Write the arrays to `storage_dir` and reopen them memory-mapped."""
+        self.save(self.storage_dir)
+        self._open_arrays(self.storage_dir)
+
+    # --- Search --- #
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Score every stored vector against the query (higher is more similar)."""
+        if self.quantization == "binary":
+            query_bits = np.packbits(query > 0)
+            scores = np.empty(len(self._codes), dtype=np.int32)
+            for start in range(0, len(self._codes), _SCAN_BLOCK_ROWS):
+                block = self._codes[start:start + _SCAN_BLOCK_ROWS]
+                scores[start:start + len(block)] = -_POPCOUNT[np.bitwise_xor(block, query_bits)].sum(axis=1, dtype=np.int32)
+            return scores
+
+        scores = np.empty(len(self._codes), dtype=np.float32)
+        for start in range(0, len(self._codes), _SCAN_BLOCK_ROWS):
+            block = self._codes[start:start + _SCAN_BLOCK_ROWS]
+            scores[start:start + len(block)] = (block.astype(np.float32) @ query) * self._scales[start:start + len(block)]
+
+        # --- Turn the approximate dot product into a score for the configured space --- #
+        if self.space == "cosine":
+            scores /= np.maximum(self._norms, 1e-12)
+        elif self.space == "l2":
+            scores -= 0.5 * self._norms * self._norms
+        return scores
+
+    def _exact_distances(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Compute float distances in the configured space for the given rows."""
+        vectors = np.asarray(self._vectors[rows], dtype=np.float32)
+        dots = vectors @ query
+        if self.space == "ip":
+            return 1.0 - dots
+        if self.space == "cosine":
+            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+            return 1.0 - dots / np.maximum(norms, 1e-12)
+        return np.maximum((vectors * vectors).sum(axis=1) - 2.0 * dots + float(query @ query), 0.0)
+
+    def query(self, query_embedding: Sequence[float], n_results: int, candidates: Optional[int] = None) -> dict:
+        """
+        Find the nearest documents to a query embedding.
+
+        Args:
+            query_embedding: Float query vector
+            n_results: Number of results to return
+            candidates: Candidate pool size before rescoring; can only widen the default n_results * rescore_factor
+
+        Returns:
+            Result dictionary shaped like ChromaDB's `collection.query` output
+        """
+        with self._lock:
+            if not self.ids:
+                return {"ids": [[]], "documents": [[]], "distances": [[]]}
+
+            self._join_pending()
+            query = np.asarray(query_embedding, dtype=np.float32).reshape(self.dimension)
+            total = len(self.ids)
+            k = max(0, min(n_results, total))
+
+            pool = min(total, max(k * self.rescore_factor, candidates or 0))
+            scores = self._approximate_scores(query)
+            if pool < total:
+                rows = np.argpartition(-scores, pool - 1)[:pool]
+            else:
+                rows = np.arange(total)
+
+            distances = self._exact_distances(query, rows)
+            order = np.argsort(distances, kind="stable")[:k]
+            best = rows[order]
+
+            return {
+                "ids": [[self.ids[row] for row in best]],
+                "documents": [[self.documents[row] for row in best]],
+                "distances": [distances[order].tolist()],
+            }
+
+    # --- Construction --- #
+
+    @classmethod
+    def open(
+        cls,
+        directory: str,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        quantization: str = "int8",
+        space: str = "l2",
+        rescore_factor: int = 4,
+    ) -> "QuantizedVectorIndex":
+        """
+        Open an index written by `save` without loading its arrays into memory.
+
+        Args:
+            directory: Directory passed to `save`
+            ids: Document ids, in row order
+            documents: Document texts, in row order (any sequence, e.g. lazily decoded)
+            quantization: Quantization the codes were written with
+            space: Distance space the codes were written for
+            rescore_factor: Candidates kept per requested result before rescoring
+
+        Returns:
+            QuantizedVectorIndex backed by memory-mapped arrays
+
+        Raises:
+            DatabaseException: If the files are missing or inconsistent
+        """
+        index = cls(quantization=quantization, space=space, rescore_factor=rescore_factor)
+        try:
+            index._open_arrays(directory)
+        except OSError as e:
+            raise DatabaseException("Failed to open vector index files", str(e))
+        if len(index._vectors) != len(ids) or len(documents) != len(ids):
+            raise DatabaseException("Inconsistent vector index files", f"{len(index._vectors)} vectors for {len(ids)} ids in {directory}")
+
+        index.dimension = int(index._vectors.shape[1]) or None
+        index.ids = list(ids)
+        index.documents = documents
+        index._positions = {doc_id: position for position, doc_id in enumerate(index.ids)}
+        return index
+
+    @classmethod
+    def from_collection(cls, collection, page_size: int = 1000, **kwargs) -> "QuantizedVectorIndex":
+        """
+        Build an index from every record stored in a ChromaDB collection.
+
+        Args:
+            collection: ChromaDB collection to read from
+            page_size: Records fetched per `collection.get` call
+            **kwargs: Forwarded to the constructor (quantization, space, ...)
+
+        Returns:
+            Populated QuantizedVectorIndex
+
+        Raises:
+            DatabaseException: If the collection cannot be read
+        """
+        try:
+            index = cls(**kwargs)
+            offset = 0
+            while True:
+                page = collection.get(include=["embeddings", "documents"], limit=page_size, offset=offset)
+                if not page["ids"]:
+                    break
+                index.add(page["ids"], page["documents"], np.asarray(page["embeddings"], dtype=np.float32))
+                offset += len(page["ids"])
+
+            if len(index):
+                index.flush()
+            return index
+        except DatabaseException:
+            raise
+        except Exception as e:
+            raise DatabaseException("Failed to build vector index from collection", str(e))
+
+# ===============================================
+# INDEX INSTANCE
+# ===============================================
+
+# --- Global index instance, stays None unless the index is enabled and loaded --- #
+_vector_index: Optional[QuantizedVectorIndex] = None
+
+def get_vector_index() -> Optional[QuantizedVectorIndex]:
+    """Get the loaded in-memory index, or None if it is not in use."""
+    return _vector_index
+
+def set_vector_index(index: Optional[QuantizedVectorIndex]) -> None:
+    """Install (or remove, with None) the in-memory index."""
+    global _vector_index
+    _vector_index = index
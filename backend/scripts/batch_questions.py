@@ -0,0 +1,60 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Answer a file of canned questions (one per line) against the current review
+collection and stream the results as JSON Lines with per-question timings.
+Re-running with the same output file answers only the questions that have
+no successful answer in it yet, even if the question file was edited.
+
+Usage (from the backend directory):
+    python -m scripts.batch_questions questions.txt answers.jsonl --concurrency 8
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import argparse
+import sys
+from app.services.batch_qa import EMBED_BATCH_SIZE, load_questions, run_batch
+
+# ===============================================
+# MAIN
+# ===============================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("questions", help="Text file with one question per line")
+    parser.add_argument("output", help="JSON Lines file to append results to")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum concurrent LLM calls")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="Questions per retrieval batch")
+    parser.add_argument("--translate", action="store_true", help="Translate like /questions/ (question to English, answer to Spanish)")
+    args = parser.parse_args()
+    if not 1 <= args.batch_size <= EMBED_BATCH_SIZE:
+        parser.error(f"--batch-size must be between 1 and {EMBED_BATCH_SIZE} (Cohere's limit per embed call)")
+
+    questions = load_questions(args.questions)
+
+    def report(record: dict) -> None:
+        status = "ok" if record["success"] else f"FAILED: {record['error']}"
+        print(f"[{record['index'] + 1}/{len(questions)}] {status}", file=sys.stderr)
+
+    summary = run_batch(
+        questions,
+        args.output,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        translate=args.translate,
+        on_record=report,
+    )
+    print(
+        f"{summary['answered']} answered, {summary['failed']} failed, "
+        f"{summary['skipped']} already done, in {summary['elapsed_s']}s",
+        file=sys.stderr,
+    )
+    sys.exit(1 if summary["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+HNSW parameter sweep: recall@10 vs. latency for M, ef_construction and the
+per-request ef knob of /app/search/.
+
+Stored embeddings (or synthetic vectors with --synthetic) are copied into
+throwaway in-memory Chroma collections, one per (M, ef_construction) pair,
+and queried at every ef the same way the search endpoint does (asking for
+max(k, ef) results and keeping the first k). Ground truth is an exact scan.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_hnsw --m 8 16 32 --ef-construction 64 200 --ef 10 50 100 200
+    python -m scripts.benchmark_hnsw --synthetic 50000 --dimension 256
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import argparse
+import time
+import chromadb
+import numpy as np
+from app.config import settings
+from app.services.chroma_database import get_collection
+from app.services.snapshot import IMPORT_BATCH_SIZE, iter_collection_pages
+
+# ===============================================
+# HELPERS
+# ===============================================
+
+def load_vectors(args):
+    """Embeddings from the configured collection, or random unit vectors."""
+    if args.synthetic:
+        rng = np.random.default_rng(args.seed)
+        vectors = rng.standard_normal((args.synthetic, args.dimension)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    pages = [np.asarray(page["embeddings"], dtype=np.float32) for page in iter_collection_pages(get_collection(), include=["embeddings"])]
+    if not pages:
+        raise SystemExit("The collection is empty, upload the reviews first (or use --synthetic).")
+    return np.concatenate(pages)
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    """Exact top-k row indices for every query under Chroma's distance functions."""
+    if space == "cosine":
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    if space in ("ip", "cosine"):
+        distances = -(queries @ vectors.T)
+    else:
+        distances = (vectors * vectors).sum(1)[None, :] - 2.0 * queries @ vectors.T
+    return np.argsort(distances, axis=1)[:, :k]
+
+def build_collection(client, vectors: np.ndarray, space: str, m: int, ef_construction: int, ef_search: int):
+    """Fresh in-memory collection with the given HNSW parameters; returns (collection, build seconds)."""
+    name = f"sweep_{space}_{m}_{ef_construction}"
+    if name in {collection.name for collection in client.list_collections()}:
+        client.delete_collection(name)
+    collection = client.create_collection(
+        name=name,
+        configuration={"hnsw": {"space": space, "max_neighbors": m, "ef_construction": ef_construction, "ef_search": ef_search}},
+        embedding_function=None,
+    )
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), IMPORT_BATCH_SIZE):
+        rows = range(offset, min(offset + IMPORT_BATCH_SIZE, len(vectors)))
+        collection.add(ids=[str(row) for row in rows], embeddings=vectors[offset:offset + len(rows)])
+    return collection, time.perf_counter() - start
+
+# ===============================================
+# MAIN
+# ===============================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--space", choices=["l2", "ip", "cosine"], default=settings.hnsw_space)
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32], help="HNSW M values")
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[64, 200], help="ef_construction values")
+    parser.add_argument("--ef", type=int, nargs="+", default=[10, 25, 50, 100, 200], help="Per-request ef values")
+    parser.add_argument("--queries", type=int, default=200, help="Number of benchmark queries")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--noise", type=float, default=0.05, help="Gaussian noise added to sampled vectors")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use this many random vectors instead of the collection")
+    parser.add_argument("--dimension", type=int, default=1024, help="Dimension of synthetic vectors")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = vectors[sample] + args.noise * rng.standard_normal((len(sample), vectors.shape[1])).astype(np.float32)
+    k = min(args.k, len(vectors))
+    truth = [set(row.tolist()) for row in exact_top_k(vectors, queries, k, args.space)]
+
+    print(f"{len(vectors)} vectors, dimension {vectors.shape[1]}, {len(queries)} queries, k={k}, space={args.space}")
+    print(f"{'M':>4}{'ef_constr':>11}{'build s':>9}{'ef':>6}{f'recall@{k}':>11}{'p50 ms':>9}{'p95 ms':>9}")
+
+    client = chromadb.EphemeralClient()
+    # --- The collection's ef_search is the floor; every request widens it with n_results=max(k, ef) --- #
+    floor = min(args.ef)
+    for m in args.m:
+        for ef_construction in args.ef_construction:
+            collection, build_seconds = build_collection(client, vectors, args.space, m, ef_construction, floor)
+            for ef in args.ef:
+                latencies, hits = [], 0
+                for query, expected in zip(queries, truth):
+                    start = time.perf_counter()
+                    found = collection.query(query_embeddings=[query], n_results=max(k, ef), include=[])["ids"][0][:k]
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    hits += len(expected & {int(doc_id) for doc_id in found})
+                print(
+                    f"{m:>4}{ef_construction:>11}{build_seconds:>9.2f}{ef:>6}{hits / (len(queries) * k):>11.3f}"
+                    f"{np.percentile(latencies, 50):>9.3f}{np.percentile(latencies, 95):>9.3f}"
+                )
+            client.delete_collection(collection.name)
+
+if __name__ == "__main__":
+    main()
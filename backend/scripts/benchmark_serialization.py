@@ -0,0 +1,101 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Serialization micro-benchmark for the search/question responses.
+
+Compares the previous path (a SearchResult model per result, validated into
+SearchResponse and encoded by FastAPI's default JSON encoder) with the shared
+formatter + orjson, for each `fields` option, and reports the gzip/brotli
+size of the payload. Uses synthetic Chroma-shaped results, no services needed.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_serialization --results 10 50 200 --repeat 2000
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import argparse
+import gzip
+import json
+import random
+import time
+import orjson
+from fastapi.encoders import jsonable_encoder
+from app.models.models import SearchResponse, SearchResult
+from app.services.result_formatting import format_search_results
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ===============================================
+# HELPERS
+# ===============================================
+
+WORDS = "machine needle thread tension bobbin stitch price manual noise motor fabric quality easy broke".split()
+
+def fake_result(n_results: int, document_words: int = 350) -> dict:
+    """Chroma-shaped query result with review-sized documents."""
+    rng = random.Random(n_results)
+    return {
+        "ids": [[f"chunk_{i}_doc_id{i}" for i in range(n_results)]],
+        "documents": [[" ".join(rng.choice(WORDS) for _ in range(document_words)) for _ in range(n_results)]],
+        "distances": [[rng.uniform(0.2, 1.2) for _ in range(n_results)]],
+    }
+
+def legacy_serialize(result: dict) -> bytes:
+    """The per-result Pydantic loop and default JSON encoding used before the shared formatter."""
+    formatted_results = []
+    for i in range(len(result["ids"][0])):
+        distance = result["distances"][0][i]
+        formatted_results.append(SearchResult(
+            document_id=result["ids"][0][i],
+            content_snippet=result["documents"][0][i][:100] + "..." if len(result["documents"][0][i]) > 100 else result["documents"][0][i],
+            similarity_score=round(distance, 3)
+        ))
+    response = SearchResponse(results=formatted_results, total_results=len(formatted_results), success=True)
+    return json.dumps(jsonable_encoder(response), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def fast_serialize(result: dict, fields: str) -> bytes:
+    results = format_search_results(result, fields=fields)
+    return orjson.dumps({"results": results, "total_results": len(results), "success": True})
+
+def time_per_call(fn, repeat: int) -> float:
+    """Microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+# ===============================================
+# MAIN
+# ===============================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, nargs="+", default=[10, 50, 200], help="Result set sizes")
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    print(f"{'results':>8} {'path':>16} {'us/call':>10} {'speedup':>8} {'bytes':>9} {'gzip':>8} {'br':>8}")
+    for n_results in args.results:
+        result = fake_result(n_results)
+        repeat = max(10, args.repeat * 10 // n_results)
+        baseline = time_per_call(lambda: legacy_serialize(result), repeat)
+        rows = [("legacy", baseline, legacy_serialize(result))]
+        for fields in ("snippet", "ids", "full"):
+            elapsed = time_per_call(lambda: fast_serialize(result, fields), repeat)
+            rows.append((f"orjson/{fields}", elapsed, fast_serialize(result, fields)))
+
+        for name, elapsed, payload in rows:
+            gzipped = len(gzip.compress(payload, compresslevel=6))
+            brotlied = len(brotli.compress(payload, quality=4)) if brotli is not None else "-"
+            print(f"{n_results:>8} {name:>16} {elapsed:>10.1f} {baseline / elapsed:>7.1f}x {len(payload):>9} {gzipped:>8} {brotlied:>8}")
+
+if __name__ == "__main__":
+    main()
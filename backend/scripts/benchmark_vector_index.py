@@ -0,0 +1,104 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Recall@k vs. latency benchmark: quantized in-memory index against Chroma's HNSW.
+
+Queries are built from stored review embeddings plus a little noise, so the
+benchmark needs no Cohere calls. Ground truth is an exact float32 scan.
+
+Usage (from the backend directory, after uploading data/reviews.txt):
+    python -m scripts.benchmark_vector_index --queries 200 --k 10
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import argparse
+import time
+import numpy as np
+from app.services.chroma_database import collection_space, get_collection
+from app.services.vector_index import QuantizedVectorIndex
+
+# ===============================================
+# HELPERS
+# ===============================================
+
+def load_embeddings(collection, page_size: int = 1000):
+    """Read every id and embedding stored in the collection."""
+    ids, embeddings = [], []
+    offset = 0
+    while True:
+        page = collection.get(include=["embeddings"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+        ids.extend(page["ids"])
+        embeddings.append(np.asarray(page["embeddings"], dtype=np.float32))
+        offset += len(page["ids"])
+    return ids, np.concatenate(embeddings)
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, space: str = "l2") -> np.ndarray:
+    """Exact top-k row indices for every query under the collection's distance function."""
+    if space == "ip":
+        return np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+    if space == "cosine":
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    distances = (queries * queries).sum(1)[:, None] - 2.0 * queries @ vectors.T + (vectors * vectors).sum(1)[None, :]
+    return np.argsort(distances, axis=1)[:, :k]
+
+def measure(search, queries: np.ndarray, truth_ids, k: int):
+    """Run `search` for every query and return (recall@k, p50 ms, p95 ms)."""
+    latencies, hits = [], 0
+    for query, truth in zip(queries, truth_ids):
+        start = time.perf_counter()
+        found = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(truth & set(found))
+    return hits / (len(queries) * k), np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+# ===============================================
+# MAIN
+# ===============================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200, help="Number of benchmark queries")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--noise", type=float, default=0.05, help="Gaussian noise added to sampled vectors")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    collection = get_collection()
+    ids, vectors = load_embeddings(collection)
+    if not ids:
+        raise SystemExit("The collection is empty, upload the reviews first.")
+
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(len(ids), size=min(args.queries, len(ids)), replace=False)
+    queries = vectors[sample] + args.noise * rng.standard_normal((len(sample), vectors.shape[1])).astype(np.float32)
+    k = min(args.k, len(ids))
+    space = collection_space(collection)
+    truth_ids = [{ids[row] for row in rows} for rows in exact_top_k(vectors, queries, k, space)]
+
+    print(f"{len(ids)} vectors, dimension {vectors.shape[1]}, {len(queries)} queries, k={k}, space={space}")
+    print(f"{'backend':<24}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}")
+
+    def chroma_search(query):
+        return collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])["ids"][0]
+
+    rows = [("chroma-hnsw", chroma_search)]
+    for quantization in ("int8", "binary"):
+        for rescore_factor in (1, 4, 16):
+            index = QuantizedVectorIndex(quantization=quantization, space=space, rescore_factor=rescore_factor)
+            index.add(ids, [""] * len(ids), vectors)
+            rows.append((f"{quantization} x{rescore_factor}", lambda query, index=index: index.query(query, k)["ids"][0]))
+
+    for name, search in rows:
+        recall, p50, p95 = measure(search, queries, truth_ids, k)
+        print(f"{name:<24}{recall:>10.3f}{p50:>10.3f}{p95:>10.3f}")
+
+if __name__ == "__main__":
+    main()
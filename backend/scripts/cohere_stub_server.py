@@ -0,0 +1,116 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Local stub of the Cohere v2 embed and chat endpoints, for exercising the
+timeouts, retries, hedging and circuit breaker of CohereLLMService without
+network access or API quota.
+
+Usage (from the backend directory):
+    python -m scripts.cohere_stub_server --port 8089 --latency 0.05 --failure-rate 0.2
+    COHERE_BASE_URL=http://127.0.0.1:8089 COHERE_API_KEY=stub python -m uvicorn app.main:app
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import argparse
+import hashlib
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ===============================================
+# RESPONSES
+# ===============================================
+
+def fake_embedding(text: str, dimension: int):
+    """Deterministic pseudo-embedding derived from the text hash."""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimension)]
+    norm = sum(value * value for value in vector) ** 0.5
+    return [value / norm for value in vector]
+
+def embed_response(payload: dict, dimension: int) -> dict:
+    texts = payload.get("texts", [])
+    return {
+        "id": str(uuid.uuid4()),
+        "response_type": "embeddings_by_type",
+        "embeddings": {"float": [fake_embedding(text, dimension) for text in texts]},
+        "texts": texts,
+    }
+
+def chat_response(payload: dict) -> dict:
+    last_message = payload.get("messages", [{}])[-1].get("content", "")
+    return {
+        "id": str(uuid.uuid4()),
+        "finish_reason": "COMPLETE",
+        "message": {
+            "role": "assistant",
+            "content": [{"type": "text", "text": f"Stub answer to: {str(last_message)[:80]}"}],
+        },
+    }
+
+# ===============================================
+# SERVER
+# ===============================================
+
+def make_handler(args):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *log_args):
+            if args.verbose:
+                super().log_message(format, *log_args)
+
+        def _send(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+
+            # --- Simulated latency (with occasional slow tail) and failures --- #
+            delay = args.latency
+            if random.random() < args.slow_rate:
+                delay += args.slow_latency
+            time.sleep(delay)
+            if random.random() < args.failure_rate:
+                self._send(args.failure_status, {"message": "stub failure"})
+                return
+
+            if self.path.rstrip("/") == "/v2/embed":
+                self._send(200, embed_response(payload, args.dimension))
+            elif self.path.rstrip("/") == "/v2/chat":
+                self._send(200, chat_response(payload))
+            else:
+                self._send(404, {"message": f"unknown path {self.path}"})
+
+    return StubHandler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--dimension", type=int, default=1024, help="Embedding dimension")
+    parser.add_argument("--latency", type=float, default=0.0, help="Base latency per request, in seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests given extra latency")
+    parser.add_argument("--slow-latency", type=float, default=5.0, help="Extra latency of slow requests, in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--failure-status", type=int, default=503, help="HTTP status of failed requests")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args))
+    print(f"Cohere stub listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
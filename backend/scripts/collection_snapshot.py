@@ -0,0 +1,64 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Export or import a ChromaDB collection snapshot (ids, documents, metadata
+and embeddings) without calling the embedding API, or publish one for
+read-only replicas (REPLICA_MODE=true).
+
+Usage (from the backend directory):
+    python -m scripts.collection_snapshot export snapshots/reviewsdb.npz [--float16]
+    python -m scripts.collection_snapshot import snapshots/reviewsdb.npz
+    python -m scripts.collection_snapshot publish [--dir .snapshots] [--keep 3]
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import argparse
+import os
+import time
+from app.services.snapshot import export_collection, import_collection, publish_snapshot
+
+# ===============================================
+# MAIN
+# ===============================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write the collection to a snapshot file")
+    export_parser.add_argument("path", help="Destination .npz file")
+    export_parser.add_argument("--float16", action="store_true", help="Store embeddings as float16")
+
+    import_parser = subparsers.add_parser("import", help="Bulk insert a snapshot file into the collection")
+    import_parser.add_argument("path", help="Snapshot .npz file")
+
+    publish_parser = subparsers.add_parser("publish", help="Publish a memory-mappable snapshot for read-only replicas")
+    publish_parser.add_argument("--dir", default=None, help="Publish directory (defaults to SNAPSHOT_PUBLISH_DIR)")
+    publish_parser.add_argument("--keep", type=int, default=None, help="Published snapshots to keep (defaults to SNAPSHOT_KEEP)")
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+
+    if args.command == "export":
+        directory = os.path.dirname(args.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        stats = export_collection(args.path, float16=args.float16)
+        size_mb = os.path.getsize(args.path) / 1e6
+        print(f"Exported {stats['records']} records (dim {stats['dimension']}) to {args.path} ({size_mb:.1f} MB)", end="")
+    elif args.command == "publish":
+        manifest = publish_snapshot(args.dir, keep=args.keep)
+        print(f"Published {manifest['name']} ({manifest['records']} records, version {manifest['version']})", end="")
+    else:
+        stats = import_collection(args.path)
+        print(f"Imported {stats['records']} records from {args.path}", end="")
+
+    print(f" in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Evaluate chunking and retrieval settings against a labelled question set,
+offline (deterministic hashing embedder, no Cohere calls).
+
+Prints recall@k, MRR and the mean prompt tokens of every combination of
+CHUNK_SIZE, CHUNK_OVERLAP and SIMILARITY_RESULTS, cheapest first, and the
+cheapest combination that meets the quality targets.
+
+Usage (from the backend directory):
+    python -m scripts.evaluate_retrieval --chunk-sizes 500 1000 2000 --chunk-overlaps 0 200 \\
+        --k 3 5 10 --min-recall 0.15 --min-mrr 0.5 --processes 4
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import argparse
+import json
+import os
+import time
+from app.config import settings
+from app.services.evaluation import evaluate_grid, load_labelled_queries, pick_cheapest
+
+# ===============================================
+# MAIN
+# ===============================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", default="data/eval_queries.jsonl", help="Labelled questions (JSON Lines)")
+    parser.add_argument("--reviews", default="data/reviews.txt", help="Review dump to index")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    parser.add_argument("--chunk-overlaps", type=int, nargs="+", default=[0, 200])
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 5, 10, 20], help="SIMILARITY_RESULTS values")
+    parser.add_argument("--min-recall", type=float, default=0.0, help="Quality target for recall@k")
+    parser.add_argument("--min-mrr", type=float, default=0.0, help="Quality target for MRR")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes for the grid")
+    parser.add_argument("--no-preprocess", action="store_true", help="Index the raw dump, as with PREPROCESS_UPLOADS=false")
+    parser.add_argument("--output", help="Also write every row to this JSON Lines file")
+    args = parser.parse_args()
+
+    queries = load_labelled_queries(args.queries)
+    with open(args.reviews, "r", encoding="utf-8") as file:
+        text = file.read()
+
+    start = time.perf_counter()
+    rows = evaluate_grid(
+        text, queries, args.chunk_sizes, args.chunk_overlaps, args.k,
+        processes=args.processes,
+        preprocess=settings.preprocess_uploads and not args.no_preprocess,
+    )
+    print(f"{len(queries)} labelled questions, {len(rows)} settings evaluated in {time.perf_counter() - start:.1f}s")
+    print(f"{'chunk_size':>10}{'overlap':>9}{'k':>5}{'recall':>9}{'mrr':>8}{'prompt tok':>12}{'chunks':>8}{'index tok':>11}")
+    for row in rows:
+        current = (row["chunk_size"], row["chunk_overlap"], row["similarity_results"]) == (
+            settings.chunk_size, settings.chunk_overlap, settings.similarity_results
+        )
+        print(
+            f"{row['chunk_size']:>10}{row['chunk_overlap']:>9}{row['similarity_results']:>5}{row['recall']:>9.3f}"
+            f"{row['mrr']:>8.3f}{row['prompt_tokens']:>12.0f}{row['chunks']:>8}{row['index_tokens']:>11}"
+            f"{'  <- current settings' if current else ''}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            for row in rows:
+                file.write(json.dumps(row) + "\n")
+
+    best = pick_cheapest(rows, args.min_recall, args.min_mrr)
+    if best is None:
+        print(f"\nNo setting reaches recall >= {args.min_recall} and MRR >= {args.min_mrr}")
+    else:
+        print(
+            f"\nCheapest setting meeting the targets: CHUNK_SIZE={best['chunk_size']} "
+            f"CHUNK_OVERLAP={best['chunk_overlap']} SIMILARITY_RESULTS={best['similarity_results']} "
+            f"(recall {best['recall']:.3f}, MRR {best['mrr']:.3f}, ~{best['prompt_tokens']:.0f} prompt tokens)"
+        )
+
+if __name__ == "__main__":
+    main()
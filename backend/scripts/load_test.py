@@ -0,0 +1,126 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Multi-worker load test for the RAG Chatbot API.
+
+Starts uvicorn with N workers (or targets an already running server), fires
+concurrent /app/search/ requests to measure throughput, then checks that the
+conversation stays consistent across workers: after M /app/questions/ calls,
+every /app/history/ read must return exactly 2*M messages, whichever worker
+serves it.
+
+Run a shared Chroma server and the SQLite state backend first, e.g.:
+    chroma run --path ./.chromadb --port 8001
+    CHROMA_SERVER_HOST=localhost STATE_BACKEND=sqlite \\
+        python -m scripts.load_test --workers 4 --requests 400 --concurrency 32
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+
+# ===============================================
+# HELPERS
+# ===============================================
+
+def wait_until_healthy(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"Server at {base_url} did not become healthy")
+
+def run_search_load(client: httpx.Client, base_url: str, total: int, concurrency: int):
+    """Send `total` searches with `concurrency` in flight; return (latencies, errors, elapsed)."""
+    queries = ["price", "needle threading", "tension", "instructions manual", "customer service", "noise"]
+
+    def one(i: int):
+        start = time.perf_counter()
+        response = client.post(f"{base_url}/app/search/", json={"query": queries[i % len(queries)]})
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for latency, status in results if status == 200]
+    errors = sum(1 for _, status in results if status != 200)
+    return latencies, errors, elapsed
+
+def check_conversation(client: httpx.Client, base_url: str, questions: int, reads: int) -> bool:
+    """Ask questions sequentially, then read the history many times concurrently."""
+    client.post(f"{base_url}/app/questions/clear-history/")
+    for i in range(questions):
+        response = client.post(f"{base_url}/app/questions/", json={"question": f"What do customers say about the price? ({i})"})
+        if response.status_code != 200:
+            print(f"  question {i} failed with {response.status_code}: {response.text[:200]}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        lengths = list(executor.map(lambda _: len(client.get(f"{base_url}/app/history/").json()["history"]), range(reads)))
+    expected = 2 * questions
+    consistent = all(length == expected for length in lengths)
+    print(f"  history lengths seen: {sorted(set(lengths))} (expected {expected})")
+    return consistent
+
+# ===============================================
+# MAIN
+# ===============================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=4, help="uvicorn workers to start")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--requests", type=int, default=400, help="Search requests to send")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--questions", type=int, default=3, help="Questions asked for the consistency check")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(args.port), "--workers", str(args.workers),
+        ])
+
+    try:
+        wait_until_healthy(base_url)
+        with httpx.Client(timeout=120.0, limits=httpx.Limits(max_connections=args.concurrency)) as client:
+            print(f"Search load: {args.requests} requests, concurrency {args.concurrency}")
+            latencies, errors, elapsed = run_search_load(client, base_url, args.requests, args.concurrency)
+            if latencies:
+                latencies.sort()
+                print(f"  throughput {len(latencies) / elapsed:.1f} req/s, errors {errors}")
+                print(f"  p50 {statistics.median(latencies):.1f} ms, p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f} ms")
+            else:
+                print(f"  every request failed ({errors} errors)")
+
+            print(f"Conversation consistency across workers: {args.questions} questions")
+            consistent = check_conversation(client, base_url, args.questions, reads=64)
+            print("  OK" if consistent else "  INCONSISTENT")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    sys.exit(0 if consistent and not errors else 1)
+
+if __name__ == "__main__":
+    main()
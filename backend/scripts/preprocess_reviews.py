@@ -0,0 +1,39 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Clean a raw review dump before ingestion: fixes encoding problems, strips
+boilerplate, normalizes whitespace and drops exact and near-duplicate
+reviews in one streaming pass. Replaces the old deletelinejumps.py script.
+
+Usage (from the backend directory):
+    python -m scripts.preprocess_reviews data/reviews.txt data/reviews_clean.txt --processes 4
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import argparse
+import os
+from app.services.preprocessing import preprocess_file
+
+# ===============================================
+# MAIN
+# ===============================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Raw review dump, one review per line")
+    parser.add_argument("output", help="Cleaned file, reviews separated by blank lines")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes for normalization")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Near-duplicate similarity threshold")
+    args = parser.parse_args()
+
+    stats = preprocess_file(args.input, args.output, processes=args.processes, near_duplicate_threshold=args.threshold)
+    print(f"Read {stats['lines_in']} lines ({stats['bytes_in'] / 1e6:.2f} MB) in {stats['elapsed_s']:.2f} s, {stats['mb_per_s']:.2f} MB/s")
+    print(f"Kept {stats['reviews_out']} reviews, dropped {stats['exact_duplicates']} exact and {stats['near_duplicates']} near duplicates")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Rebuild the review collection with new HNSW parameters, copying the stored
+embeddings (no embedding API calls). Omitted parameters use the configured
+HNSW_* values. Restart the API workers afterwards so they reopen the
+rebuilt collection.
+
+Usage (from the backend directory):
+    python -m scripts.rebuild_collection --space cosine --m 32 --ef-construction 200 --ef-search 64
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import argparse
+import time
+from app.services.snapshot import rebuild_collection
+
+# ===============================================
+# MAIN
+# ===============================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--space", choices=["l2", "ip", "cosine"], help="Distance function")
+    parser.add_argument("--m", type=int, help="Maximum neighbors per node (HNSW M)")
+    parser.add_argument("--ef-construction", type=int, help="Candidate list size while building")
+    parser.add_argument("--ef-search", type=int, help="Default candidate list size while searching")
+    parser.add_argument("--keep-previous", action="store_true", help="Keep the old collection as <name>_previous")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = rebuild_collection(
+        space=args.space,
+        m=args.m,
+        ef_construction=args.ef_construction,
+        ef_search=args.ef_search,
+        keep_previous=args.keep_previous,
+    )
+    print(
+        f"Rebuilt {stats['records']} records in {time.perf_counter() - start:.2f}s "
+        f"(space={stats['space']}, M={stats['max_neighbors']}, "
+        f"ef_construction={stats['ef_construction']}, ef_search={stats['ef_search']})"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Shared fixtures for the backend tests.
+Nothing here talks to Cohere: the LLM service is replaced by a fake with
+deterministic bag-of-words embeddings, and every test gets its own Chroma
+collection, state store and vector index.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import os
+import uuid
+import zlib
+
+os.environ.setdefault("COHERE_API_KEY", "test")
+
+import chromadb
+import numpy as np
+import pytest
+from app.services import chroma_database, cohere_llm, state_store, vector_index
+
+# ===============================================
+# FAKE LLM
+# ===============================================
+
+EMBEDDING_DIMENSION = 32
+
+class FakeLLMService:
+    """Stand-in for CohereLLMService with deterministic embeddings and echoing chat."""
+
+    def __init__(self):
+        self.embedded = 0
+        self.history = []
+
+    def get_embeddings(self, texts):
+        self.embedded += len(texts)
+        vectors = []
+        for text in texts:
+            vector = np.zeros(EMBEDDING_DIMENSION, dtype=np.float32)
+            for word in text.lower().split():
+                vector[zlib.crc32(word.encode()) % EMBEDDING_DIMENSION] += 1.0
+            vectors.append(vector.tolist())
+        return vectors
+
+    def translate_text(self, text, target_language="English"):
+        return text
+
+    def generate_answer(self, question, context_reviews):
+        answer = self.generate_standalone_answer(question, context_reviews)
+        self.append_exchange(question, answer)
+        return answer
+
+    def generate_standalone_answer(self, question, context_reviews):
+        return f"answer to {question}"
+
+    def summarize_text(self, instructions, text):
+        return f"summary of {len(text.splitlines())} lines"
+
+    def append_exchange(self, question, answer):
+        self.history += [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+
+    def get_chat_history(self):
+        return list(self.history)
+
+# ===============================================
+# FIXTURES
+# ===============================================
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    service = FakeLLMService()
+    monkeypatch.setattr(cohere_llm, "_llm_service", service)
+    return service
+
+@pytest.fixture
+def store(monkeypatch):
+    memory_store = state_store.InMemoryStateStore()
+    monkeypatch.setattr(state_store, "_state_store", memory_store)
+    return memory_store
+
+@pytest.fixture
+def collection(monkeypatch, fake_llm, store):
+    """A fresh in-memory Chroma collection installed as the configured one."""
+    test_collection = chromadb.EphemeralClient().create_collection(
+        f"test_{uuid.uuid4().hex[:8]}",
+        configuration=chroma_database.hnsw_configuration(),
+    )
+    monkeypatch.setattr(chroma_database, "_collection", test_collection)
+    monkeypatch.setattr(vector_index, "_vector_index", None)
+    return test_collection
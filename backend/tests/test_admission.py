@@ -0,0 +1,206 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for admission control and rate limiting of the LLM-backed endpoints.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.middleware import admission as admission_middleware
+from app.middleware.admission import AdmissionControlMiddleware
+from app.routers import question_router, search_router
+from app.services import admission, precomputed_answers
+from app.services.admission import AdmissionController, RateLimiter
+from app.services.precomputed_answers import PrecomputedAnswers, normalize_question
+
+# ===============================================
+# FIXTURES
+# ===============================================
+
+class SlowTranslation:
+    """Blocking translate (like the Cohere client) that records how many calls overlap."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.release = threading.Event()
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, text, target_language="English"):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            else:
+                self.release.wait(5)
+        finally:
+            with self._lock:
+                self.active -= 1
+        return text
+
+@pytest.fixture
+def client(collection, fake_llm):
+    collection.add(ids=["r1"], documents=["battery lasts all day"], embeddings=fake_llm.get_embeddings(["battery lasts all day"]))
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware)
+    app.include_router(question_router.router, prefix="/app")
+    app.include_router(search_router.router, prefix="/app")
+    # --- Entered, the client serves every request from one event loop, like uvicorn --- #
+    with TestClient(app) as test_client:
+        yield test_client
+
+def install_limits(monkeypatch, max_concurrency=8, max_queue=32, per_minute=6000.0, burst=1000.0):
+    controller = AdmissionController(max_concurrency, max_queue, queue_timeout=5.0)
+    monkeypatch.setattr(admission, "_admission_controller", controller)
+    monkeypatch.setattr(admission, "_rate_limiter", RateLimiter(per_minute, burst))
+    return controller
+
+@pytest.fixture
+def precomputed(monkeypatch, collection, fake_llm):
+    """Precomputed answers holding one answer, for "How long does the battery last?"."""
+    monkeypatch.setattr(settings, "precomputed_answers_enabled", True)
+    answers = PrecomputedAnswers(min_count=1)
+    monkeypatch.setattr(precomputed_answers, "_precomputed_answers", answers)
+    question = "How long does the battery last?"
+    answers.tracker.record(normalize_question(question), question)
+    assert answers.refresh() == 1
+    return answers
+
+def search(client, ip="203.0.113.1"):
+    return client.post("/app/search/", json={"query": "battery"}, headers={"X-Forwarded-For": ip})
+
+def ask(client, question="How long does the battery last?", follow_up=False):
+    return client.post("/app/questions/", json={"question": question, "follow_up": follow_up})
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_admitted_searches_run_concurrently(client, fake_llm, monkeypatch):
+    controller = install_limits(monkeypatch, max_concurrency=4)
+    translate = SlowTranslation(delay=0.2)
+    monkeypatch.setattr(fake_llm, "translate_text", translate, raising=False)
+
+    with ThreadPoolExecutor(4) as pool:
+        responses = list(pool.map(lambda _: search(client), range(4)))
+
+    assert [response.status_code for response in responses] == [200] * 4
+    # --- Blocking calls run in the threadpool: admitted requests overlap instead of taking turns --- #
+    assert translate.peak == 4
+    assert controller.in_flight == 0
+    assert controller.admitted["high"] == 4
+
+def test_requests_over_the_concurrency_limit_get_503(client, fake_llm, monkeypatch):
+    controller = install_limits(monkeypatch, max_concurrency=1, max_queue=0)
+    translate = SlowTranslation()
+    monkeypatch.setattr(fake_llm, "translate_text", translate, raising=False)
+
+    with ThreadPoolExecutor(1) as pool:
+        first = pool.submit(search, client)
+        deadline = time.time() + 5
+        while translate.active == 0 and time.time() < deadline:
+            time.sleep(0.01)
+
+        rejected = search(client)
+        translate.release.set()
+        assert first.result().status_code == 200
+
+    assert rejected.status_code == 503
+    assert "Retry-After" in rejected.headers
+    assert controller.rejected["queue_full"] == 1
+
+def test_rate_limit_keys_on_the_proxy_hop(client, monkeypatch):
+    install_limits(monkeypatch, per_minute=1.0, burst=1.0)
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "trust_forwarded_for", True)
+
+    assert search(client, "203.0.113.1").status_code == 200
+    limited = search(client, "203.0.113.1")
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+
+    # --- A spoofed first hop does not buy a fresh bucket; another real client has its own --- #
+    assert search(client, "198.51.100.7, 203.0.113.1").status_code == 429
+    assert search(client, "203.0.113.2").status_code == 200
+
+def test_precomputed_answers_only_open_a_conversation(client, precomputed, fake_llm, monkeypatch):
+    controller = install_limits(monkeypatch)
+
+    first = ask(client)
+    assert first.status_code == 200 and first.json()["precomputed"] is True
+    assert controller.admitted["low"] == 0
+
+    # --- A follow-up may depend on the earlier turns, which the stored answer never saw --- #
+    follow_up = ask(client, follow_up=True)
+    assert follow_up.status_code == 200 and follow_up.json()["precomputed"] is False
+    assert controller.admitted["low"] == 1
+    assert len(fake_llm.get_chat_history()) == 4
+
+def test_another_clients_conversation_does_not_disable_precomputed_answers(client, precomputed, fake_llm, monkeypatch):
+    controller = install_limits(monkeypatch)
+    assert ask(client, "Does the screen crack?").json()["precomputed"] is False
+    assert ask(client, "And the battery?", follow_up=True).json()["precomputed"] is False
+    assert fake_llm.get_chat_history()
+
+    # --- A second client opening its own conversation still gets the stored answer, unadmitted --- #
+    opening = ask(client)
+    assert opening.status_code == 200 and opening.json()["precomputed"] is True
+    assert controller.admitted["low"] == 2
+
+def test_stale_precomputed_answer_is_admitted_by_the_router(client, fake_llm, monkeypatch):
+    # --- The answer was current when the middleware looked, but is gone when the router runs --- #
+    monkeypatch.setattr(settings, "precomputed_answers_enabled", True)
+    monkeypatch.setattr(precomputed_answers, "_precomputed_answers", PrecomputedAnswers())
+    monkeypatch.setattr(admission_middleware, "has_precomputed_answer", lambda body: True)
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    controller = install_limits(monkeypatch, max_concurrency=1, max_queue=0, per_minute=1.0, burst=6.0)
+    translate = SlowTranslation()
+    monkeypatch.setattr(fake_llm, "translate_text", translate, raising=False)
+
+    with ThreadPoolExecutor(1) as pool:
+        first = pool.submit(ask, client)
+        deadline = time.time() + 5
+        while translate.active == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert controller.in_flight == 1
+
+        saturated = ask(client)
+        translate.release.set()
+        assert first.result().status_code == 200
+
+    assert saturated.status_code == 503
+    # --- Both questions were charged: the client's bucket is now empty --- #
+    assert ask(client).status_code == 429
+    assert controller.rejected == {"queue_full": 1, "queue_timeout": 0, "rate_limited": 1}
+    assert controller.in_flight == 0 and controller.admitted["low"] == 1
+
+def test_rotating_an_unknown_api_key_gets_no_extra_tokens(client, monkeypatch):
+    install_limits(monkeypatch, per_minute=1.0, burst=1.0)
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_api_keys", "team-key")
+
+    def search_with_key(key):
+        return client.post("/app/search/", json={"query": "battery"}, headers={"X-API-Key": key})
+
+    # --- Unknown keys fall back to the client's address, which shares one bucket --- #
+    assert search_with_key("made-up-1").status_code == 200
+    assert search_with_key("made-up-2").status_code == 429
+    assert search_with_key("made-up-3").status_code == 429
+
+    # --- A configured key has a bucket of its own --- #
+    assert search_with_key("team-key").status_code == 200
+    assert search_with_key("team-key").status_code == 429
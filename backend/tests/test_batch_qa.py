@@ -0,0 +1,70 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for the offline batch question-answering runner and its resume logic.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import json
+import pytest
+from app.services.batch_qa import EMBED_BATCH_SIZE, load_completed, question_id, run_batch
+
+# ===============================================
+# FIXTURES
+# ===============================================
+
+@pytest.fixture
+def reviews(collection, fake_llm):
+    documents = ["battery lasts all day", "screen cracked quickly", "charger stopped working"]
+    collection.add(ids=["r1", "r2", "r3"], documents=documents, embeddings=fake_llm.get_embeddings(documents))
+    return collection
+
+def read_records(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_load_completed_skips_rows_it_cannot_use(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"question_id": "abc", "success": True}),
+        # --- Written by an older run: no question_id, no index --- #
+        json.dumps({"question": "Is the battery good?", "success": True}),
+        json.dumps({"index": 3, "success": True}),
+        json.dumps({"question_id": "failed", "success": False}),
+        json.dumps(["not", "a", "record"]),
+        '{"question_id": "trunc',
+    ]), encoding="utf-8")
+
+    assert load_completed(str(path)) == {"abc", question_id("Is the battery good?")}
+
+def test_resume_matches_results_by_question_after_the_input_changed(reviews, fake_llm, tmp_path):
+    output = str(tmp_path / "answers.jsonl")
+    assert run_batch(["battery life?", "screen quality?"], output)["answered"] == 2
+
+    # --- The file was edited: a question inserted before the answered ones, which moved --- #
+    summary = run_batch(["charger problems?", "screen quality?", "battery life?"], output)
+
+    assert summary["skipped"] == 2 and summary["answered"] == 1
+    records = read_records(output)
+    assert [record["question"] for record in records] == ["battery life?", "screen quality?", "charger problems?"]
+    assert all(record["answer"] == f"answer to {record['question']}" for record in records)
+    assert all(record["question_id"] == question_id(record["question"]) for record in records)
+
+def test_batch_size_is_capped_at_the_embed_limit(reviews, fake_llm, monkeypatch, tmp_path):
+    sizes = []
+    get_embeddings = fake_llm.get_embeddings
+    monkeypatch.setattr(fake_llm, "get_embeddings", lambda texts: (sizes.append(len(texts)), get_embeddings(texts))[1])
+
+    summary = run_batch([f"question {i}?" for i in range(150)], str(tmp_path / "answers.jsonl"), batch_size=500)
+
+    assert summary["answered"] == 150
+    assert sizes == [EMBED_BATCH_SIZE, 150 - EMBED_BATCH_SIZE]
@@ -0,0 +1,103 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for chat history compaction: prompts while the summary lags, the budget and background summaries.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import threading
+import time
+from app.services.chat_history import ChatHistoryCompactor, estimate_tokens
+from app.services.state_store import InMemoryStateStore
+
+# ===============================================
+# HELPERS
+# ===============================================
+
+CONVERSATION = "test"
+
+class Summaries:
+    """Summarize function that counts its calls and can be held until released."""
+
+    def __init__(self, hold: bool = False):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+
+    def __call__(self, instructions, text):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return f"summary {self.calls}"
+
+def add_turns(store, count, words=20, start=0):
+    for turn in range(start, start + count):
+        store.append_message(CONVERSATION, "user", f"question {turn} " + "word " * words)
+        store.append_message(CONVERSATION, "assistant", f"answer {turn} " + "word " * words)
+
+def wait_idle(compactor):
+    deadline = time.time() + 5
+    while compactor._pending and time.time() < deadline:
+        time.sleep(0.01)
+    assert not compactor._pending
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_turns_the_summary_does_not_cover_yet_are_all_sent():
+    store = InMemoryStateStore()
+    compactor = ChatHistoryCompactor(store, Summaries(), token_budget=100, keep_turns=1)
+    add_turns(store, 4)
+    assert compactor.compact(CONVERSATION) == 6
+
+    # --- Many more turns arrive before the next summary is ready --- #
+    add_turns(store, 4, start=4)
+    summary, recent = compactor.prompt_history(CONVERSATION)
+
+    assert summary == "summary 1"
+    assert estimate_tokens(recent) > compactor.token_budget
+    assert recent == store.get_messages(CONVERSATION)[6:]
+
+def test_kept_turns_over_budget_start_no_compaction(monkeypatch):
+    store = InMemoryStateStore()
+    compactor = ChatHistoryCompactor(store, Summaries(), token_budget=20, keep_turns=2)
+    started = []
+    monkeypatch.setattr(compactor, "_compact_loop", started.append)
+
+    # --- The two kept turns alone exceed the budget: nothing older to summarize --- #
+    add_turns(store, 2)
+    compactor.maybe_compact(CONVERSATION)
+    assert started == []
+    assert compactor.prompt_history(CONVERSATION) == (None, store.get_messages(CONVERSATION))
+
+    add_turns(store, 1, start=2)
+    compactor.maybe_compact(CONVERSATION)
+    assert started == [CONVERSATION]
+
+def test_concurrent_compactions_coalesce():
+    store = InMemoryStateStore()
+    summaries = Summaries(hold=True)
+    compactor = ChatHistoryCompactor(store, summaries, token_budget=50, keep_turns=1)
+    add_turns(store, 3)
+
+    compactor.maybe_compact(CONVERSATION)
+    assert summaries.started.wait(5)
+    # --- Turns and compaction requests arriving while the first summary runs --- #
+    for turn in range(3, 6):
+        add_turns(store, 1, start=turn)
+        compactor.maybe_compact(CONVERSATION)
+    summaries.release.set()
+    wait_idle(compactor)
+
+    # --- One run for the first request, one more for all the ones made meanwhile --- #
+    assert summaries.calls == 2
+    summary, recent = compactor.prompt_history(CONVERSATION)
+    assert summary == "summary 2" and recent == store.get_messages(CONVERSATION)[-2:]
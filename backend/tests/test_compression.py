@@ -0,0 +1,88 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for brotli/gzip response compression.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import gzip
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.middleware.compression import CompressionMiddleware
+
+# ===============================================
+# FIXTURES
+# ===============================================
+
+LARGE = "battery lasts all day " * 100
+
+async def large(request):
+    return PlainTextResponse(LARGE)
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+async def streamed(request):
+    async def chunks():
+        yield LARGE.encode()
+        yield LARGE.encode()
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+async def encoded(request):
+    return Response(gzip.compress(LARGE.encode()), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[Route(f"/{endpoint.__name__}", endpoint) for endpoint in (large, small, streamed, encoded)])
+    app.add_middleware(CompressionMiddleware, minimum_size=1000)
+    return TestClient(app)
+
+def get(client, path, accept_encoding):
+    return client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+# ===============================================
+# TESTS
+# ===============================================
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("*", "br"),
+    ("br;q=0, gzip;q=0", None),
+    ("identity", None),
+])
+def test_negotiates_the_preferred_encoding(client, accept_encoding, expected):
+    response = get(client, "/large", accept_encoding)
+
+    assert response.headers.get("content-encoding") == expected
+    assert response.text == LARGE
+    if expected:
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(LARGE)
+
+def test_small_responses_are_sent_uncompressed(client):
+    response = get(client, "/small", "br, gzip")
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "ok"
+
+def test_streamed_responses_are_passed_through(client):
+    response = get(client, "/streamed", "br, gzip")
+
+    assert "content-encoding" not in response.headers
+    assert response.text == LARGE * 2
+
+def test_already_encoded_responses_are_not_compressed_again(client):
+    response = get(client, "/encoded", "br, gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == LARGE
@@ -0,0 +1,93 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for document deletion, replacement and the collection version.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.exceptions import NoResultsException, ValidationException
+from app.routers import documents_router
+from app.services.chroma_database import delete_documents, get_collection_version, replace_document, save_documents
+
+# ===============================================
+# FIXTURES
+# ===============================================
+
+@pytest.fixture
+def client(collection, monkeypatch):
+    monkeypatch.setattr(settings, "precomputed_answers_enabled", False)
+    app = FastAPI()
+    app.include_router(documents_router.router, prefix="/app")
+    with TestClient(app) as test_client:
+        yield test_client
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_deleting_a_newer_upload_keeps_older_ones(collection):
+    save_documents(["first upload review A", "first upload review B"], metadata={"job_id": "job1"}, id_prefix="job1")
+    save_documents(["second upload review C"], metadata={"job_id": "job2"}, id_prefix="job2")
+
+    deleted, _ = delete_documents(where={"job_id": "job2"})
+
+    assert deleted == 1
+    assert sorted(collection.get()["documents"]) == ["first upload review A", "first upload review B"]
+
+def test_delete_and_replace_bump_the_version(collection):
+    save_documents(["battery lasts all day", "screen cracked quickly"], id_prefix="job1")
+    version = get_collection_version()
+
+    assert delete_documents(ids=["job1_chunk_1", "unknown"]) == (1, version + 1)
+    assert replace_document("job1_chunk_0", "battery died in a week") > version + 1
+    assert collection.get(ids=["job1_chunk_0"])["documents"] == ["battery died in a week"]
+    # --- Nothing matched: no change, no new version --- #
+    assert delete_documents(ids=["job1_chunk_1"]) == (0, get_collection_version())
+
+def test_delete_needs_a_selection(collection):
+    with pytest.raises(ValidationException):
+        delete_documents()
+
+def test_replace_unknown_document(collection):
+    with pytest.raises(NoResultsException):
+        replace_document("missing", "text")
+
+def test_invalid_filter_is_rejected_with_422(client):
+    save_documents(["battery lasts all day"], metadata={"job_id": "job1"}, id_prefix="job1")
+
+    assert client.post("/app/documents/delete", json={"where": {"job_id": {"$foo": "job1"}}}).status_code == 422
+    assert client.post("/app/documents/delete", json={"where": {}}).status_code == 400
+    assert client.post("/app/documents/delete", json={"where": {"job_id": {"$eq": "job1"}}}).json()["affected"] == 1
+
+def test_replace_does_not_block_other_requests(client, fake_llm, monkeypatch):
+    save_documents(["battery lasts all day"], id_prefix="job1")
+    embedding, release = threading.Event(), threading.Event()
+    get_embeddings = fake_llm.get_embeddings
+
+    def slow_embeddings(texts):
+        embedding.set()
+        release.wait(5)
+        return get_embeddings(texts)
+
+    monkeypatch.setattr(fake_llm, "get_embeddings", slow_embeddings)
+    with ThreadPoolExecutor(1) as pool:
+        replaced = pool.submit(client.put, "/app/documents/job1_chunk_0", json={"content": "battery died in a week"})
+        assert embedding.wait(5)
+
+        # --- The re-embedding blocks a threadpool worker, not the event loop --- #
+        version = client.get("/app/documents/version")
+        assert version.status_code == 200 and not replaced.done()
+        release.set()
+
+        assert replaced.result().status_code == 200
@@ -0,0 +1,93 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for the offline chunking evaluation: retrieval metrics on a small labelled set.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import json
+from app.services.evaluation import chunk_review_sets, estimate_tokens, evaluate_chunking, load_labelled_queries, pick_cheapest
+from app.services.ingestion_jobs import split_reviews
+
+# ===============================================
+# HELPERS
+# ===============================================
+
+TEXT = "\n\n".join([
+    "REVIEW 1: The battery lasts all day long and charges fast.",
+    "REVIEW 2: The screen cracked after a week of use.",
+    "REVIEW 3: Shipping was quick and the box arrived intact.",
+    "REVIEW 4: Battery died after a month, very poor battery.",
+])
+
+QUERIES = [
+    {"question": "battery", "relevant_reviews": [1, 4]},
+    {"question": "cracked screen", "relevant_reviews": [2]},
+    # --- Mislabelled on purpose: the top hit is review 3, review 2 comes second --- #
+    {"question": "shipping box", "relevant_reviews": [2]},
+]
+
+def evaluate(queries, text=TEXT, similarity_results=(1, 2)):
+    return evaluate_chunking(text, queries, chunk_size=60, chunk_overlap=0, similarity_results=list(similarity_results))
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_each_chunk_maps_to_its_review():
+    chunks = split_reviews(TEXT, chunk_size=60, chunk_overlap=0)
+
+    assert chunk_review_sets(TEXT, chunks) == [{1}, {2}, {3}, {4}]
+
+def test_recall_and_mrr_per_similarity_results():
+    at_1, at_2 = evaluate(QUERIES)
+
+    # --- k=1: half of the battery reviews, all of the screen one, none of the mislabelled one --- #
+    assert at_1["similarity_results"] == 1
+    assert at_1["recall"] == round((0.5 + 1.0 + 0.0) / 3, 4)
+    assert at_1["mrr"] == round((1.0 + 1.0 + 0.0) / 3, 4)
+    # --- k=2: both battery reviews, and the mislabelled answer at rank two --- #
+    assert at_2["recall"] == 1.0
+    assert at_2["mrr"] == round((1.0 + 1.0 + 0.5) / 3, 4)
+    assert at_2["prompt_tokens"] > at_1["prompt_tokens"]
+    assert at_1["chunks"] == at_2["chunks"] == 4
+    assert at_1["index_tokens"] == at_2["index_tokens"]
+
+def test_missing_ground_truth_ids_are_ignored():
+    labelled = [{"question": "cracked screen", "relevant_reviews": [2, 9]}, {"question": "anything", "relevant_reviews": [7]}]
+
+    (row,) = evaluate(labelled, similarity_results=[1])
+
+    # --- Review 9 is not in the text, so finding review 2 is full recall; a query about review 7 only is dropped --- #
+    assert row["recall"] == 1.0 and row["mrr"] == 1.0
+
+def test_no_scorable_queries_give_no_rows():
+    assert evaluate([]) == []
+    assert evaluate([{"question": "anything", "relevant_reviews": [7]}]) == []
+    assert evaluate(QUERIES, text="") == []
+    assert evaluate(QUERIES, text="reviews without any record markers") == []
+
+def test_zero_similarity_results_retrieve_nothing():
+    (row,) = evaluate(QUERIES, similarity_results=[0])
+
+    assert row["recall"] == 0.0 and row["mrr"] == 0.0
+    # --- Only the questions themselves reach the prompt --- #
+    assert row["prompt_tokens"] == round(sum(estimate_tokens(query["question"]) for query in QUERIES) / len(QUERIES), 1)
+
+def test_pick_cheapest_meets_both_targets():
+    rows = evaluate(QUERIES)
+
+    assert pick_cheapest(rows) == rows[0]
+    assert pick_cheapest(rows, min_recall=0.9) == rows[1]
+    assert pick_cheapest(rows, min_recall=0.9, min_mrr=0.9) is None
+
+def test_load_labelled_queries_drops_unlabelled_lines(tmp_path):
+    path = tmp_path / "queries.jsonl"
+    path.write_text("\n".join([json.dumps(QUERIES[0]), "", json.dumps({"question": "no labels", "relevant_reviews": []})]), encoding="utf-8")
+
+    assert load_labelled_queries(str(path)) == [QUERIES[0]]
@@ -0,0 +1,127 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for background ingestion jobs: chunk ids, resumption and stale job recovery.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.routers import jobs_router, upload_router
+from app.services import ingestion_jobs
+from app.services.ingestion_jobs import COMPLETED, QUEUED, RUNNING, IngestionWorkerPool, JobStore
+
+# ===============================================
+# FIXTURES
+# ===============================================
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "preprocess_uploads", False)
+    monkeypatch.setattr(settings, "precomputed_answers_enabled", False)
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+def ingest(pool: IngestionWorkerPool, text: str) -> str:
+    job = pool.store.enqueue(text)
+    pool.process(pool.store.claim_next("test-worker"))
+    assert pool.store.get(job["id"])["status"] == COMPLETED
+    return job["id"]
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_uploads_do_not_overwrite_each_other(collection, job_store):
+    pool = IngestionWorkerPool(job_store)
+
+    first = ingest(pool, "first upload review A")
+    second = ingest(pool, "second upload review C")
+
+    stored = collection.get(include=["documents", "metadatas"])
+    by_job = {meta["job_id"]: document for document, meta in zip(stored["documents"], stored["metadatas"])}
+    assert by_job == {first: "first upload review A", second: "second upload review C"}
+
+def test_resumed_job_does_not_duplicate_chunks(collection, job_store):
+    pool = IngestionWorkerPool(job_store)
+    job = job_store.enqueue("\n\n".join(f"review number {i} " + "x" * 1900 for i in range(120)))
+
+    # --- Stop after the first batch, then lose its checkpoint as if the worker crashed before writing it --- #
+    pool._stopping.set()
+    pool.process(job_store.claim_next("test-worker"))
+    assert job_store.get(job["id"])["status"] == QUEUED
+    job_store.checkpoint(job["id"], 0, 0)
+
+    pool._stopping.clear()
+    pool.process(job_store.claim_next("test-worker"))
+
+    assert job_store.get(job["id"])["status"] == COMPLETED
+    assert collection.count() == 120
+
+def test_stale_running_job_is_requeued(job_store):
+    job = job_store.enqueue("a review")
+    job_store.claim_next("crashed-worker")
+    job_store._connection().execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time() - 600, job["id"]))
+
+    assert job_store.requeue_stale(300) == 1
+    assert job_store.get(job["id"])["status"] == QUEUED
+    assert job_store.claim_next("other-worker")["id"] == job["id"]
+
+def test_slow_preprocessing_keeps_the_job_alive(collection, job_store, monkeypatch):
+    monkeypatch.setattr(settings, "preprocess_uploads", True)
+    started = threading.Event()
+
+    def slow_preprocess(text, threshold):
+        started.set()
+        time.sleep(0.6)
+        return text, {"lines_in": 1, "reviews_out": 1, "exact_duplicates": 0, "near_duplicates": 0, "mb_per_s": 0.0}
+
+    monkeypatch.setattr(ingestion_jobs, "preprocess_text", slow_preprocess)
+    pool = IngestionWorkerPool(job_store, stale_after=0.3)
+    job = job_store.enqueue("a review that takes long to clean")
+    worker = threading.Thread(target=pool.process, args=(job_store.claim_next("busy-worker"),))
+    worker.start()
+
+    started.wait(1)
+    time.sleep(0.45)
+    # --- Longer than stale_after into preprocessing: another worker's check must not requeue it --- #
+    assert job_store.requeue_stale(0.3) == 0
+    assert job_store.get(job["id"])["status"] == RUNNING
+    worker.join(5)
+    assert job_store.get(job["id"])["status"] == COMPLETED
+
+def test_upload_waiting_on_the_jobs_database_does_not_block_other_requests(job_store, monkeypatch):
+    monkeypatch.setattr(ingestion_jobs, "_job_store", job_store)
+    monkeypatch.setattr(ingestion_jobs, "_worker_pool", IngestionWorkerPool(job_store))
+    app = FastAPI()
+    app.include_router(upload_router.router, prefix="/app")
+    app.include_router(jobs_router.router, prefix="/app")
+    queued = job_store.enqueue("earlier upload")
+    enqueueing, release = threading.Event(), threading.Event()
+    enqueue = job_store.enqueue
+
+    def locked_enqueue(text):
+        # --- Another process holds the SQLite write lock (BEGIN IMMEDIATE waits) --- #
+        enqueueing.set()
+        release.wait(5)
+        return enqueue(text)
+
+    monkeypatch.setattr(job_store, "enqueue", locked_enqueue)
+    with TestClient(app) as client, ThreadPoolExecutor(1) as pool:
+        upload = pool.submit(client.post, "/app/upload/", json={"reviews": "battery lasts all day"})
+        assert enqueueing.wait(5)
+
+        status = client.get(f"/app/jobs/{queued['id']}")
+        assert status.status_code == 200 and not upload.done()
+        release.set()
+
+        assert upload.result().status_code == 202
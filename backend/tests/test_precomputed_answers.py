@@ -0,0 +1,58 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for precomputed answers: question counts shared between workers.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import json
+from app.services.precomputed_answers import PRECOMPUTED_COUNTS_KEY, PrecomputedAnswers
+
+# ===============================================
+# HELPERS
+# ===============================================
+
+def ask(worker, question, times):
+    for _ in range(times):
+        worker.lookup(question)
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_refresh_merges_the_counts_of_every_worker(collection, fake_llm, store):
+    collection.add(ids=["r1"], documents=["battery lasts all day"], embeddings=fake_llm.get_embeddings(["battery lasts all day"]))
+    first, second = PrecomputedAnswers(min_count=3), PrecomputedAnswers(min_count=3)
+
+    # --- Neither worker alone saw the question often enough --- #
+    ask(first, "How long does the battery last?", 2)
+    assert first.refresh() == 0
+    ask(second, "how long does the battery last", 2)
+    assert second.refresh() == 1
+
+    (entry,) = first.entries()
+    assert entry["count"] == 4 and entry["question"] == "How long does the battery last?"
+    assert first.get("how long does the battery last")["answer_en"] == "answer to How long does the battery last?"
+
+    # --- A refresh only adds what was asked since the last one --- #
+    ask(first, "Is the screen bright?", 1)
+    first.refresh()
+    second.refresh()
+    counts = json.loads(store.get_value(PRECOMPUTED_COUNTS_KEY))
+    assert {key: entry["count"] for key, entry in counts.items()} == {"how long does the battery last": 4, "is the screen bright": 1}
+    assert first.tracked_questions() == second.tracked_questions() == 2
+
+def test_questions_asked_during_a_merge_are_kept(store):
+    worker = PrecomputedAnswers()
+    ask(worker, "Is it loud?", 2)
+    snapshot = worker.tracker.snapshot()
+    ask(worker, "Is it loud?", 1)
+
+    worker.tracker.subtract(snapshot)
+
+    assert worker.tracker.snapshot() == {"is it loud": (1, "Is it loud?")}
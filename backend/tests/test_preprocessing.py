@@ -0,0 +1,78 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for upload preprocessing: normalization and duplicate removal.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import numpy as np
+from app.services.preprocessing import ReviewPreprocessor, dedup_body, minhash_signature, preprocess_text
+
+# ===============================================
+# HELPERS
+# ===============================================
+
+BASE = (
+    "I bought this phone for my daughter and the battery easily lasts two full days, "
+    "the screen is bright enough outdoors and the camera takes sharp pictures even at night "
+    "so overall we are very happy with it"
+)
+
+def clean(lines, threshold=0.8):
+    preprocessor = ReviewPreprocessor(near_duplicate_threshold=threshold)
+    return list(preprocessor.process(lines)), preprocessor.stats
+
+def shingles(text, size=3):
+    words = dedup_body(text).split()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_exact_duplicates_ignore_record_prefix_and_case():
+    kept, stats = clean(["REVIEW 1: Great battery life", "review 2: great BATTERY life", "", "Great battery life"])
+
+    assert kept == ["REVIEW 1: Great battery life"]
+    assert stats["exact_duplicates"] == 2 and stats["reviews_out"] == 1
+
+def test_minhash_estimates_jaccard_similarity():
+    edited = BASE.replace("very happy", "quite happy")
+    true_jaccard = len(shingles(BASE) & shingles(edited)) / len(shingles(BASE) | shingles(edited))
+
+    estimate = np.mean(minhash_signature(dedup_body(BASE)) == minhash_signature(dedup_body(edited)))
+
+    assert abs(estimate - true_jaccard) < 0.15
+
+def test_near_duplicates_follow_the_threshold():
+    near_copy = BASE + " thanks"
+    different = "The charger stopped working after a week and support never answered my emails about a replacement"
+
+    kept, stats = clean([BASE, near_copy, different], threshold=0.8)
+    assert kept == [BASE, different]
+    assert stats["near_duplicates"] == 1
+
+    # --- A threshold above the pair's similarity keeps both --- #
+    kept, stats = clean([BASE, near_copy, different], threshold=1.0)
+    assert kept == [BASE, near_copy, different]
+    assert stats["near_duplicates"] == 0
+
+def test_short_reviews_are_not_merged_with_each_other():
+    reviews = ["Great", "Terrible", "Great value", "Bad value", "Works", "Great!"]
+
+    kept, stats = clean(reviews)
+
+    # --- Only a review with the very same words counts as a duplicate of a short one --- #
+    assert kept == ["Great", "Terrible", "Great value", "Bad value", "Works"]
+    assert stats["near_duplicates"] == 1
+
+def test_preprocess_text_repairs_encoding_and_strips_boilerplate():
+    cleaned, stats = preprocess_text("The cafÃ© mode   works\n12 people found this helpful\n\nThe café mode works")
+
+    assert cleaned == "The café mode works"
+    assert stats["lines_in"] == 4 and stats["exact_duplicates"] == 1
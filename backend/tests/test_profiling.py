@@ -0,0 +1,69 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for request profiling: the sampler follows the request into the threadpool.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.middleware.profiling import PROFILE_ID_HEADER, ProfilingMiddleware
+from app.routers import search_router
+from app.services import profiling
+from app.services.profiling import RequestProfiler
+
+# ===============================================
+# FIXTURES
+# ===============================================
+
+def slow_translation(text, target_language="English"):
+    time.sleep(0.2)
+    return text
+
+@pytest.fixture
+def recorder(monkeypatch):
+    request_profiler = RequestProfiler(window=10, max_profiles=5, interval_ms=1.0)
+    monkeypatch.setattr(profiling, "_request_profiler", request_profiler)
+    monkeypatch.setattr(settings, "profiling_allow_header", True)
+    return request_profiler
+
+@pytest.fixture
+def client(collection, fake_llm, recorder):
+    collection.add(ids=["r1"], documents=["battery lasts all day"], embeddings=fake_llm.get_embeddings(["battery lasts all day"]))
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(search_router.router, prefix="/app")
+    with TestClient(app) as test_client:
+        yield test_client
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_profile_samples_the_threadpool_worker(client, recorder, fake_llm, monkeypatch):
+    monkeypatch.setattr(fake_llm, "translate_text", slow_translation, raising=False)
+
+    response = client.post("/app/search/", json={"query": "battery"}, headers={"X-Profile": "1"})
+
+    assert response.status_code == 200
+    profile = recorder.get_profile(response.headers[PROFILE_ID_HEADER])
+    stacks = profile.collapsed().splitlines()
+    in_translation = [line for line in stacks if "slow_translation" in line]
+    # --- The search handler is a plain def: translation ran on a worker thread, not the event loop --- #
+    assert in_translation
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in in_translation) >= len(profile.samples) / 2
+
+def test_unprofiled_requests_are_traced_without_samples(client, recorder):
+    response = client.post("/app/search/", json={"query": "battery"})
+
+    assert PROFILE_ID_HEADER not in response.headers
+    (trace,) = recorder.slowest(1)
+    assert trace["profile_id"] is None and "retrieval" in trace["stages"]
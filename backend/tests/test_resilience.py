@@ -0,0 +1,75 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for upstream failure handling: retries, 503 mapping and keyword fallback.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import httpx
+import pytest
+from app.exceptions import LLMException, UpstreamUnavailableException
+from app.services.chroma_database import lexical_search
+from app.services.cohere_llm import CohereLLMService
+from app.services.resilience import RetryPolicy
+
+# ===============================================
+# HELPERS
+# ===============================================
+
+class FailingClient:
+    """Cohere client whose every call raises the given error."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+        self.calls = 0
+
+    def _fail(self, **kwargs):
+        self.calls += 1
+        raise self.error
+
+    embed = chat = _fail
+
+class BadRequest(Exception):
+    status_code = 400
+
+def service_with(client, store) -> CohereLLMService:
+    service = CohereLLMService()
+    service.client = client
+    service.retry_policy = RetryPolicy(max_attempts=3, base_delay=0)
+    return service
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_exhausted_retries_surface_as_upstream_unavailable(store):
+    client = FailingClient(httpx.ReadTimeout("timed out"))
+    service = service_with(client, store)
+
+    with pytest.raises(UpstreamUnavailableException):
+        service.get_embeddings(["battery"])
+    with pytest.raises(UpstreamUnavailableException):
+        service.generate_standalone_answer("How is the battery?", ["Battery is great"])
+    assert client.calls == 6
+
+def test_non_retryable_errors_stay_llm_errors(store):
+    client = FailingClient(BadRequest("bad request"))
+    service = service_with(client, store)
+
+    with pytest.raises(LLMException) as raised:
+        service.get_embeddings(["battery"])
+    assert not isinstance(raised.value, UpstreamUnavailableException)
+    assert client.calls == 1
+
+def test_lexical_search_matches_capitalized_text(collection, fake_llm):
+    documents = ["Battery died after a week", "BATTERY is fine", "The screen is bright"]
+    collection.add(ids=["a", "b", "c"], documents=documents, embeddings=fake_llm.get_embeddings(documents))
+
+    result = lexical_search("how long does the battery last", 5)
+
+    assert sorted(result["ids"][0]) == ["a", "b"]
@@ -0,0 +1,91 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for the map-reduce collection summarizer and its cluster cache.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import threading
+import numpy as np
+import pytest
+from app.services.summarizer import CorpusSummarizer, kmeans
+
+# ===============================================
+# FIXTURES
+# ===============================================
+
+BATTERY = ["battery lasts all day", "battery drains fast", "battery charges quickly"]
+SCREEN = ["screen cracked quickly", "screen is bright", "screen scratches easily"]
+
+@pytest.fixture
+def reviews(collection, fake_llm):
+    documents = BATTERY + SCREEN
+    collection.add(
+        ids=[f"r{i}" for i in range(len(documents))],
+        documents=documents,
+        embeddings=fake_llm.get_embeddings(documents),
+        metadatas=[{"version": 1}] * len(documents),
+    )
+    return collection
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_kmeans_separates_distinct_groups():
+    rng = np.random.default_rng(0)
+    vectors = np.concatenate([rng.normal(0, 0.1, (20, 4)), rng.normal(5, 0.1, (20, 4))]).astype(np.float32)
+
+    labels, centroids = kmeans(vectors, 2)
+
+    assert len(set(labels[:20])) == 1 and len(set(labels[20:])) == 1
+    assert labels[0] != labels[20]
+    assert centroids.shape == (2, 4)
+
+def test_fit_budget_skips_missing_documents_and_stops_at_the_budget():
+    assert CorpusSummarizer._fit_budget([None, "abcd", "", "efgh"], 6) == "abcd\nef"
+
+def test_only_changed_clusters_are_recomputed(reviews, fake_llm, monkeypatch):
+    summarizer = CorpusSummarizer()
+
+    first = summarizer.summarize(num_clusters=2)
+    assert first["clusters_recomputed"] == 2
+    assert sum(cluster["size"] for cluster in first["clusters"]) == 6
+    assert summarizer.summarize(num_clusters=2)["clusters_recomputed"] == 0
+
+    reviews.update(ids=["r0"], metadatas=[{"version": 2}])
+    assert summarizer.summarize(num_clusters=2)["clusters_recomputed"] == 1
+
+def test_records_without_documents_are_summarized(reviews, fake_llm):
+    reviews.add(ids=["empty"], embeddings=fake_llm.get_embeddings(["battery"]))
+
+    result = CorpusSummarizer().summarize(num_clusters=2)
+
+    assert sum(cluster["size"] for cluster in result["clusters"]) == 7
+
+def test_concurrent_summaries_do_not_wait_for_each_other(reviews, fake_llm, monkeypatch):
+    # --- Each reduce call waits for the other one: holding a lock across LLM calls would deadlock --- #
+    both_reducing = threading.Barrier(2, timeout=5)
+    summarize_text = fake_llm.summarize_text
+
+    def reduce_together(instructions, text):
+        if "groups of reviews" in instructions:
+            both_reducing.wait()
+        return summarize_text(instructions, text)
+
+    monkeypatch.setattr(fake_llm, "summarize_text", reduce_together)
+    summarizer = CorpusSummarizer()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(summarizer.summarize(num_clusters=2, refresh=True))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(results) == 2
+    assert all(result["summary"] for result in results)
@@ -0,0 +1,161 @@
+# ===============================================
+# DOCS
+# ===============================================
+
+"""
+Tests for the quantized in-memory vector index and its write paths.
+"""
+
+# ===============================================
+# IMPORTS
+# ===============================================
+
+import time
+import uuid
+import chromadb
+import numpy as np
+from app.config import settings
+from app.services import chroma_database, vector_index
+from app.services.chroma_database import (
+    delete_documents,
+    get_collection_version,
+    get_current_vector_index,
+    hnsw_configuration,
+    initialize_vector_index,
+    save_documents,
+    search_similar_reviews_batch,
+)
+from app.services.snapshot import export_collection, import_collection, publish_snapshot
+from app.services.vector_index import QuantizedVectorIndex
+
+# ===============================================
+# TESTS
+# ===============================================
+
+def test_upsert_replaces_existing_vectors():
+    index = QuantizedVectorIndex()
+    index.add(["a", "b"], ["old a", "old b"], [[1.0, 0.0], [0.0, 1.0]])
+
+    index.upsert(["a"], ["new a"], [[0.0, -1.0]])
+
+    assert len(index) == 2
+    assert index.documents[index.rows(["a"])[0]] == "new a"
+    np.testing.assert_allclose(index.embeddings(index.rows(["a"])), [[0.0, -1.0]])
+    assert index.query([0.0, -1.0], 1)["ids"][0][0] == "a"
+
+def test_small_candidate_pool_does_not_reduce_recall():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 32)).astype(np.float32)
+    index = QuantizedVectorIndex(quantization="binary", rescore_factor=4)
+    index.add([str(row) for row in range(len(vectors))], [""] * len(vectors), vectors)
+    queries = vectors[:20] + 0.5 * rng.standard_normal((20, 32)).astype(np.float32)
+
+    def recall(**kwargs):
+        hits = 0
+        for query in queries:
+            exact = {str(row) for row in np.argsort(((vectors - query) ** 2).sum(axis=1))[:10]}
+            hits += len(exact & set(index.query(query, 10, **kwargs)["ids"][0]))
+        return hits / 200
+
+    # --- A small ef (e.g. below k) must not shrink the pool under the default k * rescore_factor --- #
+    assert recall(candidates=2) >= recall()
+    assert recall(candidates=200) >= recall()
+
+def test_add_keeps_existing_vectors():
+    index = QuantizedVectorIndex()
+    index.add(["a"], ["old a"], [[1.0, 0.0]])
+
+    assert index.add(["a"], ["new a"], [[0.0, 1.0]]) == 0
+    assert index.documents == ["old a"]
+
+def test_batches_are_written_to_storage_once_per_flush(tmp_path, monkeypatch):
+    index = QuantizedVectorIndex(storage_dir=str(tmp_path))
+    saves = []
+    save = index.save
+    monkeypatch.setattr(index, "save", lambda directory: (saves.append(directory), save(directory)))
+
+    for batch in range(3):
+        index.upsert([f"r{batch}"], [f"review {batch}"], [[float(batch), 1.0]])
+
+    # --- Buffered batches are searchable before anything is written --- #
+    assert saves == []
+    assert index.query([2.0, 1.0], 1)["ids"][0] == ["r2"]
+
+    index.flush()
+    index.flush()
+    assert len(saves) == 1
+    reopened = QuantizedVectorIndex.open(str(tmp_path), index.ids, index.documents)
+    np.testing.assert_allclose(reopened.embeddings(reopened.rows(["r1"])), [[1.0, 1.0]])
+
+def test_upload_rewrites_index_files_once(collection, fake_llm, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "vector_index_enabled", True)
+    monkeypatch.setattr(settings, "vector_index_mmap_dir", str(tmp_path))
+    index = initialize_vector_index()
+    saves = []
+    save = index.save
+    monkeypatch.setattr(index, "save", lambda directory: (saves.append(directory), save(directory)))
+
+    save_documents([f"review number {i}" for i in range(250)])
+
+    assert len(index) == 250
+    assert len(saves) == 1
+
+def test_import_over_existing_ids_refreshes_the_index(collection, fake_llm, tmp_path):
+    collection.add(ids=["r1"], documents=["battery lasts all day"], embeddings=fake_llm.get_embeddings(["battery lasts all day"]))
+    path = str(tmp_path / "snapshot.npz")
+    export_collection(path, collection)
+
+    # --- The live record changed after the export; importing must bring both stores back in line --- #
+    collection.upsert(ids=["r1"], documents=["screen cracked quickly"], embeddings=fake_llm.get_embeddings(["screen cracked quickly"]))
+    index = QuantizedVectorIndex.from_collection(collection)
+    vector_index.set_vector_index(index)
+
+    import_collection(path, collection)
+
+    assert collection.get(ids=["r1"])["documents"] == ["battery lasts all day"]
+    assert index.documents[index.rows(["r1"])[0]] == "battery lasts all day"
+    np.testing.assert_allclose(index.embeddings(index.rows(["r1"])), fake_llm.get_embeddings(["battery lasts all day"]))
+
+def test_local_writes_keep_the_index_current(collection, fake_llm, monkeypatch):
+    monkeypatch.setattr(settings, "vector_index_enabled", True)
+    index = initialize_vector_index()
+
+    save_documents(["battery lasts all day", "screen cracked quickly"])
+    delete_documents(ids=[index.ids[0]])
+
+    assert index.version == get_collection_version()
+    assert get_current_vector_index() is index
+    assert len(index) == collection.count() == 1
+
+def test_index_reloads_after_another_worker_writes(collection, fake_llm, monkeypatch):
+    monkeypatch.setattr(settings, "vector_index_enabled", True)
+    stale = initialize_vector_index()
+
+    # --- Another worker writes: same collection and version counter, but not this worker's index --- #
+    vector_index.set_vector_index(None)
+    save_documents(["the charger stopped working"], metadata={"job_id": "other"})
+    vector_index.set_vector_index(stale)
+
+    # --- Stale index: searches fall back to Chroma while it reloads --- #
+    assert get_current_vector_index() is None
+    docs, _ = search_similar_reviews_batch(fake_llm.get_embeddings(["the charger stopped working"]), n_results=1)[0]
+    assert docs == ["the charger stopped working"]
+
+    deadline = time.time() + 5
+    while get_current_vector_index() is None and time.time() < deadline:
+        time.sleep(0.01)
+    reloaded = get_current_vector_index()
+    assert reloaded is not None and reloaded is not stale
+    assert reloaded.documents == ["the charger stopped working"]
+
+def test_indexes_use_the_space_the_collection_was_created_with(fake_llm, store, monkeypatch, tmp_path):
+    cosine = chromadb.EphemeralClient().create_collection(f"test_{uuid.uuid4().hex[:8]}", configuration=hnsw_configuration(space="cosine"))
+    cosine.add(ids=["r1"], documents=["battery lasts all day"], embeddings=fake_llm.get_embeddings(["battery lasts all day"]))
+    monkeypatch.setattr(chroma_database, "_collection", cosine)
+    monkeypatch.setattr(vector_index, "_vector_index", None)
+    # --- HNSW_SPACE changed after the collection was created: it only applies to new collections --- #
+    monkeypatch.setattr(settings, "hnsw_space", "l2")
+    monkeypatch.setattr(settings, "vector_index_enabled", True)
+
+    assert initialize_vector_index().space == "cosine"
+    assert publish_snapshot(str(tmp_path), collection=cosine)["space"] == "cosine"
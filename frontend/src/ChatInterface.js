@@ -44,7 +44,9 @@ const ChatInterface = () => {
       // Call your backend API
       const apiUrl = process.env.REACT_APP_API_URL || 'http://localhost:8000';
       const response = await axios.post(`${apiUrl}/app/questions/`, {
-        question: userMessage.content
+        question: userMessage.content,
+        // Only a conversation's opening question may get a precomputed answer
+        follow_up: messages.length > 0
       });
 
       // Add assistant response